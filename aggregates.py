@@ -0,0 +1,195 @@
+import copy
+import heapq
+from collections import Counter
+from typing import Callable
+
+from event_cache import EventCache
+from tracing import span
+
+
+def _bump(counter: Counter, key, sign: int) -> None:
+    """Add `sign` to counter[key], dropping keys that fall back to zero."""
+    n = counter[key] + sign
+    if n:
+        counter[key] = n
+    else:
+        del counter[key]
+
+
+class WindowAggregate:
+    """
+    Leaderboard counters for the cache events with start <= ts < end. When the
+    window moves forward only the events entering or leaving it are applied.
+    """
+
+    def __init__(
+        self,
+        cache: EventCache,
+        bounds: Callable[[], tuple[int, int]],
+        weapon_name: Callable[[int], str],
+    ):
+        self.cache = cache
+        self.bounds = bounds
+        self.weapon_name = weapon_name
+        self.start = self.end = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self.kills = Counter()  # player id → kills
+        self.deaths = Counter()  # victim id → deaths, suicides excluded
+        self.deaths_all = Counter()  # victim id → deaths, suicides included
+        self.orgs = Counter()  # victim org id → kills
+        self.weapons = Counter()  # friendly weapon name → kills
+        self.zones = Counter()  # zone id → kills
+        self.by_mode: dict[int, Counter] = {}  # kill "mode" id → player counts
+        self.by_family: dict[int, Counter] = {}  # mode family id → player counts
+
+    # ─── event application ───────────────────────────────────────────────────────
+    def _apply_kill(self, pos: int, sign: int) -> None:
+        cols = self.cache.kills.cols
+        player = cols["player"][pos]
+        _bump(self.kills, player, sign)
+        _bump(self.orgs, cols["org"][pos], sign)
+        _bump(self.weapons, self.weapon_name(cols["weapon"][pos]), sign)
+        _bump(self.zones, cols["zone"][pos], sign)
+        _bump(self.by_mode.setdefault(cols["mode"][pos], Counter()), player, sign)
+        _bump(self.by_family.setdefault(cols["family"][pos], Counter()), player, sign)
+
+    def _apply_death(self, pos: int, sign: int) -> None:
+        cols = self.cache.deaths.cols
+        victim = cols["victim"][pos]
+        _bump(self.deaths_all, victim, sign)
+        if cols["damage_type"][pos] != self.cache.strings.lookup("Suicide"):
+            _bump(self.deaths, victim, sign)
+
+    def _apply_range(self, start: int, end: int, sign: int) -> None:
+        i, j = self.cache.kills.span(start, end)
+        for pos in range(i, j):
+            self._apply_kill(pos, sign)
+        i, j = self.cache.deaths.span(start, end)
+        for pos in range(i, j):
+            self._apply_death(pos, sign)
+
+    def add_kill(self, pos: int) -> None:
+        if self.start <= self.cache.kills.ts[pos] < self.end:
+            self._apply_kill(pos, 1)
+
+    def add_death(self, pos: int) -> None:
+        if self.start <= self.cache.deaths.ts[pos] < self.end:
+            self._apply_death(pos, 1)
+
+    # ─── window movement ─────────────────────────────────────────────────────────
+    def refresh(self) -> "WindowAggregate":
+        """Move the window to its current bounds, expiring events that left it."""
+        start, end = self.bounds()
+        if (start, end) == (self.start, self.end):
+            return self
+        if self.start <= start < self.end and end >= self.end:
+            self._apply_range(self.start, start, -1)
+            self._apply_range(self.end, end, 1)
+        else:
+            self._clear()
+            self._apply_range(start, end, 1)
+        self.start, self.end = start, end
+        return self
+
+    def snapshot(self) -> "WindowAggregate":
+        """A detached copy whose counters stay fixed while new events arrive."""
+        snap = copy.copy(self)
+        for name in ("kills", "deaths", "deaths_all", "orgs", "weapons", "zones"):
+            setattr(snap, name, Counter(getattr(self, name)))
+        snap.by_mode = {k: Counter(v) for k, v in self.by_mode.items()}
+        snap.by_family = {k: Counter(v) for k, v in self.by_family.items()}
+        return snap
+
+    def rebuild(self) -> None:
+        self._clear()
+        self._apply_range(self.start, self.end, 1)
+
+    # ─── queries ─────────────────────────────────────────────────────────────────
+    @property
+    def total_kills(self) -> int:
+        return self.kills.total()
+
+    @property
+    def total_deaths(self) -> int:
+        return self.deaths.total()
+
+    def top(self, counts: Counter, n: int, skip=()) -> list[tuple[str, int]]:
+        """Top `n` (name, count) pairs of an id-keyed counter, minus names in `skip`."""
+        names = self.cache.strings
+        items = ((names[i], c) for i, c in counts.items())
+        if skip:
+            items = ((name, c) for name, c in items if name not in skip)
+        return heapq.nlargest(n, items, key=lambda x: x[1])
+
+    def slice_counts(self, table: dict[int, Counter], value: str) -> Counter:
+        """Player counts for one `by_mode` / `by_family` slice."""
+        key = self.cache.strings.lookup(value)
+        return table.get(key, Counter()) if key is not None else Counter()
+
+    def ratios(
+        self, include_suicides: bool = False
+    ) -> list[tuple[str, int, int, float]]:
+        """(player, kills, deaths, K/D) for everyone active in the window."""
+        names = self.cache.strings
+        deaths = self.deaths_all if include_suicides else self.deaths
+        return [
+            (names[p], self.kills[p], deaths[p], self.kills[p] / max(1, deaths[p]))
+            for p in self.kills.keys() | deaths.keys()
+        ]
+
+
+class AggregateEngine:
+    """Lazily created, incrementally maintained WindowAggregates keyed by period."""
+
+    def __init__(
+        self,
+        cache: EventCache,
+        bounds: Callable[..., tuple[int, int]],
+        format_weapon: Callable[[str], str],
+    ):
+        self.cache = cache
+        self.bounds = bounds
+        self.format_weapon = format_weapon
+        self._weapon_names: dict[int, str] = {}
+        self._windows: dict[tuple, WindowAggregate] = {}
+        cache.subscribe(self._on_event)
+
+    def _weapon_name(self, weapon_id: int) -> str:
+        name = self._weapon_names.get(weapon_id)
+        if name is None:
+            name = self._weapon_names[weapon_id] = self.format_weapon(
+                self.cache.strings[weapon_id]
+            )
+        return name
+
+    def _on_event(self, kind: str, pos: int) -> None:
+        for w in self._windows.values():
+            if kind == "kill":
+                w.add_kill(pos)
+            else:
+                w.add_death(pos)
+
+    def window(self, *period) -> WindowAggregate:
+        """The aggregate for `bounds(*period)`, moved up to the current time."""
+        with span("aggregate", period=" ".join(map(str, period))):
+            w = self._windows.get(period)
+            if w is None:
+                w = self._windows[period] = WindowAggregate(
+                    self.cache, lambda: self.bounds(*period), self._weapon_name
+                )
+            return w.refresh()
+
+    def snapshot(self, *period) -> WindowAggregate:
+        """A one-off aggregate for `bounds(*period)` that is not kept up to date."""
+        with span("aggregate", period=" ".join(map(str, period)), snapshot=True):
+            return WindowAggregate(
+                self.cache, lambda: self.bounds(*period), self._weapon_name
+            ).refresh()
+
+    def reset_weapon_names(self) -> None:
+        """Re-derive weapon tallies after the weapon catalog changes."""
+        self._weapon_names.clear()
+        for w in self._windows.values():
+            w.rebuild()
@@ -0,0 +1,135 @@
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import time
+from typing import Callable
+from urllib.parse import parse_qs, urlsplit
+
+import discord
+
+# longest side of the uploaded variant in px (0 keeps the original file)
+ASSET_MAX_PX = int(os.getenv("ASSET_MAX_PX", "0"))
+# refresh a signed CDN url this many seconds before it expires
+ASSET_REFRESH_MARGIN = 3600
+# after a failed upload, serve attachments for this long before trying again
+ASSET_RETRY_AFTER = 300
+
+
+def _downscale(data: bytes, max_px: int) -> bytes:
+    """Shrink a PNG so its longest side is `max_px`; needs Pillow."""
+    try:
+        from PIL import Image
+    except ImportError:
+        logging.warning(
+            "ASSET_MAX_PX is set but Pillow is not installed; uploading as is"
+        )
+        return data
+    img = Image.open(io.BytesIO(data))
+    img.thumbnail((max_px, max_px))
+    out = io.BytesIO()
+    img.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+def _expires_at(url: str) -> float:
+    """Expiry of a signed Discord CDN url (its hex `ex` param), or never."""
+    ex = parse_qs(urlsplit(url).query).get("ex")
+    try:
+        return int(ex[0], 16) if ex else float("inf")
+    except ValueError:
+        return 0
+
+
+class AssetManager:
+    """
+    Uploads branding images to an asset channel once and hands out their CDN
+    urls. The upload's message id is kept in the store's meta table, so after
+    a restart an expired signed url is renewed with one message fetch and the
+    file is only uploaded again if that message is gone or the image changed.
+    With no channel configured nothing is hosted and `url()` returns None.
+    """
+
+    def __init__(
+        self,
+        store,
+        get_channel: Callable[[int], discord.abc.Messageable | None],
+        channel_id: int | None,
+        max_px: int = ASSET_MAX_PX,
+    ):
+        self.store = store
+        self.get_channel = get_channel
+        self.channel_id = channel_id
+        self.max_px = max_px
+        self._records: dict[str, dict] = {}
+        self._retry_at: dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    def _payload(self, path: str) -> tuple[bytes, str]:
+        with open(path, "rb") as f:
+            data = f.read()
+        if self.max_px:
+            data = _downscale(data, self.max_px)
+        return data, hashlib.sha256(data).hexdigest()
+
+    async def url(self, path: str) -> str | None:
+        """CDN url for `path`, or None if it can't be hosted right now."""
+        if self.channel_id is None:
+            return None
+        rec = self._records.get(path)
+        if rec and _expires_at(rec["url"]) - time.time() > ASSET_REFRESH_MARGIN:
+            return rec["url"]
+        if time.time() < self._retry_at.get(path, 0):
+            return None
+        async with self._lock:
+            try:
+                return await self._resolve(path)
+            except Exception as e:
+                logging.error(f"⚠️ could not host asset {path}", exc_info=e)
+                self._retry_at[path] = time.time() + ASSET_RETRY_AFTER
+                return None
+
+    async def _resolve(self, path: str) -> str:
+        # keyed by file name, so moving the install doesn't re-upload
+        key = f"asset:{os.path.basename(path)}:{self.max_px}"
+        data, digest = self._payload(path)
+        rec = self._records.get(path) or json.loads(self.store.get_meta(key, "null"))
+        if rec and rec["sha256"] == digest:
+            if _expires_at(rec["url"]) - time.time() <= ASSET_REFRESH_MARGIN:
+                rec = await self._refresh(rec)
+        else:
+            rec = None
+        if rec is None:
+            rec = await self._upload(path, data, digest)
+        self._records[path] = rec
+        self.store.set_meta(key, json.dumps(rec))
+        return rec["url"]
+
+    async def _refresh(self, rec: dict) -> dict | None:
+        """Re-read the upload message for a freshly signed url."""
+        channel = self.get_channel(rec["channel_id"])
+        if channel is None:
+            return None
+        try:
+            msg = await channel.fetch_message(rec["message_id"])
+        except discord.NotFound:
+            return None
+        if not msg.attachments:
+            return None
+        return {**rec, "url": msg.attachments[0].url}
+
+    async def _upload(self, path: str, data: bytes, digest: str) -> dict:
+        channel = self.get_channel(self.channel_id)
+        if channel is None:
+            raise RuntimeError(f"asset channel {self.channel_id} not found")
+        name = os.path.basename(path)
+        msg = await channel.send(file=discord.File(io.BytesIO(data), filename=name))
+        logging.info(f"Uploaded asset {name} ({len(data)} bytes)")
+        return {
+            "channel_id": channel.id,
+            "message_id": msg.id,
+            "url": msg.attachments[0].url,
+            "sha256": digest,
+        }
@@ -0,0 +1,368 @@
+import asyncio
+import codecs
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Callable
+
+import httpx
+
+from metrics import Counter, Histogram
+from tracing import span
+
+
+# ─── Backend client config ───────────────────────────────────────────────────────
+def _env_float(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    return float(raw) if raw else default
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    return int(raw) if raw else default
+
+
+BACKEND_TIMEOUT = _env_float("BACKEND_TIMEOUT", 10.0)
+BACKEND_CONNECT_TIMEOUT = _env_float("BACKEND_CONNECT_TIMEOUT", 5.0)
+BACKEND_MAX_CONNECTIONS = _env_int("BACKEND_MAX_CONNECTIONS", 20)
+BACKEND_MAX_KEEPALIVE = _env_int("BACKEND_MAX_KEEPALIVE", 10)
+BACKEND_KEEPALIVE_EXPIRY = _env_float("BACKEND_KEEPALIVE_EXPIRY", 30.0)
+BACKEND_HTTP2 = os.getenv("BACKEND_HTTP2", "").lower() in ("1", "true", "yes")
+# decode whole-body responses with orjson (if installed) instead of json
+BACKEND_ORJSON = os.getenv("BACKEND_ORJSON", "").lower() in ("1", "true", "yes")
+# events handed to the caller at a time when streaming a large list
+BACKEND_STREAM_BATCH = _env_int("BACKEND_STREAM_BATCH", 1000)
+# fetch long id spans as blocks of this many ids, a few at a time; only for a
+# backend that honours the `until` bound (turned off if one is seen ignored)
+BACKEND_RANGES = os.getenv("BACKEND_RANGES", "").lower() in ("1", "true", "yes")
+BACKEND_RANGE_BLOCK = _env_int("BACKEND_RANGE_BLOCK", 10_000)
+BACKEND_RANGE_PARALLEL = _env_int("BACKEND_RANGE_PARALLEL", 4)
+BACKEND_RANGE_RETRIES = _env_int("BACKEND_RANGE_RETRIES", 3)
+# recent windows tried, narrowest first, when looking for the newest event id
+LATEST_ID_PROBE = (
+    timedelta(hours=1),
+    timedelta(days=1),
+    timedelta(days=7),
+    timedelta(days=30),
+    timedelta(days=365),
+)
+
+
+BACKEND_SECONDS = Histogram(
+    "killtracker_backend_request_seconds",
+    "Backend request duration",
+    ("method", "path"),
+)
+BACKEND_ERRORS = Counter(
+    "killtracker_backend_errors_total",
+    "Backend requests that failed or returned an error status",
+    ("method", "path"),
+)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _json_loads(use_orjson: bool) -> Callable[[bytes], object]:
+    if use_orjson:
+        try:
+            import orjson
+        except ImportError:
+            logging.warning("BACKEND_ORJSON is set but `orjson` is not installed")
+        else:
+            return orjson.loads
+    return json.loads
+
+
+_NUMBER_CHARS = "0123456789+-.eE"
+
+
+class JSONArrayStream:
+    """
+    Incremental decoder for a top-level JSON array. `feed()` takes raw bytes
+    as they arrive and returns the elements completed so far, so a large
+    response is never held as one string or decoded into one big list.
+    """
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._state = "open"  # open → first → next ⇄ more → closed
+
+    def _skip_ws(self, pos: int) -> int:
+        buf = self._buf
+        while pos < len(buf) and buf[pos] in " \t\r\n":
+            pos += 1
+        return pos
+
+    def feed(self, chunk: bytes, final: bool = False) -> list:
+        self._buf += self._text.decode(chunk, final)
+        buf, out, pos = self._buf, [], 0
+        while True:
+            pos = self._skip_ws(pos)
+            if pos == len(buf) or self._state == "closed":
+                break
+            c = buf[pos]
+            if self._state == "open":
+                if c != "[":
+                    raise ValueError(f"expected a JSON array, got {c!r}")
+                self._state, pos = "first", pos + 1
+            elif self._state in ("next", "first") and c == "]":
+                self._state, pos = "closed", pos + 1
+            elif self._state == "next":
+                if c != ",":
+                    raise ValueError(f"expected ',' or ']' at {pos}, got {c!r}")
+                self._state, pos = "more", pos + 1
+            else:
+                try:
+                    value, end = self._decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    break  # element still incomplete: wait for more bytes
+                if (
+                    not final
+                    and isinstance(value, (int, float))
+                    and not buf[end:].strip(_NUMBER_CHARS)
+                ):
+                    break  # a bare number might continue in the next chunk
+                out.append(value)
+                self._state, pos = "next", end
+        self._buf = buf[pos:]
+        return out
+
+    def close(self) -> list:
+        out = self.feed(b"", final=True)
+        if self._state != "closed" or self._buf.strip():
+            raise ValueError("truncated or trailing data after the JSON array")
+        return out
+
+
+class RangeUnsupported(Exception):
+    """The backend answered an id block without honouring its `until` bound."""
+
+
+class BackendClient:
+    """
+    One pooled, keep-alive httpx client shared by every command, poller and
+    view. Open it with `start()` when the bot boots and `close()` on shutdown.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        *,
+        timeout: float = BACKEND_TIMEOUT,
+        connect_timeout: float = BACKEND_CONNECT_TIMEOUT,
+        max_connections: int = BACKEND_MAX_CONNECTIONS,
+        max_keepalive: int = BACKEND_MAX_KEEPALIVE,
+        keepalive_expiry: float = BACKEND_KEEPALIVE_EXPIRY,
+        http2: bool = BACKEND_HTTP2,
+        range_fetch: bool = BACKEND_RANGES,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        if http2 and not _http2_available():
+            logging.warning(
+                "BACKEND_HTTP2 is set but `h2` is not installed; using HTTP/1.1"
+            )
+            http2 = False
+        self.http2 = http2
+        self.range_fetch = range_fetch
+        self.loads = _json_loads(BACKEND_ORJSON)
+        self._client: httpx.AsyncClient | None = None
+
+    # ─── lifecycle ───────────────────────────────────────────────────────────────
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            timeout=self.timeout,
+            limits=self.limits,
+            http2=self.http2,
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("BackendClient used before start()")
+        return self._client
+
+    # ─── requests ────────────────────────────────────────────────────────────────
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send one request, raising on error statuses; timed for /metrics."""
+        start = time.perf_counter()
+        with span("fetch", method=method, path=path) as s:
+            try:
+                resp = await self.client.request(method, path, **kwargs)
+                resp.raise_for_status()
+            except Exception:
+                BACKEND_ERRORS.inc(method=method, path=path)
+                raise
+            finally:
+                BACKEND_SECONDS.observe(
+                    time.perf_counter() - start, method=method, path=path
+                )
+            s.set(status=resp.status_code, bytes=len(resp.content))
+        return resp
+
+    async def get_json(
+        self, path: str, params: dict | None = None, headers: dict | None = None
+    ):
+        resp = await self.request("GET", path, params=params, headers=headers)
+        with span("decode", bytes=len(resp.content)) as s:
+            data = self.loads(resp.content)
+            if isinstance(data, list):
+                s.set(events=len(data))
+        return data
+
+    async def stream_json(
+        self, path: str, params: dict | None = None, batch: int = BACKEND_STREAM_BATCH
+    ) -> AsyncIterator[list]:
+        """
+        GET a list endpoint and yield its elements in batches of up to `batch`
+        as the (compressed) body streams in, decoding incrementally.
+        """
+        start = time.perf_counter()
+        try:
+            async with self.client.stream("GET", path, params=params) as resp:
+                if resp.is_error:
+                    await resp.aread()  # so the error's response.text is readable
+                resp.raise_for_status()
+                parser = JSONArrayStream()
+                pending: list = []
+                async for chunk in resp.aiter_bytes():
+                    pending.extend(parser.feed(chunk))
+                    while len(pending) >= batch:
+                        yield pending[:batch]
+                        del pending[:batch]
+                pending.extend(parser.close())
+                if pending:
+                    yield pending
+        except Exception:
+            BACKEND_ERRORS.inc(method="GET", path=path)
+            raise
+        finally:
+            BACKEND_SECONDS.observe(
+                time.perf_counter() - start, method="GET", path=path
+            )
+
+    async def post(
+        self, path: str, json=None, headers: dict | None = None
+    ) -> httpx.Response:
+        return await self.request("POST", path, json=json, headers=headers)
+
+    async def get_kills(self, params: dict | None = None) -> list[dict]:
+        return await self.get_json("/kills", params=params)
+
+    async def get_deaths(self, params: dict | None = None) -> list[dict]:
+        return await self.get_json("/deaths", params=params)
+
+    async def latest_id(self, path: str) -> int:
+        """
+        Newest event id at `path` (0 if empty). Asks for ever wider recent
+        windows via `since_time` and only falls back to the full collection
+        if nothing happened in the last year.
+        """
+        now = datetime.now(timezone.utc)
+        windows = [{"since_time": (now - w).isoformat()} for w in LATEST_ID_PROBE]
+        for params in (*windows, None):
+            latest = 0
+            async for batch in self.stream_json(path, params=params):
+                latest = max(latest, max(e["id"] for e in batch))
+            if latest:
+                return latest
+        return 0
+
+    async def _get_range(self, path: str, lo: int, hi: int) -> list[dict]:
+        """
+        Events with lo < id <= hi, retried with backoff on its own. Streamed,
+        so a backend that ignores `until` is caught at its first stray batch
+        (RangeUnsupported, and range fetching is turned off) rather than after
+        sending everything up to its newest event.
+        """
+        for attempt in range(BACKEND_RANGE_RETRIES + 1):
+            events: list[dict] = []
+            try:
+                async for batch in self.stream_json(
+                    path, params={"since": lo, "until": hi}
+                ):
+                    if max(e["id"] for e in batch) > hi:
+                        self.range_fetch = False
+                        raise RangeUnsupported(f"{path} ignores `until`")
+                    events.extend(batch)
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if attempt == BACKEND_RANGE_RETRIES:
+                    raise
+                delay = 2**attempt
+                logging.warning(
+                    f"{path} ids {lo}..{hi} failed ({type(e).__name__}); "
+                    f"retrying in {delay}s"
+                )
+                await asyncio.sleep(delay)
+            else:
+                return events
+
+    async def fetch_id_ranges(
+        self,
+        path: str,
+        since: int,
+        until: int,
+        block: int = BACKEND_RANGE_BLOCK,
+        parallel: int = BACKEND_RANGE_PARALLEL,
+    ) -> AsyncIterator[list[dict]]:
+        """
+        Fetch ids (since, until] as blocks of `block` ids, up to `parallel`
+        requests in flight, and yield each block's events in id order. A
+        failed block is retried by itself; the ones already fetched are kept.
+        """
+        bounds = [(lo, min(lo + block, until)) for lo in range(since, until, block)]
+        pending: list[asyncio.Task] = []
+        try:
+            for lo, hi in bounds:
+                pending.append(asyncio.create_task(self._get_range(path, lo, hi)))
+                if len(pending) >= parallel:
+                    yield await pending.pop(0)
+            while pending:
+                yield await pending.pop(0)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def fetch_kills_and_deaths(
+        self,
+        kill_params: dict | None = None,
+        death_params: dict | None = None,
+    ) -> tuple[list[dict], list[dict]]:
+        """
+        Fetch /kills and /deaths at the same time. `death_params` defaults to
+        `kill_params` so a shared window (e.g. since_time) only needs passing once.
+        """
+        if death_params is None:
+            death_params = kill_params
+        kills, deaths = await asyncio.gather(
+            self.get_kills(kill_params), self.get_deaths(death_params)
+        )
+        return kills, deaths
@@ -11,13 +11,43 @@ from dotenv import load_dotenv
 from discord import ui, ButtonStyle, Embed
 from discord.ui import View
 import traceback
-from datetime import datetime, date, time, timedelta, timezone
-from zoneinfo import ZoneInfo
+import hashlib
+from collections import deque
+import hmac
+import heapq
+import io
+import json
+import math
+from functools import partial
+from time import perf_counter
+from datetime import datetime, date, time, timezone
 from aiohttp import web
 import os
 import logging
-import threading
 from discord.app_commands import Choice
+from aggregates import AggregateEngine, WindowAggregate
+from assets import AssetManager
+from backend import BACKEND_RANGE_BLOCK, BackendClient, RangeUnsupported
+from event_cache import EventCache
+from event_store import EventStore
+from events import (
+    DEATH_REQUIRED,
+    KILL_REQUIRED,
+    invalid_fields,
+    missing_fields,
+    to_epoch,
+)
+from feed_queue import DISCORD_RATE_LIMITS, FeedCursor, FeedSender, embed_batches
+from guild_config import GuildConfig, GuildConfigs
+from metrics import REGISTRY, Gauge, Histogram
+from periods import EST, period_start_iso, period_window
+from player_index import PlayerIndex
+from poller import POLL_MIN_SECONDS, POLL_RECONCILE_SECONDS, PollState
+from profiling import CallProfile, Profile
+from result_cache import ResultCache
+from schedules import SCHEDULES, Schedule
+from tracing import span, start_span, traced
+from weapon_catalog import WeaponCatalog
 
 
 # ─── Load & validate env ─────────────────────────────────────────────────────────
@@ -28,8 +58,21 @@ API_KEY = os.getenv("BACKEND_KEY")
 KEY_CHANNEL_ID = int(
     os.getenv("KEY_CHANNEL_ID")
 )  # put your #kill-tracker-key channel’s ID here
-PU_KILL_FEED_ID = int(os.getenv("PU_KILL_FEED"))
-AC_KILL_FEED_ID = int(os.getenv("AC_KILL_FEED"))
+
+
+def _env_id(name: str) -> int | None:
+    raw = os.getenv(name)
+    return int(raw) if raw else None
+
+
+# the home guild's feed channels; they seed its /config on first start
+PU_KILL_FEED_ID = _env_id("PU_KILL_FEED")
+AC_KILL_FEED_ID = _env_id("AC_KILL_FEED")
+# bearer token for POST /ingest/kill|death (push ingestion is off without it)
+INGEST_KEY = os.getenv("INGEST_KEY")
+# a private channel where branding images are uploaded once for their CDN urls;
+# without one, every feed message attaches its own copy of the thumbnail
+ASSET_CHANNEL_ID = _env_id("ASSET_CHANNEL")
 
 
 if not TOKEN or not API_BASE or not API_KEY:
@@ -39,84 +82,47 @@ if not TOKEN or not API_BASE or not API_KEY:
     )
     raise SystemExit(1)
 
-# ─── Timezone setup ────────────────────────────────────────────────────────────────────
-EST = ZoneInfo("America/New_York")
-
 # ─── Guild ID setup ────────────────────────────────────────────────────────────────────
-GUILD_ID = int(os.getenv("GUILD_ID"))
+# commands are global; the home guild also gets the admin-only /debug tools,
+# and its env-configured channels become its /config the first time we start
+GUILD_ID = _env_id("GUILD_ID")
+STAR_CITIZEN_FEED_ID = _env_id("STAR_CITIZEN_FEED")
+HOME_GUILD = (
+    GuildConfig(
+        GUILD_ID,
+        pu_feed=PU_KILL_FEED_ID,
+        ac_feed=AC_KILL_FEED_ID,
+        summary_channel=STAR_CITIZEN_FEED_ID,
+        excluded_orgs=("THREER", "TRIPLER"),
+    )
+    if GUILD_ID
+    else None
+)
 
 # ─── ignore these NPCs ────────────────────────────────────────────────────────────
 IGNORED_VICTIM_PREFIX = ("vlk_juvenile_", "vlk_adult_", "Quasigrazer")
 
 # ─── weapon name translations ─────────────────────────────────────────────────────
-WEAPON_NAME_MAP: dict[str, str] = {
-    ##FPS WEAPONS
-    "behr_rifle_ballistic_01": "P4-AR Rifle",
-    "behr_rifle_ballistic_02": "P8-AR Rifle",
-    "klwe_rifle_energy_01": "Gallant Rifle",
-    "behr_sniper_ballistic_01": "P6-LR Sniper Rifle",
-    "gmni_lmg_ballistic_01": "F55 LMG",
-    "gmni_rifle_ballistic_01": "S71 Rifle",
-    "behr_lmg_ballistic_01": "FS-9 LMG",
-    "behr_smg_ballistic_01": "P8-SC SMG",
-    "none_shotgun_ballistic_01": "DEADRIG Shotgun",
-    "utfl_melee_01_red01_gungame": "FSK-8 BLOODLINE(GR FIRE KNIFE) Knife",
-    "klwe_lmg_energy_01": "Demeco LMG",
-    "ksar_rifle_energy_01": "Karna Rifle",
-    "gmni_smg_ballistic_01": "C54 SMG",
-    "ksar_shotgun_energy_01": "Devastator Shotgun",
-    "ksar_sniper_ballistic_01": "Scalpel Sniper Rifle",
-    "ksar_shotgun_ballistic_01": "Ravager-212 Shotgun",
-    "gmni_shotgun_ballistic_01": "R97 Shotgun",
-    "ksar_pistol_ballistic_01": "Coda Pistol",
-    "klwe_smg_energy_01": "Lumin V SMG",
-    "ksar_smg_energy_01": "Custodian SMG",
-    "gmni_pistol_ballistic_01": "LH86 Pistol",
-    "apar_special_ballistic_01": "Railgun",
-    "gmni_sniper_ballistic_01": "A03 Sniper Rifle",
-    "behr_shotgun_ballistic_01": "BR-2 Shotgun",
-    "behr_pistol_ballistic_01": "S-38 Pistol",
-    "lbco_pistol_energy_01": "Yubarev Pistol",
-    ##SHIPS
-    "MISC_Reliant_": "Reliant",
-    "AEGS_Gladius_": "Gladius",
-    "CNOU_Mustang_Alpha": "Mustang Alpha",
-    "MISC_Razor_EX": "Razor EX",
-    "ANVL_Hornet_F7A_Mk2_Exec": "F7A MK2 EXEC",
-    "ANVL_Hornet_F7A_Mk2": "F7A MK2",
-    "RSI_Aurora_MR": "Aurora MR",
-    "ANVL_C8R_Pisces": "C8R Pisces",
-    "MRCK_S03_AEGS_Sabre_Firebird": "Sabre Firebird",
-    "ANVL_Arrow": "Arrow",
-    "AMRS_LaserCannon_S4": "Scorpius",
-    "AEGS_Sabre_Comet": "Sabre Comet",
-    "CNOU_Nomad": "Nomad",
-    "ANVL_Hornet_F7CM": "F7C-M Super Hornet",
-    "CRUS_Starfighter_Inferno": "Ares Star Fighter Inferno",
-    "CRUS_Starlifter_C2": "C2 Hercules Starlifter",
-    "DRAK_Corsair": "Corsair",
-    "DRAK_Corsair_Exec": "Corsair EXEC",
-    ##SHIP WEAPONS
-    "KLWE_LaserRepeater_S3": "CF-337 Panther Repeater",
-    "MXOX_NeutronRepeater_S3": "NDB-30 Repeater",
-    "AMRS_LaserCannon_S4": "Omnisky XII Cannon",
-    "KLWE_LaserRepeater_S4": "CF-447 Rhino Repeater",
-    "POWR_AEGS_S01_Regulus_SCitem_": "Thunderbolt III Missile",
-    ##LOCATIONS
-    "util_a_orbital_001_occu": "LAMINA OLP",
-}
+# prefixes live in weapon_catalog.json and are hot-reloaded when the file changes
+WEAPON_CATALOG = WeaponCatalog()
+WEAPON_CATALOG.load()
 
 
 def format_weapon(raw: str) -> str:
     """
     Turn a kill/death weapon code like
      'behr_rifle_ballistic_01_spc_01_2681914…'
-    into 'P4-AR' (or fall back to the raw code).
+    into 'P4-AR' (or fall back to the raw code). The longest matching
+    catalog prefix wins.
     """
-    for key, pretty in WEAPON_NAME_MAP.items():
-        if raw.startswith(key):
-            return pretty
-    return raw
+    return WEAPON_CATALOG.resolve(raw)
+
+
+@tasks.loop(seconds=60)
+async def reload_weapon_catalog():
+    if WEAPON_CATALOG.reload_if_changed():
+        # weapon tallies are keyed by friendly name, so re-derive them
+        bot.aggregates.reset_weapon_names()
 
 
 # ─── Defines Mode Descriptions ────────────────────────────────────────────────────────────────────
@@ -131,11 +137,154 @@ def format_mode(raw: str) -> str:
 last_kill_id = 0
 last_death_id = 0  # track the highest death.id seen
 
+# after a restart, post at most this many missed cards per feed, none older
+# than this many hours; anything else in the gap is skipped
+FEED_CATCH_UP_MAX = int(os.getenv("FEED_CATCH_UP_MAX", "25"))
+FEED_CATCH_UP_HOURS = float(os.getenv("FEED_CATCH_UP_HOURS", "6"))
+
+THUMBNAIL_FILE = "3R_Transparent.png"
+# next to bot.py, so the bot (and the tools) can run from any directory
+THUMBNAIL_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), THUMBNAIL_FILE
+)
+
+
+async def _thumbnail_url() -> str:
+    """Hosted thumbnail url, falling back to a per-message attachment."""
+    return await bot.assets.url(THUMBNAIL_PATH) or f"attachment://{THUMBNAIL_FILE}"
+
+
+def _thumbnail_files(embeds: list[discord.Embed]) -> list[discord.File]:
+    # only cards built while the hosted copy was unavailable need the upload;
+    # one copy per message serves every card in it
+    if any((e.thumbnail.url or "").startswith("attachment://") for e in embeds):
+        return [discord.File(THUMBNAIL_PATH, filename=THUMBNAIL_FILE)]
+    return []
+
+
 # ─── Bot setup ────────────────────────────────────────────────────────────────────
+COMMAND_SECONDS = Histogram(
+    "killtracker_command_seconds",
+    "Slash command latency, from dispatch to completion",
+    ("command", "outcome"),
+)
+
+
+def _observe_command(interaction: discord.Interaction, outcome: str) -> None:
+    trace = interaction.extras.pop("span", None)
+    if trace is not None:
+        trace.set(outcome=outcome)
+        trace.end()
+    started = interaction.extras.get("started")
+    if started is not None and interaction.command is not None:
+        COMMAND_SECONDS.observe(
+            perf_counter() - started,
+            command=interaction.command.qualified_name,
+            outcome=outcome,
+        )
+
+
+class KillTrackerTree(app_commands.CommandTree):
+    """Command tree that times and traces every slash command."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.type is discord.InteractionType.application_command:
+            interaction.extras["started"] = perf_counter()
+            # the command body runs in this task, so its spans nest under this
+            name = interaction.data.get("name", "unknown")
+            interaction.extras["span"] = start_span("command", root=True, command=name)
+        return True
+
+    async def on_error(self, interaction, error):
+        _observe_command(interaction, "error")
+        await super().on_error(interaction, error)
+
+
+class _RateLimitCounter(logging.Handler):
+    """Counts the 429s discord.py's HTTP client absorbs and retries itself."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if "rate limited" in record.getMessage():
+            DISCORD_RATE_LIMITS.inc(source="http")
+
+
+logging.getLogger("discord.http").addHandler(_RateLimitCounter(logging.WARNING))
+
+
+class KillTrackerBot(commands.AutoShardedBot):
+    """Bot that owns the backend client and local event data for its lifetime."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.backend = BackendClient(API_BASE, API_KEY)
+        self.store = EventStore()
+        self.cache = EventCache()
+        # built command embeds, reused until new events arrive or they age out
+        self.results = ResultCache(
+            lambda: (len(self.cache.kills), len(self.cache.deaths))
+        )
+        # per-channel, rate-limited send queues for the kill / death feeds
+        self.feeds = FeedSender(self.get_channel, _thumbnail_files)
+        self.assets = AssetManager(self.store, self.get_channel, ASSET_CHANNEL_ID)
+        # last posted kill / death ids, checkpointed as cards go out
+        self.kill_cursor = FeedCursor(self.store, "cursor:kills")
+        self.death_cursor = FeedCursor(self.store, "cursor:deaths")
+        # adaptive interval, lag and error state of poll_feeds; with push
+        # ingestion enabled it only runs as a slow reconciliation sweep
+        self.poller = (
+            PollState(minimum=POLL_RECONCILE_SECONDS) if INGEST_KEY else PollState()
+        )
+        # on_ready runs after every gateway reconnect; only the first one boots
+        self.initialized = False
+        # set once startup has restored the feed cursors and caught up, so
+        # pushed events can't post (and checkpoint) ahead of the restart gap
+        self.feeds_ready = False
+        self.web: web.AppRunner | None = None
+
+    async def setup_hook(self):
+        # register the persistent view *before* we log in
+        self.add_view(GenerateKeyView())
+        await self.backend.start()
+        self.store.open()
+        self.cache.load(self.store)
+        self.use_data(self.store, self.cache)
+        # health, metrics and push ingestion, served from this event loop
+        self.web = web.AppRunner(_make_web_app())
+        await self.web.setup()
+        port = int(os.environ.get("PORT", 8080))
+        await web.TCPSite(self.web, "0.0.0.0", port).start()
+        logging.info(f"Started HTTP server on 0.0.0.0:{port}")
+
+    def use_data(self, store: EventStore, cache: EventCache) -> None:
+        """
+        Serve commands and feeds from an open `store` and its loaded `cache`,
+        building what depends on them (the tools point the bot at scratch data
+        the same way).
+        """
+        self.store, self.cache = store, cache
+        # per-guild feed / summary channels and filters, with the feed routing index
+        self.guild_configs = GuildConfigs(store, seed=HOME_GUILD)
+        # rolling leaderboard counters, fed by every event added to the cache
+        self.aggregates = AggregateEngine(cache, period_window, format_weapon)
+        # handle → that player's events, for /stats, /kd and /compare
+        self.players = PlayerIndex(cache)
+
+    async def close(self):
+        if self.web is not None:
+            await self.web.cleanup()
+        await self.feeds.close()
+        await super().close()
+        await self.backend.close()
+        self.store.close()
+
+
 intents = discord.Intents.default()
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = KillTrackerBot(command_prefix="!", intents=intents, tree_cls=KillTrackerTree)
+
 
-# Register the persistent view *before* we log in*
+@bot.event
+async def on_app_command_completion(interaction, command):
+    _observe_command(interaction, "ok")
 
 
 class GenerateKeyView(discord.ui.View):
@@ -154,16 +303,9 @@ class GenerateKeyView(discord.ui.View):
     ):
         try:
             await interaction.response.defer(ephemeral=True)
-            async with httpx.AsyncClient() as client:
-                resp = await client.post(
-                    f"{API_BASE}/keys",
-                    headers={
-                        "Authorization": f"Bearer {API_KEY}",
-                        "X-Discord-ID": str(interaction.user.id),
-                    },
-                    timeout=10.0,
-                )
-            resp.raise_for_status()
+            resp = await bot.backend.post(
+                "/keys", headers={"X-Discord-ID": str(interaction.user.id)}
+            )
             new_key = resp.json()["key"]
             await interaction.followup.send(
                 f"🔑 **Your API key** has been generated:\n```\n{new_key}\n```",
@@ -177,170 +319,144 @@ class GenerateKeyView(discord.ui.View):
             )
 
 
-## Compute “since_time” for each period
-def _period_start_iso(period: str) -> str:
-    now = datetime.now(EST)
-
-    if period == "today":
-        start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-
-    # 24 h rolling window (9 PM–9 PM)
-    elif period == "daily":
-        end = now.replace(hour=21, minute=0, second=0, microsecond=0)
-        start = end - timedelta(days=1)
-
-    # last 7 days
-    elif period in ("week", "weekly"):
-        start = now - timedelta(days=7)
+async def _restore_feed_cursor(cursor: FeedCursor, store_max: int, path: str) -> None:
+    """
+    Resume a feed from its checkpoint. Without one, start after the newest
+    event we know of: the mirror's high-water mark, else a cheap backend probe.
+    """
+    if cursor.ready or cursor.load():
+        return
+    latest = store_max or await bot.backend.latest_id(path)
+    cursor.reset(latest)
+    logging.info(f"No {cursor.key} checkpoint; starting the feed after id {latest}")
 
-    # last calendar month
-    elif period in ("month", "monthly"):
-        last_month = now.month - 1 or 12
-        year = now.year - (1 if now.month == 1 else 0)
-        start = datetime(year, last_month, 1, tzinfo=EST)
 
-    # last calendar quarter
-    elif period in ("quarter", "quarterly"):
-        # same as before but accept "quarter":
-        q = ((now.month - 1) // 3) or 4
-        year = now.year - (1 if q == 4 else 0)
-        start = datetime(year, (q - 1) * 3 + 1, 1, tzinfo=EST)
+def _bound_catch_up(events: list[dict], cursor: FeedCursor) -> list[dict]:
+    """
+    Apply the catch-up policy to the first batch after a restart: keep the
+    newest FEED_CATCH_UP_MAX events from the last FEED_CATCH_UP_HOURS and
+    mark the rest of the gap as skipped.
+    """
+    if not cursor.catching_up:
+        return events
+    cursor.catching_up = False
+    oldest = datetime.now(timezone.utc).timestamp() - FEED_CATCH_UP_HOURS * 3600
+    recent = [e for e in events if to_epoch(e["time"]) >= oldest]
+    keep = recent[-FEED_CATCH_UP_MAX:] if FEED_CATCH_UP_MAX > 0 else []
+    if len(keep) < len(events):
+        logging.info(
+            f"{cursor.key}: catching up on {len(keep)} of {len(events)} missed events"
+        )
+    kept = {e["id"] for e in keep}
+    for e in events:
+        if e["id"] not in kept:
+            cursor.skip(e["id"])
+    return keep
 
-    # last calendar year
-    elif period == "yearly":
-        start = datetime(now.year - 1, 1, 1, tzinfo=EST)
 
-    # all time (no slice)
-    elif period in ("all", "all time"):
-        # pick a date far in the past so the slice includes everything
-        start = datetime(1970, 1, 1, tzinfo=EST)
+async def _missed_batches(path: str, since: int):
+    """
+    Everything after `since`, oldest first. With BACKEND_RANGES on, a long gap
+    (a fresh deploy, a long outage) is fetched as parallel id blocks; the rest,
+    or everything if the backend turns out to ignore `until`, is streamed.
+    """
+    if bot.backend.range_fetch:
+        latest = await bot.backend.latest_id(path)
+        if latest - since > BACKEND_RANGE_BLOCK:
+            try:
+                async for batch in bot.backend.fetch_id_ranges(path, since, latest):
+                    if batch:
+                        yield batch
+                        since = max(since, max(e["id"] for e in batch))
+                since = latest
+            except RangeUnsupported as e:
+                logging.warning(f"{e}; streaming {path} after id {since} instead")
+    async for batch in bot.backend.stream_json(path, {"since": since}):
+        yield batch
+
+
+async def _hydrate(path: str, since: int, cursor: FeedCursor) -> list[dict]:
+    """
+    Write every event after `since` into the mirror batch by batch, so a long
+    outage never sits in memory as one response. Batches arrive in id order,
+    so if this fails part-way the mirror's high-water mark is where the poller
+    picks up, without refetching what was already mirrored. Returns the ones
+    the feed still owes, cut to the newest FEED_CATCH_UP_MAX that catch-up
+    could keep; posting the newest of them marks the older ones done.
+    """
+    add_store, add_cache = (
+        (bot.store.add_kills, bot.cache.add_kills)
+        if path == "/kills"
+        else (bot.store.add_deaths, bot.cache.add_deaths)
+    )
+    owed: deque[dict] = deque(maxlen=max(1, FEED_CATCH_UP_MAX))
+    count = 0
+    try:
+        async for batch in _missed_batches(path, since):
+            add_cache(add_store(batch))
+            owed.extend(e for e in batch if e["id"] > cursor.high)
+            count += len(batch)
+    except Exception as e:
+        logging.error(f"⚠️ Hydrating {path} failed after {count} events", exc_info=e)
+    if count:
+        logging.info(f"Hydrated {count} {path.lstrip('/')} after id {since}")
+    return list(owed)
 
-    else:
-        # fallback to a week
-        start = now - timedelta(days=7)
 
-    return start.astimezone(timezone.utc).isoformat()
+def _home_guild_only(command):
+    """
+    Register `command` on the home guild's tree only (and nowhere without
+    one), for tools other guilds' members must not reach.
+    """
+    if GUILD_ID:
+        bot.tree.add_command(command, guild=discord.Object(id=GUILD_ID))
+    return command
 
 
 # ─── TEST COMMANDS ─────────────────────────────────────────────────────────────
 
 
-@bot.tree.command(
+@_home_guild_only
+@app_commands.command(
     name="testdaily",
     description="Manually send the last 24 h (9 PM → 9 PM EST) summary",
-    guild=discord.Object(id=GUILD_ID),
 )
 async def testdaily(interaction: discord.Interaction):
-    embed = await _build_summary_embed("daily", "📅")
-    await interaction.response.send_message(embed=embed)
+    excluded = bot.guild_configs.get(interaction.guild_id).excluded_orgs
+    embed = _build_summary_embed("daily", "📅", excluded_orgs=excluded)
+    with span("send"):
+        await interaction.response.send_message(embed=embed)
 
 
-@bot.tree.command(
+@_home_guild_only
+@app_commands.command(
     name="testtoday",
     description="Show today's EST‐calendar summary (midnight → midnight)",
-    guild=discord.Object(id=GUILD_ID),
 )
 async def testtoday(interaction: discord.Interaction):
-    embed = await _build_summary_embed("today", "📅")
-    await interaction.response.send_message(embed=embed)
+    excluded = bot.guild_configs.get(interaction.guild_id).excluded_orgs
+    embed = _build_summary_embed("today", "📅", excluded_orgs=excluded)
+    with span("send"):
+        await interaction.response.send_message(embed=embed)
 
 
 # ─── Scheduled Cards (Leaderboards) ──────────────────────────────────────────────
-STAR_CITIZEN_FEED_ID = int(os.getenv("STAR_CITIZEN_FEED"))
-
-
-async def _fetch_events_for_period(period: str):
-    iso_start = _period_start_iso(period)
-    headers = {"Authorization": f"Bearer {API_KEY}"}
-    async with httpx.AsyncClient() as client:
-        r_k = await client.get(
-            f"{API_BASE}/kills",
-            params={"since_time": iso_start},
-            headers=headers,
-            timeout=10.0,
-        )
-        r_d = await client.get(
-            f"{API_BASE}/deaths",
-            params={"since_time": iso_start},
-            headers=headers,
-            timeout=10.0,
-        )
-        r_k.raise_for_status()
-        r_d.raise_for_status()
-        return r_k.json(), r_d.json()
-
-
-def _in_period(ts: str, period: str) -> bool:
-    # parse UTC timestamp, convert to local NY time
-    dt_utc = datetime.fromisoformat(ts.rstrip("Z")).replace(tzinfo=timezone.utc)
-    dt_local = dt_utc.astimezone(EST)
-    now_local = datetime.now(EST)
-
-    if period == "today":
-        # calendar‐day midnight→midnight
-        return dt_local.date() == now_local.date()
-
-    if period == "daily":
-        # 24 h slice: yesterday 9 PM → today 9 PM
-        end = now_local.replace(hour=21, minute=0, second=0, microsecond=0)
-        start = end - timedelta(days=1)
-        return start <= dt_local < end
-
-    if period == "weekly":
-        return (now_local - dt_local) < timedelta(days=7)
-
-    if period == "monthly":
-        # roll back into last calendar‐month
-        last_month = now_local.month - 1
-        year = now_local.year
-        if last_month == 0:
-            last_month = 12
-            year -= 1
-        return dt_local.year == year and dt_local.month == last_month
-
-    if period == "quarterly":
-        # figure out last quarter (1–4), rolling back into prior year if needed
-        current_q = (now_local.month - 1) // 3 + 1
-        last_q = current_q - 1
-        year = now_local.year
-        if last_q == 0:
-            last_q = 4
-            year -= 1
-        # start of last quarter
-        start_month = (last_q - 1) * 3 + 1
-        start = datetime(year, start_month, 1, tzinfo=EST)
-        # end = start of the next quarter
-        next_q = last_q + 1 if last_q < 4 else 1
-        end_year = year if next_q != 1 else year + 1
-        end_month = (next_q - 1) * 3 + 1
-        end = datetime(end_year, end_month, 1, tzinfo=EST)
-        return start <= dt_local < end
-
-    if period == "yearly":
-        # last calendar year
-        return dt_local.year == (now_local.year - 1)
-
-    return False
+def _top_list(counts: dict, top_n: int = 5) -> list[tuple]:
+    return heapq.nlargest(top_n, counts.items(), key=lambda x: x[1])
 
 
-def _top_list(counts: dict, top_n: int = 5) -> list[tuple]:
-    return sorted(counts.items(), key=lambda x: x[1], reverse=True)[:top_n]
-
-
-async def _build_summary_embed(period: str, emoji: str) -> discord.Embed:
-    # 1) only fetch events since period start
-    kills, deaths = await _fetch_events_for_period(period)
-    # 2) existing logic for filtering, counting, embedding…
-    kills_p = [k for k in kills if _in_period(k["time"], period)]
-    deaths_p = [
-        d
-        for d in deaths
-        if _in_period(d["time"], period) and d.get("damage_type") != "Suicide"
-    ]
+def _build_summary_embed(
+    period: str,
+    emoji: str,
+    w: WindowAggregate | None = None,
+    excluded_orgs: tuple[str, ...] = (),
+) -> discord.Embed:
+    # 1) roll the period's aggregate forward to now (unless given a snapshot)
+    w = w or bot.aggregates.window(period)
 
     # 2) Totals
-    total_kills = len(kills_p)
-    total_deaths = len(deaths_p)
+    total_kills = w.total_kills
+    total_deaths = w.total_deaths
     kd_ratio = total_kills / total_deaths if total_deaths else None
     kd_text = f"{kd_ratio:.2f}" if kd_ratio is not None else "N/A"
 
@@ -354,36 +470,27 @@ async def _build_summary_embed(period: str, emoji: str) -> discord.Embed:
     )
 
     # 4) Top Players by Kills
-    kc: dict[str, int] = {}
-    for k in kills_p:
-        kc[k["player"]] = kc.get(k["player"], 0) + 1
     lines = (
         "\n".join(
-            f"{i}. {p} — {c} Kills" for i, (p, c) in enumerate(_top_list(kc), start=1)
+            f"{i}. {p} — {c} Kills"
+            for i, (p, c) in enumerate(w.top(w.kills, 5), start=1)
         )
         or "None"
     )
     embed.add_field(name="🏆 Top Players (Kills)", value=lines, inline=False)
 
     # 5) Top Players by Deaths
-    dc: dict[str, int] = {}
-    for d in deaths_p:
-        dc[d["victim"]] = dc.get(d["victim"], 0) + 1
     lines = (
         "\n".join(
-            f"{i}. {p} — {c} Deaths" for i, (p, c) in enumerate(_top_list(dc), start=1)
+            f"{i}. {p} — {c} Deaths"
+            for i, (p, c) in enumerate(w.top(w.deaths, 5), start=1)
         )
         or "None"
     )
     embed.add_field(name="💀 Top Players (Deaths)", value=lines, inline=False)
 
     # 6) Top Players by K/D
-    stats: dict[str, dict[str, int]] = {}
-    for k in kills_p:
-        stats.setdefault(k["player"], {"kills": 0, "deaths": 0})["kills"] += 1
-    for d in deaths_p:
-        stats.setdefault(d["victim"], {"kills": 0, "deaths": 0})["deaths"] += 1
-    ratios = {p: v["kills"] / max(1, v["deaths"]) for p, v in stats.items()}
+    ratios = {p: r for p, _, _, r in w.ratios()}
     lines = (
         "\n".join(
             f"{i}. {p} — {r:.2f}" for i, (p, r) in enumerate(_top_list(ratios), start=1)
@@ -393,31 +500,16 @@ async def _build_summary_embed(period: str, emoji: str) -> discord.Embed:
     embed.add_field(name="⚖️ Top Players (K/D)", value=lines, inline=False)
 
     # 7) Top Organizations by Kills
-    oc: dict[str, int] = {}
-    for k in kills_p:
-        org = k.get("organization_name") or "Unknown"
-        oc[org] = oc.get(org, 0) + 1
-    # filter out Unknown, THREER, TRIPLER for leaderboard display
-    filtered = {
-        org: cnt
-        for org, cnt in oc.items()
-        if org not in ("Unknown", "THREER", "TRIPLER")
-    }
+    # filter out Unknown and the guild's excluded orgs for leaderboard display
+    filtered = w.top(w.orgs, 5, skip=("", "Unknown", *excluded_orgs))
     lines = (
-        "\n".join(
-            f"{i}. {o} — {c} kills"
-            for i, (o, c) in enumerate(_top_list(filtered), start=1)
-        )
+        "\n".join(f"{i}. {o} — {c} kills" for i, (o, c) in enumerate(filtered, start=1))
         or "None"
     )
     embed.add_field(name="🏢 Top Organization (Kills)", value=lines, inline=False)
 
-    # 8) Top Weapon
-    wc: dict[str, int] = {}
-    for k in kills_p:
-        name = format_weapon(k["weapon"])  # ← map raw ID → friendly
-        wc[name] = wc.get(name, 0) + 1
-
+    # 8) Top Weapon (tallied by friendly name as events arrive)
+    wc = w.weapons
     if wc:
         weapon, cnt = _top_list(wc, 1)[0]
         embed.add_field(
@@ -427,21 +519,15 @@ async def _build_summary_embed(period: str, emoji: str) -> discord.Embed:
         embed.add_field(name="🔫 Top Weapon", value="None", inline=True)
 
     # 9) Hot Zone (skip "Unknown")
-    zc: dict[str, int] = {}
-    for k in kills_p:
-        zone_name = k["zone"]
-        if zone_name in ("Unknown", "N/A"):
-            continue
-        zc[zone_name] = zc.get(zone_name, 0) + 1
-
+    zc = w.top(w.zones, 1, skip=("", "Unknown", "N/A"))
     if zc:
-        zone, cnt = _top_list(zc, 1)[0]
+        zone, cnt = zc[0]
         embed.add_field(name="📍 Hot Zone", value=f"{zone} ({cnt} kills)", inline=True)
     else:
         embed.add_field(name="📍 Hot Zone", value="None", inline=True)
 
     # 10) Active Players
-    active = len({k["player"] for k in kills_p} | {d["victim"] for d in deaths_p})
+    active = len(w.kills.keys() | w.deaths.keys())
     embed.add_field(name="👥 Active Players", value=str(active), inline=False)
 
     return embed
@@ -458,19 +544,14 @@ _PERIOD_DESC = {
 }
 
 
-async def _build_top_pu_embed(period: str) -> discord.Embed:
-    """Top 10 kills in Persistent Universe."""
-    kills, _ = await _fetch_events_for_period(period)
-    # filter by period  PU game_mode
-    filtered = [
-        k
-        for k in kills
-        if _in_period(k["time"], period) and k["game_mode"].startswith("SC_")
-    ]
-    counts = {}
-    for k in filtered:
-        counts[k["player"]] = counts.get(k["player"], 0) + 1
-    top10 = _top_list(counts, 10)
+def _top_family_kills(w: WindowAggregate, family: str, n: int = 10) -> list[tuple]:
+    """Top `n` players by kills in one game-mode family."""
+    return w.top(w.slice_counts(w.by_family, family), n)
+
+
+def _build_top_pu_embed(period: str, w: WindowAggregate | None = None) -> discord.Embed:
+    """Top 10 kills in Persistent Universe."""
+    top10 = _top_family_kills(w or bot.aggregates.window(period), "pu")
 
     embed = discord.Embed(
         title=f"🏆 Top Kills in PU ({period.capitalize()})",
@@ -482,21 +563,11 @@ async def _build_top_pu_embed(period: str) -> discord.Embed:
     return embed
 
 
-async def _build_top_ac_flight_embed(period: str) -> discord.Embed:
-    """Top 10 kills in AC Flight modes (Squadron Battle & Free Flight)."""
-    kills, _ = await _fetch_events_for_period(period)
-    modes = {"SquadronBattle", "FreeFlight"}
-    filtered = [
-        k
-        for k in kills
-        if _in_period(k["time"], period)
-        and k["game_mode"].startswith("EA_")
-        and k["game_mode"][3:] in modes
-    ]
-    counts = {}
-    for k in filtered:
-        counts[k["player"]] = counts.get(k["player"], 0) + 1
-    top10 = _top_list(counts, 10)
+def _build_top_ac_flight_embed(
+    period: str, w: WindowAggregate | None = None
+) -> discord.Embed:
+    """Top 10 kills in AC Flight modes (Squadron Battle & Free Flight)."""
+    top10 = _top_family_kills(w or bot.aggregates.window(period), "ac-flight")
 
     embed = discord.Embed(
         title=f"✈️ Top Kills in AC (Flight Modes) ({period.capitalize()})",
@@ -508,34 +579,12 @@ async def _build_top_ac_flight_embed(period: str) -> discord.Embed:
     return embed
 
 
-async def _build_top_ac_fps_embed(period: str) -> discord.Embed:
-    """Top 10 kills in AC FPS modes (Elimination, Kill Confirmed, Gun Game)."""
-    kills, _ = await _fetch_events_for_period(period)
-
-    # the “pure” FPS mode names we care about
-    modes = {"TeamElimination", "KillConfirmed", "GunGame"}
-
-    # filter by period  EA_ prefix  FPS suffix stripped
-    filtered = []
-    for k in kills:
-        if not _in_period(k["time"], period):
-            continue
-        gm = k["game_mode"]
-        if not gm.startswith("EA_"):
-            continue
-
-        sub = gm[3:]  # e.g. "FPSGunGame"
-        if sub.startswith("FPS"):
-            sub = sub[3:]  # strip off "FPS" → "GunGame"
-
-        if sub in modes:
-            filtered.append(k)
-
-    # tally per player
-    counts: dict[str, int] = {}
-    for k in filtered:
-        counts[k["player"]] = counts.get(k["player"], 0) + 1
-    top10 = _top_list(counts, 10)
+def _build_top_ac_fps_embed(
+    period: str, w: WindowAggregate | None = None
+) -> discord.Embed:
+    """Top 10 kills in AC FPS modes (Elimination, Kill Confirmed, Gun Game)."""
+    # tally per player (EA_ prefix, any "FPS" prefix stripped)
+    top10 = _top_family_kills(w or bot.aggregates.window(period), "ac-fps")
 
     # build the embed
     embed = discord.Embed(
@@ -555,166 +604,220 @@ async def _build_top_ac_fps_embed(period: str) -> discord.Embed:
     return embed
 
 
-# ─── Daily @ 9 PM America/New_York ────────────────────────────────────────────
-@tasks.loop(time=time(hour=21, minute=0, tzinfo=EST))
-async def daily_summary():
-    embed = await _build_summary_embed("daily", "📅")
-    chan = bot.get_channel(STAR_CITIZEN_FEED_ID)
-    if chan:
-        # 1) your existing summary
-        await chan.send(embed=embed)
-        # 2) the three new leaderboard cards
-        await chan.send(embed=await _build_top_pu_embed("daily"))
-        await chan.send(embed=await _build_top_ac_flight_embed("daily"))
-        await chan.send(embed=await _build_top_ac_fps_embed("daily"))
-
-
-# ─── Weekly (Mon) @ 9 PM America/New_York ──────────────────────────────────────
-@tasks.loop(time=time(hour=21, minute=0, tzinfo=EST))
-async def weekly_summary():
-    if datetime.now(EST).weekday() != 0:
-        return
-    embed = await _build_summary_embed("weekly", "🗓️")
-    chan = bot.get_channel(STAR_CITIZEN_FEED_ID)
-    if chan:
-        # 1) your existing summary
-        await chan.send(embed=embed)
-        # 2) the three new leaderboard cards
-        await chan.send(embed=await _build_top_pu_embed("weekly"))
-        await chan.send(embed=await _build_top_ac_flight_embed("weekly"))
-        await chan.send(embed=await _build_top_ac_fps_embed("weekly"))
-
-
-# ─── Monthly (1st) @ 9 PM America/New_York ─────────────────────────────────────
-@tasks.loop(time=time(hour=21, minute=0, tzinfo=EST))
-async def monthly_summary():
-    if datetime.now(EST).day != 1:
-        return
-    embed = await _build_summary_embed("monthly", "📆")
-    chan = bot.get_channel(STAR_CITIZEN_FEED_ID)
-    if chan:
-        # 1) your existing summary
-        await chan.send(embed=embed)
-        # 2) the three new leaderboard cards
-        await chan.send(embed=await _build_top_pu_embed("monthly"))
-        await chan.send(embed=await _build_top_ac_flight_embed("monthly"))
-        await chan.send(embed=await _build_top_ac_fps_embed("monthly"))
-
-
-# ─── Quarterly (Q-start) @ 9 PM America/New_York ───────────────────────────────
-@tasks.loop(time=time(hour=21, minute=0, tzinfo=EST))
-async def quarterly_summary():
-    now = datetime.now(EST)
-    if now.month not in (1, 4, 7, 10) or now.day != 1:
+# ─── Report pipeline ─────────────────────────────────────────────────────────────
+def _build_report(
+    period: str, emoji: str, snap: WindowAggregate, excluded_orgs: tuple[str, ...]
+) -> list[discord.Embed]:
+    """The summary plus the three top-kills cards, all from one data snapshot."""
+    return [
+        _build_summary_embed(period, emoji, snap, excluded_orgs),
+        _build_top_pu_embed(period, snap),
+        _build_top_ac_flight_embed(period, snap),
+        _build_top_ac_fps_embed(period, snap),
+    ]
+
+
+async def _post_report(
+    channels: list[discord.abc.Messageable],
+    period: str,
+    emoji: str,
+    snap: WindowAggregate,
+    excluded_orgs: tuple[str, ...] = (),
+) -> None:
+    """
+    Render the report once and send it to every channel that shares its
+    filters. A channel the bot can't post in is logged and skipped, so one
+    guild's misconfigured /config never holds back the others' reports.
+    """
+    with span("render", period=period):
+        batches = embed_batches(_build_report(period, emoji, snap, excluded_orgs))
+    with span("send", messages=len(batches), channels=len(channels)):
+        for chan in channels:
+            try:
+                for batch in batches:
+                    await chan.send(embeds=batch)
+            except Exception as e:
+                logging.error(
+                    f"⚠️ {period} report to channel {chan.id} failed, skipping it",
+                    exc_info=e,
+                )
+
+
+# ─── Report scheduler (9 PM America/New_York) ─────────────────────────────────
+_report_lock = asyncio.Lock()
+
+
+@traced("reports")
+async def _run_due_reports() -> None:
+    """
+    Post every scheduled report that came due since its last recorded run,
+    oldest first. Reports due at the same moment are all cut from the resident
+    cache in one step, and a run is recorded only once its cards were sent, so
+    a restart catches up on what it missed without posting anything twice.
+    """
+    # every guild's summary channel, grouped by the orgs its reports leave out
+    groups = {
+        excluded: chans
+        for excluded, ids in bot.guild_configs.summary_channels().items()
+        if (chans := [c for c in map(bot.get_channel, ids) if c])
+    }
+    if not groups:
         return
-    embed = await _build_summary_embed("quarterly", "📊")
-    chan = bot.get_channel(STAR_CITIZEN_FEED_ID)
-    if chan:
-        # 1) your existing summary
-        await chan.send(embed=embed)
-        # 2) the three new leaderboard cards
-        await chan.send(embed=await _build_top_pu_embed("quarterly"))
-        await chan.send(embed=await _build_top_ac_flight_embed("quarterly"))
-        await chan.send(embed=await _build_top_ac_fps_embed("quarterly"))
-
-
-# ─── Yearly (Jan 1) @ 9 PM America/New_York ────────────────────────────────────
+    async with _report_lock:
+        now = datetime.now(EST)
+        due: dict[datetime, list[Schedule]] = {}
+        for schedule in SCHEDULES:
+            last = bot.store.get_meta(schedule.key)
+            if last is None:
+                # first run ever: start the schedule now rather than replay history
+                bot.store.set_meta(schedule.key, int(now.timestamp()))
+                continue
+            for at in schedule.occurrences(int(last), now):
+                due.setdefault(at, []).append(schedule)
+
+        for at in sorted(due):
+            snaps = [(s, bot.aggregates.snapshot(s.period, at)) for s in due[at]]
+            for schedule, snap in snaps:
+                for excluded, chans in groups.items():
+                    await _post_report(
+                        chans, schedule.period, schedule.emoji, snap, excluded
+                    )
+                bot.store.set_meta(schedule.key, int(at.timestamp()))
+
+
 @tasks.loop(time=time(hour=21, minute=0, tzinfo=EST))
-async def yearly_summary():
-    now = datetime.now(EST)
-    if not (now.month == 1 and now.day == 1):
-        return
-    embed = await _build_summary_embed("yearly", "🎉")
-    chan = bot.get_channel(STAR_CITIZEN_FEED_ID)
-    if chan:
-        # 1) your existing summary
-        await chan.send(embed=embed)
-        # 2) the three new leaderboard cards
-        await chan.send(embed=await _build_top_pu_embed("yearly"))
-        await chan.send(embed=await _build_top_ac_flight_embed("yearly"))
-        await chan.send(embed=await _build_top_ac_fps_embed("yearly"))
+async def report_scheduler():
+    await _run_due_reports()
 
 
 # ─── api key generator ──────────────────────────────────────────────────
 
 
-@bot.event
-async def on_ready():
-    bot.add_view(GenerateKeyView())
+def _tree_fingerprint(guild: discord.abc.Snowflake | None) -> str:
+    """Hash of the guild's (or the global) command payloads, as they would be synced."""
+    payload = sorted(
+        (cmd.to_dict(bot.tree) for cmd in bot.tree.get_commands(guild=guild)),
+        key=lambda d: (d.get("type", 1), d["name"]),
+    )
+    blob = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
 
-    # Sync only to your guild for instant updates
-    guild = discord.Object(id=GUILD_ID)
+
+async def _sync_command_tree(guild: discord.abc.Snowflake | None = None) -> None:
+    """
+    Sync the global slash commands, or one guild's, but only when their
+    signatures changed.
+    """
+    scope = guild.id if guild else "global"
+    key = f"tree:{bot.application_id}:{scope}"
+    fingerprint = _tree_fingerprint(guild)
+    if bot.store.get_meta(key) == fingerprint:
+        print(f"🔁 Slash commands unchanged ({scope}), skipping sync")
+        return
     await bot.tree.sync(guild=guild)
-    print("🔁 Slash commands synced to guild")
+    bot.store.set_meta(key, fingerprint)
+    print(f"🔁 Slash commands synced ({scope})")
 
-    # post the “Generate Key” card if it’s not already there...
+
+async def _ensure_key_card() -> None:
+    """Post the “Generate Key” card unless the one we posted is still there."""
     channel = bot.get_channel(KEY_CHANNEL_ID)
-    if channel:
+    if not channel:
+        return
+    key = f"key_card:{KEY_CHANNEL_ID}"
+    card_id = bot.store.get_meta(key)
+    if card_id is not None:
+        try:
+            await channel.fetch_message(int(card_id))
+            return
+        except discord.NotFound:
+            pass
+    else:
+        # no record yet: adopt a card posted before ids were stored
         async for msg in channel.history(limit=50):
             if msg.author.id == bot.user.id and msg.embeds:
-                break
-        else:
-            embed = discord.Embed(
-                title="Generate RRRthurTracker Key",
-                description=(
-                    "Click the button below to generate a unique key for the "
-                    "RRRthur Pirate Kill Tracker. Use this key in your kill tracker "
-                    "client to post your kills in the #💀pu-kill-feed and/or "
-                    "#💀ac-kill-feed.\n\n"
-                    "Each key is valid for 72 hours. You may generate a new key at any time.\n\n"
-                ),
-                color=discord.Color.dark_gray(),
-            )
-            await channel.send(embed=embed, view=GenerateKeyView())
+                bot.store.set_meta(key, msg.id)
+                return
 
-    # prime last_kill_id
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{API_BASE}/kills", headers={"Authorization": f"Bearer {API_KEY}"}
-        )
-        resp.raise_for_status()
-        all_k = resp.json()
-    if all_k:
-        global last_kill_id
-        last_kill_id = max(k["id"] for k in all_k)
-
-    # prime last_death_id
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{API_BASE}/deaths", headers={"Authorization": f"Bearer {API_KEY}"}
-        )
-        resp.raise_for_status()
-        all_d = resp.json()
-    if all_d:
-        global last_death_id
-        last_death_id = max(d["id"] for d in all_d)
-
-    # start your kill loop
-    if not fetch_and_post_kills.is_running():
-        fetch_and_post_kills.start()
-
-    # **start your death loop** right here
-    if not fetch_and_post_deaths.is_running():
-        fetch_and_post_deaths.start()
-
-    # ─── Start summary-card loops ───────────────────────────────────────────────
-    if not daily_summary.is_running():
-        daily_summary.start()
-    if not weekly_summary.is_running():
-        weekly_summary.start()
-    if not monthly_summary.is_running():
-        monthly_summary.start()
-    if not quarterly_summary.is_running():
-        quarterly_summary.start()
-    if not yearly_summary.is_running():
-        yearly_summary.start()
+    embed = discord.Embed(
+        title="Generate RRRthurTracker Key",
+        description=(
+            "Click the button below to generate a unique key for the "
+            "RRRthur Pirate Kill Tracker. Use this key in your kill tracker "
+            "client to post your kills in the #💀pu-kill-feed and/or "
+            "#💀ac-kill-feed.\n\n"
+            "Each key is valid for 72 hours. You may generate a new key at any time.\n\n"
+        ),
+        color=discord.Color.dark_gray(),
+    )
+    msg = await channel.send(embed=embed, view=GenerateKeyView())
+    bot.store.set_meta(key, msg.id)
+
+
+@bot.event
+async def on_ready():
+    if bot.initialized:
+        # gateway reconnect: the loops, feeds and command tree are all still live
+        logging.info("🔌 Reconnected to Discord, nothing to re-initialize")
+        return
+    bot.initialized = True
+    try:
+        await _startup()
+    except Exception:
+        bot.initialized = False  # let the next on_ready try again
+        raise
+
+
+async def _startup() -> None:
+    """One-time initialization once the gateway is first ready."""
+    # global commands for every guild; the home guild's own tree holds /debug,
+    # /reportkill and the test commands
+    # (and syncing it clears the copies registered there before going global)
+    await _sync_command_tree()
+    if GUILD_ID:
+        await _sync_command_tree(discord.Object(id=GUILD_ID))
+    logging.info(f"Ready on {bot.shard_count or 1} shard(s), {len(bot.guilds)} guilds")
+
+    # post the “Generate Key” card if it’s not already there...
+    await _ensure_key_card()
+
+    # resume the feeds from their checkpoints; the pollers then fetch from
+    # whichever is further behind, the feed or the mirror, so one request
+    # both catches the feed up and brings the mirror current
+    global last_kill_id, last_death_id
+    store_kills, store_deaths = bot.store.max_kill_id(), bot.store.max_death_id()
+    await _restore_feed_cursor(bot.kill_cursor, store_kills, "/kills")
+    await _restore_feed_cursor(bot.death_cursor, store_deaths, "/deaths")
+    last_kill_id = min(bot.kill_cursor.high, store_kills)
+    last_death_id = min(bot.death_cursor.high, store_deaths)
+
+    # stream whatever was missed while offline before polling resumes
+    owed_kills = await _hydrate("/kills", last_kill_id, bot.kill_cursor)
+    owed_deaths = await _hydrate("/deaths", last_death_id, bot.death_cursor)
+    last_kill_id = max(last_kill_id, bot.store.max_kill_id())
+    last_death_id = max(last_death_id, bot.store.max_death_id())
+    await _ingest(owed_kills, owed_deaths)
+    bot.feeds_ready = True
+
+    # start the kill / death feed poller
+    if not poll_feeds.is_running():
+        poll_feeds.start()
+
+    if not reload_weapon_catalog.is_running():
+        reload_weapon_catalog.start()
+
+    # ─── Post any reports missed while offline, then run the scheduler ─────────
+    await _run_due_reports()
+    if not report_scheduler.is_running():
+        report_scheduler.start()
 
 
 # ─── /reportkill ─────────────────────────────────────────────────────────────────
-@bot.tree.command(
+# it posts to the shared backend with the bot's key, so it stays in the home guild
+@_home_guild_only
+@app_commands.command(
     name="reportkill",
     description="Log a kill (timestamp is set automatically)",
-    guild=discord.Object(id=GUILD_ID),
 )
 @app_commands.describe(
     player="Name of the killer",
@@ -749,7 +852,7 @@ async def reportkill(
     submode: str | None = None,
 ):
     await interaction.response.defer(ephemeral=True)
-    now_iso = datetime.utcnow().replace(tzinfo=timezone.utc).isoformat()
+    now_iso = datetime.now(timezone.utc).isoformat()
 
     # determine game_mode for the payload
     if mode == "ac-kill":
@@ -781,16 +884,8 @@ async def reportkill(
         "organization_url": None,
     }
 
-    headers = {"Authorization": f"Bearer {API_KEY}"}
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                f"{API_BASE}/reportKill",
-                json=payload,
-                headers=headers,
-                timeout=10.0,
-            )
-        resp.raise_for_status()
+        await bot.backend.post("/reportKill", json=payload)
 
     except httpx.HTTPStatusError as e:
         # catch 4xx/5xx from the API and show the body
@@ -810,9 +905,10 @@ async def reportkill(
         ephemeral=True,
     )
 
-    # 4) mirror to the feed channel
-    feed_id = PU_KILL_FEED_ID if mode == "pu-kill" else AC_KILL_FEED_ID
-    channel = bot.get_channel(feed_id)
+    # 4) mirror to this guild's feed channel
+    config = bot.guild_configs.get(interaction.guild_id)
+    feed_id = config.feed("pu" if mode == "pu-kill" else "ac")
+    channel = bot.get_channel(feed_id) if feed_id else None
     if channel:
         embed = discord.Embed(
             title="RRR Kill",
@@ -833,10 +929,38 @@ async def reportkill(
 
 
 # ─── /leaderboard ────────────────────────────────────────────────────────────────
+def _leaderboard_embed(period: str) -> discord.Embed:
+    # roll this period’s aggregate forward to now
+    w = bot.aggregates.window(period)
+
+    # Top 5 kills
+    top_k = w.top(w.kills, 5)
+    kill_lines = "\n".join(f"{i}. {p} — {c} Kills" for i, (p, c) in enumerate(top_k))
+
+    # Top 5 deaths
+    top_d = w.top(w.deaths, 5)
+    death_lines = "\n".join(f"{i}. {p} — {c} Deaths" for i, (p, c) in enumerate(top_d))
+
+    # Top 5 K/D
+    ratios = w.ratios()
+    top_ratio = sorted(ratios, key=lambda x: x[3], reverse=True)[:5]
+    kd_lines = "\n".join(
+        f"{i}. {p} — {ratio:.2f}" for i, (p, _, _, ratio) in enumerate(top_ratio)
+    )
+
+    embed = discord.Embed(
+        title=f"📊 Leaderboard ({period.capitalize()})",
+        color=discord.Color.purple(),
+    )
+    embed.add_field(name="🏆 Top Kills", value=kill_lines or "None", inline=False)
+    embed.add_field(name="💀 Top Deaths", value=death_lines or "None", inline=False)
+    embed.add_field(name="⚖️ Top K/D", value=kd_lines or "None", inline=False)
+    return embed
+
+
 @bot.tree.command(
     name="leaderboard",
     description="Combined leaderboards (top kills, deaths, K/D) for a period",
-    guild=discord.Object(id=GUILD_ID),
 )
 @app_commands.describe(
     period="today, week, month, or all time",
@@ -854,89 +978,18 @@ async def leaderboard(
     period: str,
 ):
     await interaction.response.defer()
-    # only fetch events since the start of this period
-    iso_start = _period_start_iso(period)
-    headers = {"Authorization": f"Bearer {API_KEY}"}
-
-    # fetch only this period’s kills & deaths
-    async with httpx.AsyncClient() as client:
-        r_k = await client.get(
-            f"{API_BASE}/kills",
-            params={"since_time": iso_start},
-            headers=headers,
-            timeout=10.0,
-        )
-        r_d = await client.get(
-            f"{API_BASE}/deaths",
-            params={"since_time": iso_start},
-            headers=headers,
-            timeout=10.0,
-        )
-        r_k.raise_for_status()
-        r_d.raise_for_status()
-        kills = r_k.json()
-        deaths = r_d.json()
-
-    def in_period(ts: str) -> bool:
-        dt_obj = datetime.fromisoformat(ts.rstrip("Z"))
-        now = datetime.utcnow()
-        if period == "today":
-            return dt_obj.date() == now.date()
-        if period == "week":
-            return (now - dt_obj).days < 7
-        if period == "month":
-            return now.year == dt_obj.year and dt_obj.month == now.month
-        return True
-
-    # Top 5 kills
-    kill_counts: dict[str, int] = {}
-    for e in kills:
-        if in_period(e["time"]):
-            kill_counts[e["player"]] = kill_counts.get(e["player"], 0) + 1
-    top_k = sorted(kill_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-    kill_lines = "\n".join(f"{i}. {p} — {c} Kills" for i, (p, c) in enumerate(top_k))
-
-    # Top 5 deaths
-    death_counts: dict[str, int] = {}
-    for e in deaths:
-        if in_period(e["time"]) and e.get("damage_type") != "Suicide":
-            death_counts[e["victim"]] = death_counts.get(e["victim"], 0) + 1
-    top_d = sorted(death_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-    death_lines = "\n".join(f"{i}. {p} — {c} Deaths" for i, (p, c) in enumerate(top_d))
-
-    # Top 5 K/D
-    stats: dict[str, dict[str, int]] = {}
-    for e in kills:
-        if in_period(e["time"]):
-            stats.setdefault(e["player"], {"kills": 0, "deaths": 0})["kills"] += 1
-    for e in deaths:
-        if in_period(e["time"]) and e.get("damage_type") != "Suicide":
-            stats.setdefault(e["victim"], {"kills": 0, "deaths": 0})["deaths"] += 1
-    ratios = [
-        (p, v["kills"], v["deaths"], v["kills"] / max(1, v["deaths"]))
-        for p, v in stats.items()
-    ]
-    top_ratio = sorted(ratios, key=lambda x: x[3], reverse=True)[:5]
-    kd_lines = "\n".join(
-        f"{i}. {p} — {ratio:.2f}" for i, (p, _, _, ratio) in enumerate(top_ratio)
+    embed = await bot.results.get(
+        ("leaderboard", period), lambda: _leaderboard_embed(period)
     )
 
-    embed = discord.Embed(
-        title=f"📊 Leaderboard ({period.capitalize()})",
-        color=discord.Color.purple(),
-    )
-    embed.add_field(name="🏆 Top Kills", value=kill_lines or "None", inline=False)
-    embed.add_field(name="💀 Top Deaths", value=death_lines or "None", inline=False)
-    embed.add_field(name="⚖️ Top K/D", value=kd_lines or "None", inline=False)
-
-    await interaction.followup.send(embed=embed)
+    with span("send"):
+        await interaction.followup.send(embed=embed)
 
 
 # ─── /stats ───────────────────────────────────────────────────────────────────────
 @bot.tree.command(
     name="stats",
     description="Show detailed stats for yourself or someone else",
-    guild=discord.Object(id=GUILD_ID),
 )
 @app_commands.describe(
     user="RSI handle (defaults to you)",
@@ -947,32 +1000,14 @@ async def stats(
 ):
     await interaction.response.defer()
     target = user or interaction.user.name
-    headers = {"Authorization": f"Bearer {API_KEY}"}
-
-    # fetch
-    async with httpx.AsyncClient() as client:
-        r_k = await client.get(f"{API_BASE}/kills", headers=headers, timeout=10.0)
-        r_d = await client.get(f"{API_BASE}/deaths", headers=headers, timeout=10.0)
-        r_k.raise_for_status()
-        r_d.raise_for_status()
-        kills = r_k.json()
-        deaths = r_d.json()
-
-    total_k = sum(1 for e in kills if e["player"] == target)
-    total_d = sum(
-        1 for e in deaths if e["victim"] == target and e.get("damage_type") != "Suicide"
-    )
+
+    # all-time counts from the per-player index
+    total_k = bot.players.kills(target)
+    total_d = bot.players.deaths(target)
     ratio = total_k / max(1, total_d)
 
-    # top 5 orgs they've killed
-    org_counts: dict[str, int] = {}
-    for e in kills:
-        if e["player"] == target:
-            org = e.get("organization_name") or "Unknown"
-            org_counts[org] = org_counts.get(org, 0) + 1
-    # toss out any “Unknown” buckets
-    filtered = {o: c for o, c in org_counts.items() if o != "Unknown"}
-    top_orgs = sorted(filtered.items(), key=lambda x: x[1], reverse=True)[:5]
+    # top 5 orgs they've killed (unknown orgs are skipped by the index)
+    top_orgs = bot.players.top_orgs(target, 5)
     org_lines = "\n".join(f"{o}: {c}" for o, c in top_orgs) or "None"
 
     embed = discord.Embed(
@@ -984,19 +1019,22 @@ async def stats(
     embed.add_field(name="K/D", value=f"{ratio:.2f}", inline=True)
     embed.add_field(name="Top Killed Orgs", value=org_lines, inline=False)
 
-    await interaction.followup.send(embed=embed)
+    with span("send"):
+        await interaction.followup.send(embed=embed)
 
 
 # ─── /compare ─────────────────────────────────────────────────────────────────────
 @bot.tree.command(
     name="compare",
-    description="Compare stats for two RSI handles",
-    guild=discord.Object(id=GUILD_ID),
+    description="Compare stats for two to five RSI handles",
 )
 @app_commands.describe(
     period="today, week, month, or all time",
     user1="First RSI handle",
     user2="Second RSI handle",
+    user3="Third RSI handle",
+    user4="Fourth RSI handle",
+    user5="Fifth RSI handle",
     mode="Which game‐mode slice to compare",
 )
 @app_commands.choices(
@@ -1018,89 +1056,36 @@ async def compare(
     period: str,
     user1: str,
     user2: str,
+    user3: str | None = None,
+    user4: str | None = None,
+    user5: str | None = None,
     mode: str = "all",
 ):
     await interaction.response.defer()
 
-    # Fetch once
-    headers = {"Authorization": f"Bearer {API_KEY}"}
-    async with httpx.AsyncClient() as client:
-        kills = (
-            await client.get(f"{API_BASE}/kills", headers=headers, timeout=10.0)
-        ).json()
-        deaths = (
-            await client.get(f"{API_BASE}/deaths", headers=headers, timeout=10.0)
-        ).json()
-
-    # Helpers
-    def in_period(ts: str) -> bool:
-        dt = datetime.fromisoformat(ts.rstrip("Z"))
-        now = datetime.utcnow()
-        if period == "today":
-            return dt.date() == now.date()
-        if period == "week":
-            return (now - dt).days < 7
-        if period == "month":
-            return (dt.year, dt.month) == (now.year, now.month)
-        return True
-
-    def in_mode(ev):
-        gm = ev["game_mode"]
-        if mode == "pu":
-            return gm.startswith("SC_")
-        if mode == "ac-flight":
-            return gm.startswith("EA_") and gm[3:] in {"SquadronBattle", "FreeFlight"}
-        if mode == "ac-fps":
-            # strip EA_ prefix and any leading "FPS"
-            if not gm.startswith("EA_"):
-                return False
-            sub = gm[3:]  # e.g. "FPSGunGame" or "Elimination"
-            if sub.startswith("FPS"):
-                sub = sub[3:]  # -> "GunGame"
-            return sub in {"TeamElimination", "KillConfirmed", "GunGame"}
-        return True
-
-    # Single stats_for, incorporating both filters
-    def stats_for(handle: str):
-        k = sum(
-            1
-            for e in kills
-            if e["player"] == handle and in_period(e["time"]) and in_mode(e)
-        )
-        d = sum(
-            1
-            for e in deaths
-            if e["victim"] == handle
-            and in_period(e["time"])
-            and in_mode(e)
-            and e.get("damage_type") != "Suicide"
-        )
-        return k, d, k / max(1, d)
-
-    # Compute
-    k1, d1, r1 = stats_for(user1)
-    k2, d2, r2 = stats_for(user2)
+    start, end = period_window(period)
+    handles = [h for h in (user1, user2, user3, user4, user5) if h]
 
     # Build & send embed
     embed = Embed(
-        title=f"🔍 Compare ({period.capitalize()} | {mode})\n{user1} vs {user2}",
+        title=f"🔍 Compare ({period.capitalize()} | {mode})\n" + " vs ".join(handles),
         color=Color.purple(),
     )
-    embed.add_field(
-        name=user1, value=f"Kills: {k1}\nDeaths: {d1}\nK/D: {r1:.2f}", inline=True
-    )
-    embed.add_field(
-        name=user2, value=f"Kills: {k2}\nDeaths: {d2}\nK/D: {r2:.2f}", inline=True
-    )
+    for handle in handles:
+        k = bot.players.kills(handle, start, end, mode)
+        d = bot.players.deaths(handle, start, end, mode)
+        embed.add_field(
+            name=handle, value=f"Kills: {k}\nDeaths: {d}\nK/D: {k / max(1, d):.2f}"
+        )
 
-    await interaction.followup.send(embed=embed)
+    with span("send"):
+        await interaction.followup.send(embed=embed)
 
 
 # ─── /kills ──────────────────────────────────────────────────────────────────────
 @bot.tree.command(
     name="kills",
     description="Show kills for a given period",
-    guild=discord.Object(id=GUILD_ID),
 )
 @app_commands.describe(period="Which time window to show kills for")
 @app_commands.choices(
@@ -1112,21 +1097,16 @@ async def compare(
     ]
 )
 async def kills(interaction: discord.Interaction, period: str):
-    iso_start = _period_start_iso(period)  # now `period` is defined
+    iso_start = period_start_iso(period)  # now `period` is defined
     await interaction.response.defer()
+    # only the newest 20 are shown: stream the period, don't hold all of it
+    data = deque(maxlen=20)
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{API_BASE}/kills",
-                params={"since_time": iso_start},
-                headers={"Authorization": f"Bearer {API_KEY}"},
-                timeout=10.0,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-    except httpx.HTTPStatusError:
+        async for batch in bot.backend.stream_json("/kills", {"since_time": iso_start}):
+            data.extend(batch)
+    except httpx.HTTPStatusError as e:
         return await interaction.followup.send(
-            f"❌ ListKills failed [{resp.status_code}]:\n```{resp.text}```"
+            f"❌ ListKills failed [{e.response.status_code}]:\n```{e.response.text}```"
         )
     except Exception as e:
         return await interaction.followup.send(f"❌ Error: `{e}`")
@@ -1136,20 +1116,36 @@ async def kills(interaction: discord.Interaction, period: str):
 
     # Build an embed “card”
     embed = discord.Embed(title="🗡️ Last 20 Kills", color=discord.Color.red())
-    for e in data[-20:]:
+    for e in data:
         embed.add_field(
             name=f"{e['player']} ➔ {e['victim']}",
             value=f"{e['time']} • {e['zone']} • {e['weapon']}",
             inline=False,
         )
-    await interaction.followup.send(embed=embed)
+    with span("send"):
+        await interaction.followup.send(embed=embed)
 
 
 # ─── /topkd ──────────────────────────────────────────────────────────────────────
+def _topkd_embed(period: str) -> discord.Embed:
+    # per-player tallies from the rolling aggregate
+    ratios = bot.aggregates.window(period).ratios(include_suicides=True)
+    top_list = sorted(ratios, key=lambda x: x[3], reverse=True)[:10]
+
+    embed = discord.Embed(
+        title=f"⚖️ Top 10 K/D ({period.capitalize()})",
+        color=discord.Color.blurple(),
+    )
+    for idx, (player, kc, dc, ratio) in enumerate(top_list, start=1):
+        embed.add_field(
+            name=f"{idx}. {player}", value=f"{kc}K / {dc}D → {ratio:.2f}", inline=False
+        )
+    return embed
+
+
 @bot.tree.command(
     name="topkd",
     description="Show the top 10 players by K/D ratio over a given period",
-    guild=discord.Object(id=GUILD_ID),
 )
 @app_commands.describe(
     period="today, week, month, or all time",
@@ -1167,60 +1163,16 @@ async def topkd(
     period: str,
 ):
     await interaction.response.defer()
-    headers = {"Authorization": f"Bearer {API_KEY}"}
-
-    # fetch both endpoints
-    async with httpx.AsyncClient() as client:
-        r_k = await client.get(f"{API_BASE}/kills", headers=headers, timeout=10.0)
-        r_d = await client.get(f"{API_BASE}/deaths", headers=headers, timeout=10.0)
-        r_k.raise_for_status()
-        r_d.raise_for_status()
-        kills = r_k.json()
-        deaths = r_d.json()
-
-    def in_period(ts: str) -> bool:
-        dt_obj = datetime.fromisoformat(ts.rstrip("Z"))
-        now = datetime.utcnow()
-        if period == "today":
-            return dt_obj.date() == now.date()
-        if period == "week":
-            return (now - dt_obj).days < 7
-        if period == "month":
-            return now.year == dt_obj.year and dt_obj.month == now.month
-        return True
-
-    # tally per player
-    stats: dict[str, dict[str, int]] = {}
-    for k in kills:
-        if in_period(k["time"]):
-            stats.setdefault(k["player"], {"kills": 0, "deaths": 0})["kills"] += 1
-    for d in deaths:
-        if in_period(d["time"]):
-            stats.setdefault(d["victim"], {"kills": 0, "deaths": 0})["deaths"] += 1
-
-    ratios = [
-        (p, v["kills"], v["deaths"], v["kills"] / max(1, v["deaths"]))
-        for p, v in stats.items()
-    ]
-    top_list = sorted(ratios, key=lambda x: x[3], reverse=True)[:10]
-
-    embed = discord.Embed(
-        title=f"⚖️ Top 10 K/D ({period.capitalize()})",
-        color=discord.Color.blurple(),
-    )
-    for idx, (player, kc, dc, ratio) in enumerate(top_list, start=1):
-        embed.add_field(
-            name=f"{idx}. {player}", value=f"{kc}K / {dc}D → {ratio:.2f}", inline=False
-        )
+    embed = await bot.results.get(("topkd", period), lambda: _topkd_embed(period))
 
-    await interaction.followup.send(embed=embed)
+    with span("send"):
+        await interaction.followup.send(embed=embed)
 
 
 # ─── /kd ──────────────────────────────────────────────────────────────────────
 @bot.tree.command(
     name="kd",
     description="Show your K/D (or someone else’s) over a given period",
-    guild=discord.Object(id=GUILD_ID),
 )
 @app_commands.describe(
     period="today, week, month, or all time",
@@ -1242,40 +1194,11 @@ async def kd(
     await interaction.response.defer()
     # fallback to yourself if user==None or blank
     target = user or interaction.user.name
-    headers = {"Authorization": f"Bearer {API_KEY}"}
-
-    # fetch events
-    async with httpx.AsyncClient() as client:
-        r_k = await client.get(f"{API_BASE}/kills", headers=headers, timeout=10.0)
-        r_d = await client.get(f"{API_BASE}/deaths", headers=headers, timeout=10.0)
-        r_k.raise_for_status()
-        r_d.raise_for_status()
-        kills = r_k.json()
-        deaths = r_d.json()
-
-    # helper to filter by period
-    def in_period(ts: str) -> bool:
-        dt_obj = datetime.fromisoformat(ts.rstrip("Z"))
-        now = datetime.utcnow()
-        if period == "today":
-            return dt_obj.date() == now.date()
-        if period == "week":
-            return (now - dt_obj).days < 7
-        if period == "month":
-            return now.year == dt_obj.year and dt_obj.month == now.month
-        return True
 
-    # count
-    total_kills = sum(
-        1 for k in kills if k["player"] == target and in_period(k["time"])
-    )
-    total_deaths = sum(
-        1
-        for d in deaths
-        if d["victim"] == target
-        and in_period(d["time"])
-        and d.get("damage_type") != "Suicide"
-    )
+    # count from the per-player index
+    start, end = period_window(period)
+    total_kills = bot.players.kills(target, start, end)
+    total_deaths = bot.players.deaths(target, start, end)
     ratio = total_kills / max(1, total_deaths)
 
     embed = discord.Embed(
@@ -1286,14 +1209,27 @@ async def kd(
     embed.add_field(name="Deaths", value=str(total_deaths), inline=True)
     embed.add_field(name="Ratio", value=f"{ratio:.2f}", inline=True)
 
-    await interaction.followup.send(embed=embed)
+    with span("send"):
+        await interaction.followup.send(embed=embed)
 
 
 # ─── /topkills ──────────────────────────────────────────────────────────────────────
+def _topkills_embed(mode: str, period: str, limit: int) -> discord.Embed:
+    w = bot.aggregates.window(period)
+    top_list = w.top(w.slice_counts(w.by_mode, mode), limit)
+
+    embed = discord.Embed(
+        title=f"🏆 Top {limit} Players by Kills ({mode.upper()} / {period.capitalize()})",
+        color=discord.Color.gold(),
+    )
+    for idx, (player, cnt) in enumerate(top_list, start=1):
+        embed.add_field(name=f"{idx}. {player}", value=f"{cnt} kills", inline=False)
+    return embed
+
+
 @bot.tree.command(
     name="topkills",
     description="Show the top N players by kills",
-    guild=discord.Object(id=GUILD_ID),
 )
 @app_commands.describe(
     mode="Public Universe or Arena Commander",
@@ -1316,52 +1252,41 @@ async def topkills(
     interaction: discord.Interaction, mode: str, period: str, limit: int = 10
 ):
     await interaction.response.defer()
-    iso_start = _period_start_iso(period)
-    headers = {"Authorization": f"Bearer {API_KEY}"}
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{API_BASE}/kills",
-            params={"since_time": iso_start},
-            headers=headers,
-            timeout=10.0,
-        )
-        resp.raise_for_status()
-        data = resp.json()
-
-    def in_period_ts(ts: str) -> bool:
-        dt = datetime.fromisoformat(ts.rstrip("Z"))
-        now = datetime.utcnow()
-        if period == "today":
-            return dt.date() == now.date()
-        if period == "week":
-            return (now - dt).days < 7
-        if period == "month":
-            return dt.year == now.year and dt.month == now.month
-        # “all” or anything else:
-        return True
+    embed = await bot.results.get(
+        ("topkills", mode, period, limit),
+        lambda: _topkills_embed(mode, period, limit),
+    )
 
-    stats: dict[str, int] = {}
-    for k in data:
-        if k["mode"] == mode and in_period_ts(k["time"]):
-            stats[k["player"]] = stats.get(k["player"], 0) + 1
+    with span("send"):
+        await interaction.followup.send(embed=embed)
 
-    top_list = sorted(stats.items(), key=lambda x: x[1], reverse=True)[:limit]
 
+# ─── /toporgs ──────────────────────────────────────────────────────────────────────
+def _toporgdeaths_embed(period: str, excluded_orgs: tuple[str, ...]) -> discord.Embed:
+    # 1) Tally per victim organization, filtering out unwanted organizations,
+    #    and pick the top 10
+    w = bot.aggregates.window(period)
+    top_list = w.top(w.orgs, 10, skip=("", "Unknown", *excluded_orgs))
+
+    # 2) Build embed
     embed = discord.Embed(
-        title=f"🏆 Top {limit} Players by Kills ({mode.upper()} / {period.capitalize()})",
-        color=discord.Color.gold(),
+        title=f"🏢 Top 10 Organizations by Times Killed ({period.capitalize()})",
+        color=discord.Color.dark_gray(),
     )
-    for idx, (player, cnt) in enumerate(top_list, start=1):
-        embed.add_field(name=f"{idx}. {player}", value=f"{cnt} kills", inline=False)
 
-    await interaction.followup.send(embed=embed)
+    if top_list:
+        for idx, (org, cnt) in enumerate(top_list, start=1):
+            embed.add_field(name=f"{idx}. {org}", value=f"{cnt} kills", inline=False)
+    else:
+        embed.description = (
+            "No organizations (other than Unknown) have kills in this period."
+        )
+    return embed
 
 
-# ─── /toporgs ──────────────────────────────────────────────────────────────────────
 @bot.tree.command(
     name="toporgdeaths",
     description="Show the top 10 organizations by how often they were killed",
-    guild=discord.Object(id=GUILD_ID),
 )
 @app_commands.describe(
     period="today, week, month, or all time",
@@ -1379,71 +1304,33 @@ async def toporgdeaths(
     period: str,
 ):
     await interaction.response.defer()
-    iso_start = _period_start_iso(period)
-    headers = {"Authorization": f"Bearer {API_KEY}"}
-
-    # 1) Fetch all kills
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{API_BASE}/kills",
-            params={"since_time": iso_start},
-            headers=headers,
-            timeout=10.0,
-        )
-        resp.raise_for_status()
-        kills = resp.json()
-
-    # 2) Period filter
-    def in_period(ts: str) -> bool:
-        dt_obj = datetime.fromisoformat(ts.rstrip("Z"))
-        now = datetime.utcnow()
-        if period == "today":
-            return dt_obj.date() == now.date()
-        if period == "week":
-            return (now - dt_obj).days < 7
-        if period == "month":
-            return now.year == dt_obj.year and dt_obj.month == now.month
-        return True  # all time
-
-    # 3) Tally per victim organization
-    counts: dict[str, int] = {}
-    for k in kills:
-        org = k.get("organization_name") or "Unknown"
-        if in_period(k["time"]):
-            counts[org] = counts.get(org, 0) + 1
-
-    # 4) Filter out unwanted organizations
-    filtered_counts = {
-        org: cnt
-        for org, cnt in counts.items()
-        if org not in ("Unknown", "THREER", "TRIPLER")
-    }
+    excluded = bot.guild_configs.get(interaction.guild_id).excluded_orgs
+    embed = await bot.results.get(
+        ("toporgdeaths", period, excluded),
+        lambda: _toporgdeaths_embed(period, excluded),
+    )
 
-    # 5) Pick the top 10 orgs (after filtering)
-    top_list = sorted(filtered_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+    with span("send"):
+        await interaction.followup.send(embed=embed)
+
+
+# ─── /topdeaths ───────────────────────────────────────────────────────────────
+def _topdeaths_embed(period: str, limit: int) -> discord.Embed:
+    w = bot.aggregates.window(period)
+    top_list = w.top(w.deaths_all, limit)
 
-    # 6) Build embed
     embed = discord.Embed(
-        title=f"🏢 Top 10 Organizations by Times Killed ({period.capitalize()})",
+        title=f"💀 Top {limit} Players by Deaths ({period.capitalize()})",
         color=discord.Color.dark_gray(),
     )
-
-    if top_list:
-        for idx, (org, cnt) in enumerate(top_list, start=1):
-            embed.add_field(name=f"{idx}. {org}", value=f"{cnt} kills", inline=False)
-    else:
-        embed.description = (
-            "No organizations (other than Unknown) have kills in this period."
-        )
-
-    await interaction.followup.send(embed=embed)
+    for idx, (player, cnt) in enumerate(top_list, start=1):
+        embed.add_field(name=f"{idx}. {player}", value=f"{cnt} deaths", inline=False)
+    return embed
 
 
-# ─── /topdeaths ───────────────────────────────────────────────────────────────
 @bot.tree.command(
     name="topdeaths",
     description="Show the top N players by how often they died",
-    guild=discord.Object(id=GUILD_ID),
 )
 @app_commands.describe(
     period="today, week, month, or all time",
@@ -1463,266 +1350,610 @@ async def topdeaths(
     limit: int = 10,
 ):
     await interaction.response.defer()
-    # only fetch deaths since the start of this period
-    iso_start = _period_start_iso(period)
-    headers = {"Authorization": f"Bearer {API_KEY}"}
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{API_BASE}/deaths",
-            params={"since_time": iso_start},
-            headers=headers,
-            timeout=10.0,
-        )
-        resp.raise_for_status()
-        deaths = resp.json()
-
-    def in_period(ts: str) -> bool:
-        dt_obj = datetime.fromisoformat(ts.rstrip("Z"))
-        now = datetime.utcnow()
-        if period == "today":
-            return dt_obj.date() == now.date()
-        if period == "week":
-            return (now - dt_obj).days < 7
-        if period == "month":
-            return now.year == dt_obj.year and dt_obj.month == dt_obj.month
-        return True
+    embed = await bot.results.get(
+        ("topdeaths", period, limit), lambda: _topdeaths_embed(period, limit)
+    )
 
-    counts: dict[str, int] = {}
-    for d in deaths:
-        if in_period(d["time"]):
-            counts[d["victim"]] = counts.get(d["victim"], 0) + 1
+    with span("send"):
+        await interaction.followup.send(embed=embed)
 
-    top_list = sorted(counts.items(), key=lambda x: x[1], reverse=True)[:limit]
 
-    embed = discord.Embed(
-        title=f"💀 Top {limit} Players by Deaths ({period.capitalize()})",
-        color=discord.Color.dark_gray(),
+# ─── /config (server admins) ─────────────────────────────────────────────────────
+config = app_commands.Group(
+    name="config",
+    description="Kill Tracker settings for this server",
+    guild_only=True,
+    default_permissions=discord.Permissions(manage_guild=True),
+)
+bot.tree.add_command(config)
+
+
+def _config_embed(c: GuildConfig) -> discord.Embed:
+    def channel(channel_id: int | None) -> str:
+        return f"<#{channel_id}>" if channel_id else "off"
+
+    embed = discord.Embed(title="⚙️ Kill Tracker settings", color=discord.Color.blue())
+    embed.add_field(name="PU feed", value=channel(c.pu_feed), inline=True)
+    embed.add_field(name="AC feed", value=channel(c.ac_feed), inline=True)
+    embed.add_field(name="Summaries", value=channel(c.summary_channel), inline=True)
+    embed.add_field(
+        name="Excluded orgs", value=", ".join(c.excluded_orgs) or "None", inline=False
     )
-    for idx, (player, cnt) in enumerate(top_list, start=1):
-        embed.add_field(name=f"{idx}. {player}", value=f"{cnt} deaths", inline=False)
+    embed.add_field(
+        name="Ignored victims",
+        value=", ".join(f"{p}…" for p in c.ignored_victims) or "None",
+        inline=False,
+    )
+    return embed
 
-    await interaction.followup.send(embed=embed)
 
+def _toggle(values: tuple[str, ...], value: str) -> tuple[str, ...]:
+    if value in values:
+        return tuple(v for v in values if v != value)
+    return (*values, value)
 
-# Keep track of the highest kill ID we've posted so far
 
+@config.command(name="show", description="Show this server's settings")
+async def config_show(interaction: discord.Interaction):
+    c = bot.guild_configs.get(interaction.guild_id)
+    await interaction.response.send_message(embed=_config_embed(c), ephemeral=True)
 
-@tasks.loop(seconds=10)
-async def fetch_and_post_kills():
-    global last_kill_id
-    try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{API_BASE}/kills",
-                params={"since": last_kill_id},  # <<–– only pull new ones
-                headers={"Authorization": f"Bearer {API_KEY}"},
-                timeout=10.0,
-            )
-            resp.raise_for_status()
-            kills = resp.json()
-    except Exception as e:
-        logging.error(
-            "⚠️ fetch_and_post_kills failed, will retry next iteration", exc_info=e
-        )
-        return  # swallow and let the loop fire again in 10s
-
-    for kill in sorted(kills, key=lambda e: e["id"]):
-        # 1️ skip stale
-        if kill["id"] <= last_kill_id:
-            continue
-
-        # 2️ skip any NPC sentry worms
-        if kill["victim"].startswith(IGNORED_VICTIM_PREFIX):
-            continue
-
-        feed_id = PU_KILL_FEED_ID if kill["mode"] == "pu-kill" else AC_KILL_FEED_ID
-        channel = bot.get_channel(feed_id)
-        if not channel:
-            continue
-
-        # build URLs and thumbnail
-        killer_profile = f"https://robertsspaceindustries.com/citizens/{kill['player']}"
-        victim_profile = f"https://robertsspaceindustries.com/citizens/{kill['victim']}"
-        file_to_attach = discord.File(
-            "3R_Transparent.png", filename="3R_Transparent.png"
-        )
-        thumb = "attachment://3R_Transparent.png"
 
-        embed = discord.Embed(
-            title="RRR Kill",
-            color=discord.Color.red(),
-            timestamp=discord.utils.parse_time(kill["time"]),
-        )
-        # Killer link (blue)
-        embed.add_field(
-            name="Killer", value=f"[{kill['player']}]({killer_profile})", inline=False
-        )
-        embed.add_field(
-            name="Victim", value=f"[{kill['victim']}]({victim_profile})", inline=True
+@config.command(name="feed", description="Post the PU or AC kill feed to a channel")
+@app_commands.describe(
+    kind="Which feed", channel="Where to post it (leave empty to turn it off)"
+)
+@app_commands.choices(
+    kind=[
+        Choice(name="Persistent Universe", value="pu"),
+        Choice(name="Arena Commander", value="ac"),
+    ]
+)
+async def config_feed(
+    interaction: discord.Interaction,
+    kind: str,
+    channel: discord.TextChannel | None = None,
+):
+    c = bot.guild_configs.update(
+        interaction.guild_id, **{f"{kind}_feed": channel.id if channel else None}
+    )
+    await interaction.response.send_message(embed=_config_embed(c), ephemeral=True)
+
+
+@config.command(name="summary", description="Post the scheduled reports to a channel")
+@app_commands.describe(channel="Where to post them (leave empty to turn them off)")
+async def config_summary(
+    interaction: discord.Interaction, channel: discord.TextChannel | None = None
+):
+    c = bot.guild_configs.update(
+        interaction.guild_id, summary_channel=channel.id if channel else None
+    )
+    await interaction.response.send_message(embed=_config_embed(c), ephemeral=True)
+
+
+@config.command(
+    name="exclude-org", description="Leave an org out of org leaderboards (toggle)"
+)
+@app_commands.describe(org="Organization name, e.g. your own")
+async def config_exclude_org(interaction: discord.Interaction, org: str):
+    c = bot.guild_configs.get(interaction.guild_id)
+    c = bot.guild_configs.update(
+        interaction.guild_id, excluded_orgs=_toggle(c.excluded_orgs, org)
+    )
+    await interaction.response.send_message(embed=_config_embed(c), ephemeral=True)
+
+
+@config.command(
+    name="ignore-victim",
+    description="Keep kills of these victims off the feed (toggle)",
+)
+@app_commands.describe(prefix="Victim name prefix, e.g. an NPC type")
+async def config_ignore_victim(interaction: discord.Interaction, prefix: str):
+    c = bot.guild_configs.get(interaction.guild_id)
+    c = bot.guild_configs.update(
+        interaction.guild_id, ignored_victims=_toggle(c.ignored_victims, prefix)
+    )
+    await interaction.response.send_message(embed=_config_embed(c), ephemeral=True)
+
+
+@bot.event
+async def on_guild_join(guild: discord.Guild):
+    logging.info(f"Joined {guild.name} ({guild.id}); feeds start once it runs /config")
+
+
+# ─── /debug profile (admin) ──────────────────────────────────────────────────────
+debug = app_commands.Group(
+    name="debug",
+    description="Admin diagnostics for the running bot",
+    default_permissions=discord.Permissions(administrator=True),
+)
+# it profiles the whole process, so only the home guild's admins get it
+_home_guild_only(debug)
+# tracemalloc and the sampler are process-wide: one profile at a time
+_profile_lock = asyncio.Lock()
+
+
+def _command_kwargs(command: app_commands.Command, args: list[str]) -> dict:
+    """Map `value ... option=value` onto a command's options, in order or by name."""
+    params = command.parameters
+    kwargs = {}
+    for i, arg in enumerate(args):
+        name, sep, value = arg.partition("=")
+        if not sep:
+            if i >= len(params):
+                raise ValueError(f"/{command.name} takes {len(params)} option(s)")
+            name, value = params[i].name, arg
+        param = next((p for p in params if p.name == name), None)
+        if param is None:
+            raise ValueError(f"/{command.name} has no option `{name}`")
+        if param.type is discord.AppCommandOptionType.integer:
+            value = int(value)
+        elif param.type is discord.AppCommandOptionType.number:
+            value = float(value)
+        elif param.type is discord.AppCommandOptionType.boolean:
+            value = value.lower() in ("1", "true", "yes")
+        kwargs[name] = value
+    missing = [p.name for p in params if p.required and p.name not in kwargs]
+    if missing:
+        raise ValueError(f"/{command.name} needs {', '.join(missing)}")
+    return kwargs
+
+
+@debug.command(
+    name="profile",
+    description="Profile the live bot for a while, or one run of a command",
+)
+@app_commands.describe(
+    seconds="How long to sample the running bot",
+    kind="What to profile",
+    command="Profile one run of this instead, e.g. `leaderboard all`",
+    top="How many functions / allocation sites to list",
+)
+@app_commands.choices(
+    kind=[
+        Choice(name="CPU + memory", value="both"),
+        Choice(name="CPU", value="cpu"),
+        Choice(name="Memory", value="memory"),
+    ]
+)
+@app_commands.checks.has_permissions(administrator=True)
+async def debug_profile(
+    interaction: discord.Interaction,
+    seconds: app_commands.Range[int, 1, 600] = 30,
+    kind: str = "both",
+    command: str | None = None,
+    top: app_commands.Range[int, 5, 100] = 25,
+):
+    if _profile_lock.locked():
+        return await interaction.response.send_message(
+            "⏳ A profile is already running.", ephemeral=True
         )
-        embed.add_field(
-            name="Zone",
-            value=format_weapon(kill["zone"]) or kill["zone"] or "Unknown",
-            inline=True,
+    cpu, memory = kind in ("cpu", "both"), kind in ("memory", "both")
+    async with _profile_lock:
+        if command:
+            name, *args = command.lstrip("/").split()
+            target = bot.tree.get_command(name) or bot.tree.get_command(
+                name, guild=interaction.guild
+            )
+            try:
+                if not isinstance(target, app_commands.Command):
+                    raise ValueError(f"no command `/{name}` to profile")
+                kwargs = _command_kwargs(target, args)
+            except ValueError as e:
+                return await interaction.response.send_message(
+                    f"❌ {e}", ephemeral=True
+                )
+            profile = CallProfile(cpu, memory)
+            profile.start()
+            try:
+                # the command answers this interaction as if run directly,
+                # building its reply rather than reusing a cached one
+                with bot.results.bypass():
+                    await target.callback(interaction, **kwargs)
+            finally:
+                profile.stop()
+            label = name
+        else:
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            profile = Profile(cpu, memory)
+            profile.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profile.stop()
+            label = f"{seconds}s"
+
+    # diffing big tracemalloc snapshots takes a while; keep it off the loop
+    report = await asyncio.to_thread(profile.report, top)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    file = discord.File(
+        io.BytesIO(report.encode()), filename=f"profile-{label}-{stamp}.txt"
+    )
+    send = (
+        interaction.followup.send
+        if interaction.response.is_done()
+        else interaction.response.send_message
+    )
+    await send(f"🩺 {kind} profile of `{command or label}`", file=file, ephemeral=True)
+
+
+@debug_profile.error
+async def debug_profile_error(interaction: discord.Interaction, error):
+    if isinstance(error, app_commands.MissingPermissions):
+        await interaction.response.send_message(
+            "❌ Only server admins can profile the bot.", ephemeral=True
         )
-        embed.add_field(name="Weapon", value=format_weapon(kill["weapon"]), inline=True)
-        embed.add_field(name="Damage", value=kill["damage_type"], inline=True)
+    else:
+        logging.error("/debug profile failed", exc_info=error)
+
+
+# ─── Feed ingestion ──────────────────────────────────────────────────────────────
+def _feed_channels(kind: str, victim: str | None = None) -> list[int]:
+    """Channels subscribed to the "pu" / "ac" feed that take this card."""
+    return [
+        r.channel_id
+        for r in bot.guild_configs.routes(kind)
+        if not (victim and victim.startswith(r.ignored_victims))
+        and bot.get_channel(r.channel_id)
+    ]
+
+
+def _queue_kill_card(kill: dict, thumb: str) -> None:
+    cursor = bot.kill_cursor
+    # skip any NPC sentry worms
+    if kill["victim"].startswith(IGNORED_VICTIM_PREFIX):
+        cursor.skip(kill["id"])
+        return
 
-        # use our formatter here:
-        display_mode = format_mode(kill["game_mode"])
-        embed.add_field(name="Mode", value=display_mode, inline=True)
+    kind = "pu" if kill["mode"] == "pu-kill" else "ac"
+    channels = _feed_channels(kind, kill["victim"])
+    if not channels:
+        cursor.skip(kill["id"])
+        return
+
+    # build profile URLs
+    killer_profile = f"https://robertsspaceindustries.com/citizens/{kill['player']}"
+    victim_profile = f"https://robertsspaceindustries.com/citizens/{kill['victim']}"
+
+    embed = discord.Embed(
+        title="RRR Kill",
+        color=discord.Color.red(),
+        timestamp=discord.utils.parse_time(kill["time"]),
+    )
+    # Killer link (blue)
+    embed.add_field(
+        name="Killer", value=f"[{kill['player']}]({killer_profile})", inline=False
+    )
+    embed.add_field(
+        name="Victim", value=f"[{kill['victim']}]({victim_profile})", inline=True
+    )
+    embed.add_field(
+        name="Zone",
+        value=format_weapon(kill["zone"]) or kill["zone"] or "Unknown",
+        inline=True,
+    )
+    embed.add_field(name="Weapon", value=format_weapon(kill["weapon"]), inline=True)
+    embed.add_field(name="Damage", value=kill["damage_type"], inline=True)
+
+    # use our formatter here:
+    display_mode = format_mode(kill["game_mode"])
+    embed.add_field(name="Mode", value=display_mode, inline=True)
+
+    embed.add_field(
+        name="Killer’s Ship",
+        value=format_weapon(kill["killers_ship"]) or "Unknown",
+        inline=True,
+    )
+    embed.add_field(
+        name="Victim’s Ship",
+        value=format_weapon(kill.get("victim_ship") or "") or "Unknown",
+        inline=True,
+    )
 
+    org_name = kill.get("organization_name") or "Unknown"
+    org_url = kill.get("organization_url")
+    if org_url:
         embed.add_field(
-            name="Killer’s Ship",
-            value=format_weapon(kill["killers_ship"]) or "Unknown",
-            inline=True,
+            name="Victim Organization",
+            value=f"[{org_name}]({org_url})",
+            inline=False,
         )
+    else:
+        embed.add_field(name="Victim Organization", value=org_name, inline=False)
+
+    embed.set_thumbnail(url=thumb)
+    # one card, sent to every subscribed guild
+    cursor.queued(kill["id"])
+    bot.feeds.fan_out(channels, embed, on_sent=partial(cursor.done, kill["id"]))
+
+
+def _queue_death_card(death: dict, thumb: str) -> None:
+    cursor = bot.death_cursor
+    # route Persistent Universe → PU feeds; everything else → AC
+    channels = _feed_channels("pu" if death["game_mode"].startswith("SC_") else "ac")
+    if not channels:
+        cursor.skip(death["id"])
+        return
+
+    embed = discord.Embed(
+        title="💀 You Died",
+        color=discord.Color.dark_gray(),
+        timestamp=discord.utils.parse_time(death["time"]),
+    )
+
+    killer_profile = death.get("rsi_profile")
+    embed.add_field(
+        name="Killer", value=f"[{death['killer']}]({killer_profile})", inline=False
+    )
+
+    victim_profile = f"https://robertsspaceindustries.com/citizens/{death['victim']}"
+    embed.add_field(
+        name="Victim (You)",
+        value=f"[{death['victim']}]({victim_profile})",
+        inline=True,
+    )
+    embed.add_field(
+        name="Zone",
+        value=format_weapon(death["zone"]) or death["zone"] or "Unknown",
+        inline=True,
+    )
+    embed.add_field(name="Weapon", value=format_weapon(death["weapon"]), inline=True)
+    embed.add_field(name="Damage", value=death["damage_type"], inline=True)
+
+    display_mode = format_mode(death["game_mode"])
+    embed.add_field(name="Mode", value=display_mode, inline=True)
+
+    embed.add_field(
+        name="Killer’s Ship",
+        value=format_weapon(death["killers_ship"]) or "Unknown",
+        inline=True,
+    )
+    embed.add_field(
+        name="Your Ship",
+        value=format_weapon(death.get("victim_ship") or "") or "Unknown",
+        inline=True,
+    )
+
+    org_name = death.get("organization_name") or "Unknown"
+    org_url = death.get("organization_url")
+    if org_url:
         embed.add_field(
-            name="Victim’s Ship",
-            value=format_weapon(kill.get("victim_ship") or "") or "Unknown",
-            inline=True,
+            name="Killer’s Organization",
+            value=f"[{org_name}]({org_url})",
+            inline=False,
         )
+    else:
+        embed.add_field(name="Killer’s Organization", value=org_name, inline=False)
 
-        org_name = kill.get("organization_name") or "Unknown"
-        org_url = kill.get("organization_url")
-        if org_url:
-            embed.add_field(
-                name="Victim Organization",
-                value=f"[{org_name}]({org_url})",
-                inline=False,
-            )
-        else:
-            embed.add_field(name="Victim Organization", value=org_name, inline=False)
+    embed.set_thumbnail(url=thumb)
+    cursor.queued(death["id"])
+    bot.feeds.fan_out(channels, embed, on_sent=partial(cursor.done, death["id"]))
 
-        embed.set_thumbnail(url=thumb)
-        await channel.send(embed=embed, file=file_to_attach)
 
-        last_kill_id = kill["id"]
+def _unposted(events: list[dict], new: list[dict], cursor: FeedCursor) -> list[dict]:
+    """
+    Events the feed has not posted yet, oldest first, catch-up bounded: those
+    past the cursor, plus late arrivals the mirror had never seen (an older id
+    pushed after a newer one) that are still newer than where this boot began.
+    """
+    new_ids = {e["id"] for e in new}
+    events = sorted(
+        (
+            e
+            for e in events
+            if e["id"] > cursor.high or (e["id"] in new_ids and e["id"] > cursor.floor)
+        ),
+        key=lambda e: e["id"],
+    )
+    return _bound_catch_up(events, cursor)
 
 
-# Keep track of the last‑seen death time
+async def _ingest(kills: list[dict], deaths: list[dict]) -> None:
+    """
+    Mirror newly seen kills and deaths for analytics, then queue feed cards
+    for the ones not posted yet, kills and deaths interleaved in time order.
+    Used by both the poller and the push endpoint.
+    """
+    thumb = await _thumbnail_url()
+    # no awaits from here on, so concurrent ingests can't post an event twice
+    with span("mirror", kills=len(kills), deaths=len(deaths)) as s:
+        new_kills = bot.store.add_kills(kills)
+        new_deaths = bot.store.add_deaths(deaths)
+        bot.cache.add_kills(new_kills)
+        bot.cache.add_deaths(new_deaths)
+        s.set(new=len(new_kills) + len(new_deaths))
+
+    with span("queue") as s:
+        kills = _unposted(kills, new_kills, bot.kill_cursor)
+        deaths = _unposted(deaths, new_deaths, bot.death_cursor)
+        merged = heapq.merge(
+            ((to_epoch(k["time"]), "kill", k) for k in kills),
+            ((to_epoch(d["time"]), "death", d) for d in deaths),
+            key=lambda x: x[0],
+        )
+        for _, kind, event in merged:
+            if kind == "kill":
+                _queue_kill_card(event, thumb)
+            else:
+                _queue_death_card(event, thumb)
+        s.set(cards=len(kills) + len(deaths))
 
 
-@tasks.loop(seconds=10)
-async def fetch_and_post_deaths():
-    global last_death_id
+POLL_SECONDS = Histogram(
+    "killtracker_poll_seconds", "Time to fetch new kills and deaths in one poll"
+)
+
 
+@tasks.loop(seconds=POLL_MIN_SECONDS)
+@traced("poll")
+async def poll_feeds():
+    """
+    Fetch new kills and deaths together and post them. The interval drops to
+    POLL_MIN_SECONDS while events flow and backs off (with jitter) when idle
+    or when the backend errors.
+    """
+    global last_kill_id, last_death_id
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{API_BASE}/deaths",
-                params={"since": last_death_id},  # <<–– only pull new ones
-                headers={"Authorization": f"Bearer {API_KEY}"},
-                timeout=10.0,
+        # <<–– only pull new ones
+        with POLL_SECONDS.time():
+            kills, deaths = await bot.backend.fetch_kills_and_deaths(
+                {"since": last_kill_id}, {"since": last_death_id}
             )
-            resp.raise_for_status()
-            deaths = resp.json()
     except Exception as e:
+        delay = bot.poller.failure()
+        logging.error(f"⚠️ poll_feeds failed, retrying in {delay:.0f}s", exc_info=e)
+        poll_feeds.change_interval(seconds=delay)
+        return
+
+    try:
+        await _ingest(kills, deaths)
+    except Exception as e:
+        # the cursors stay put, so the next poll fetches these events again
+        delay = bot.poller.failure()
         logging.error(
-            "⚠️ fetch_and_post_deaths failed, will retry next iteration", exc_info=e
+            f"⚠️ ingesting {len(kills)} kills / {len(deaths)} deaths failed, "
+            f"retrying in {delay:.0f}s",
+            exc_info=e,
         )
+        poll_feeds.change_interval(seconds=delay)
         return
 
-    for death in sorted(deaths, key=lambda e: e["id"]):
-        # skip any we’ve already seen
-        if death["id"] <= last_death_id:
-            continue
+    last_kill_id = max([last_kill_id, *(k["id"] for k in kills)])
+    last_death_id = max([last_death_id, *(d["id"] for d in deaths)])
+    newest = max((to_epoch(e["time"]) for e in (*kills, *deaths)), default=None)
+    poll_feeds.change_interval(seconds=bot.poller.success(newest))
 
-        file_to_attach = discord.File(
-            "3R_Transparent.png", filename="3R_Transparent.png"
-        )
-        thumb = "attachment://3R_Transparent.png"
 
-        # route Persistent Universe → PU feed; everything else → AC
-        feed_id = (
-            PU_KILL_FEED_ID if death["game_mode"].startswith("SC_") else AC_KILL_FEED_ID
-        )
-        channel = bot.get_channel(feed_id)
-        if not channel:
-            continue
+# ─── HTTP server: health, metrics, push ingestion ───────────────────────────────
+# /health fails once the last successful poll is older than this
+HEALTH_MAX_POLL_AGE = float(os.getenv("HEALTH_MAX_POLL_AGE", "300"))
 
-        embed = discord.Embed(
-            title="💀 You Died",
-            color=discord.Color.dark_gray(),
-            timestamp=discord.utils.parse_time(death["time"]),
-        )
 
-        killer_profile = death.get("rsi_profile")
-        embed.add_field(
-            name="Killer", value=f"[{death['killer']}]({killer_profile})", inline=False
-        )
+async def handle_health(request):
+    problems = []
+    if bot.is_closed() or not bot.is_ready():
+        problems.append("discord gateway not ready")
+    elif not math.isfinite(bot.latency):
+        problems.append("no discord heartbeat")
+    last_poll = bot.poller.last_success
+    max_age = max(HEALTH_MAX_POLL_AGE, 3 * bot.poller.maximum)
+    if bot.initialized and (
+        last_poll is None
+        or datetime.now(timezone.utc).timestamp() - last_poll > max_age
+    ):
+        problems.append("feed poller stalled")
+    return web.json_response(
+        {
+            "status": "unavailable" if problems else "ok",
+            "problems": problems,
+            "poller": bot.poller.snapshot(),
+            "feed_queue": bot.feeds.pending(),
+        },
+        status=503 if problems else 200,
+    )
 
-        victim_profile = (
-            f"https://robertsspaceindustries.com/citizens/{death['victim']}"
-        )
-        embed.add_field(
-            name="Victim (You)",
-            value=f"[{death['victim']}]({victim_profile})",
-            inline=True,
-        )
-        embed.add_field(
-            name="Zone",
-            value=format_weapon(death["zone"]) or death["zone"] or "Unknown",
-            inline=True,
-        )
-        embed.add_field(
-            name="Weapon", value=format_weapon(death["weapon"]), inline=True
-        )
-        embed.add_field(name="Damage", value=death["damage_type"], inline=True)
 
-        display_mode = format_mode(death["game_mode"])
-        embed.add_field(name="Mode", value=display_mode, inline=True)
+async def handle_metrics(request):
+    return web.Response(
+        text=REGISTRY.render(), content_type="text/plain", charset="utf-8"
+    )
 
-        embed.add_field(
-            name="Killer’s Ship",
-            value=format_weapon(death["killers_ship"]) or "Unknown",
-            inline=True,
-        )
-        embed.add_field(
-            name="Your Ship",
-            value=format_weapon(death.get("victim_ship") or "") or "Unknown",
-            inline=True,
-        )
 
-        org_name = death.get("organization_name") or "Unknown"
-        org_url = death.get("organization_url")
-        if org_url:
-            embed.add_field(
-                name="Killer’s Organization",
-                value=f"[{org_name}]({org_url})",
-                inline=False,
+async def handle_ingest(request):
+    """
+    Push one event or a JSON list of events of one kind straight into the
+    feed path: POST /ingest/kill or /ingest/death, `Authorization: Bearer
+    <INGEST_KEY>`. Events already seen (e.g. by the poller) are ignored.
+    """
+    if not INGEST_KEY:
+        return web.json_response({"error": "push ingestion disabled"}, status=404)
+    auth = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(auth.encode(), f"Bearer {INGEST_KEY}".encode()):
+        return web.json_response({"error": "unauthorized"}, status=401)
+    if not bot.feeds_ready:
+        return web.json_response({"error": "bot not ready"}, status=503)
+
+    try:
+        body = await request.json()
+    except ValueError:
+        return web.json_response({"error": "body must be JSON"}, status=400)
+    events = body if isinstance(body, list) else [body]
+    kind = request.match_info["kind"]
+    required = KILL_REQUIRED if kind == "kill" else DEATH_REQUIRED
+    for i, event in enumerate(events):
+        missing = missing_fields(event, required)
+        if missing:
+            return web.json_response(
+                {"error": f"event {i} is missing {', '.join(missing)}"}, status=400
+            )
+        invalid = invalid_fields(event, required)
+        if invalid:
+            return web.json_response(
+                {"error": f"event {i} has an invalid {', '.join(invalid)}"}, status=400
             )
-        else:
-            embed.add_field(name="Killer’s Organization", value=org_name, inline=False)
 
-        embed.set_thumbnail(url=thumb)
-        await channel.send(embed=embed, file=file_to_attach)
+    kills, deaths = (events, []) if kind == "kill" else ([], events)
+    with span("push", root=True, kind=kind, events=len(events)):
+        await _ingest(kills, deaths)
+    return web.json_response({"received": len(events)})
 
-        last_death_id = death["id"]
 
+def _make_web_app() -> web.Application:
+    app = web.Application()
+    app.router.add_get("/health", handle_health)
+    app.router.add_get("/metrics", handle_metrics)
+    app.router.add_post("/ingest/{kind:kill|death}", handle_ingest)
+    return app
 
-# ─── Health check server ────────────────────────────────────────────────────────
-async def handle_health(request):
-    return web.json_response({"status": "ok"})
 
+def _feed_queue_depth() -> dict[tuple, float]:
+    return {(str(cid),): q.queue.qsize() for cid, q in bot.feeds.queues.items()}
+
+
+def _cursor_lag() -> dict[tuple, float]:
+    # mirrored events the feed has not posted (or skipped) yet
+    return {
+        ("kills",): bot.cache.kills.max_id - bot.kill_cursor.posted,
+        ("deaths",): bot.cache.deaths.max_id - bot.death_cursor.posted,
+    }
 
-def start_health_server():
-    def _run():
-        app = web.Application()
-        app.router.add_get("/health", handle_health)
-        port = int(os.environ.get("PORT", 8080))
-        logging.info(f"Starting HTTP server on 0.0.0.0:{port}")
-        # disable signal-handler registration in this thread:
-        web.run_app(app, host="0.0.0.0", port=port, handle_signals=False)
 
-    thread = threading.Thread(target=_run, daemon=True)
-    thread.start()
+Gauge(
+    "killtracker_feed_queue_depth",
+    "Cards waiting per feed channel",
+    ("channel",),
+    _feed_queue_depth,
+)
+Gauge(
+    "killtracker_feed_cursor_lag",
+    "Events mirrored but not yet posted",
+    ("feed",),
+    _cursor_lag,
+)
+Gauge(
+    "killtracker_poll_interval_seconds",
+    "Current poller interval",
+    collect=lambda: {(): bot.poller.interval},
+)
+Gauge(
+    "killtracker_poll_lag_seconds",
+    "Event age when the poller last picked one up",
+    collect=lambda: {(): bot.poller.lag},
+)
+Gauge(
+    "killtracker_poll_consecutive_errors",
+    "Failed polls in a row",
+    collect=lambda: {(): bot.poller.errors},
+)
+Gauge(
+    "killtracker_gateway_latency_seconds",
+    "Discord heartbeat latency",
+    collect=lambda: {(): bot.latency if math.isfinite(bot.latency) else None},
+)
 
 
 # ─── Entry point ────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
-    # 1) Start the tiny HTTP server
-    start_health_server()
-
-    # 2) Finally, launch your Discord bot (this is the one and only bot.run)
+    # launch your Discord bot (this is the one and only bot.run); the HTTP
+    # server starts with it in setup_hook
     bot.run(TOKEN)
@@ -0,0 +1,171 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Callable
+
+from events import mode_family, to_epoch
+
+# column layouts (after id + ts); order matches the SQLite mirror's tables
+KILL_FIELDS = (
+    "player",
+    "victim",
+    "org",
+    "weapon",
+    "zone",
+    "game_mode",
+    "family",
+    "mode",
+    "damage_type",
+)
+DEATH_FIELDS = (
+    "killer",
+    "victim",
+    "org",
+    "weapon",
+    "zone",
+    "game_mode",
+    "family",
+    "damage_type",
+)
+
+
+class StringTable:
+    """Interns strings to small ints so columns hold ids instead of str objects."""
+
+    __slots__ = ("_ids", "_values")
+
+    def __init__(self):
+        self._ids: dict[str, int] = {}
+        self._values: list[str] = []
+
+    def intern(self, value: str | None) -> int:
+        value = value or ""
+        i = self._ids.get(value)
+        if i is None:
+            i = self._ids[value] = len(self._values)
+            self._values.append(value)
+        return i
+
+    def lookup(self, value: str) -> int | None:
+        """Id of an already-interned string, or None if it never appeared."""
+        return self._ids.get(value)
+
+    def decode_counts(self, counts: Counter) -> dict[str, int]:
+        return {self._values[i]: c for i, c in counts.items()}
+
+    def __getitem__(self, i: int) -> str:
+        return self._values[i]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class EventColumns:
+    """
+    One event stream stored column-wise and kept sorted by ts, so any time
+    window is a pair of bisects over `ts`.
+    """
+
+    def __init__(self, fields: tuple[str, ...], strings: StringTable):
+        self.fields = fields
+        self.strings = strings
+        self.ts = array("q")
+        self.ids = array("q")
+        self.cols = {f: array("i") for f in fields}
+        self.max_id = 0
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def append(self, event_id: int, ts: int, values) -> int:
+        """
+        Add one event; `values` are the raw strings in `fields` order. Returns
+        the position it landed at.
+        """
+        intern = self.strings.intern
+        if not self.ts or ts >= self.ts[-1]:
+            pos = len(self.ts)
+            self.ts.append(ts)
+            self.ids.append(event_id)
+            for f, v in zip(self.fields, values):
+                self.cols[f].append(intern(v))
+        else:
+            # late arrival: keep the time index sorted
+            pos = bisect_right(self.ts, ts)
+            self.ts.insert(pos, ts)
+            self.ids.insert(pos, event_id)
+            for f, v in zip(self.fields, values):
+                self.cols[f].insert(pos, intern(v))
+        if event_id > self.max_id:
+            self.max_id = event_id
+        return pos
+
+    def span(self, start: int, end: int) -> tuple[int, int]:
+        """Positions [i, j) of the events with start <= ts < end."""
+        return bisect_left(self.ts, start), bisect_left(self.ts, end)
+
+
+class EventCache:
+    """Resident, compact copy of every kill and death, hydrated from the mirror."""
+
+    def __init__(self):
+        self.strings = StringTable()
+        self.kills = EventColumns(KILL_FIELDS, self.strings)
+        self.deaths = EventColumns(DEATH_FIELDS, self.strings)
+        self._subscribers: list[Callable[[str, int], None]] = []
+
+    def subscribe(self, callback: Callable[[str, int], None]) -> None:
+        """
+        Call `callback(kind, pos)` with kind "kill" or "death" right after each
+        new event is added, while `pos` still points at it.
+        """
+        self._subscribers.append(callback)
+
+    def _notify(self, kind: str, pos: int) -> None:
+        for callback in self._subscribers:
+            callback(kind, pos)
+
+    def load(self, store) -> None:
+        for row in store.iter_kills():
+            self.kills.append(row[0], row[1], row[2:])
+        for row in store.iter_deaths():
+            self.deaths.append(row[0], row[1], row[2:])
+
+    def add_kills(self, kills: list[dict]) -> None:
+        for k in kills:
+            gm = k.get("game_mode") or ""
+            pos = self.kills.append(
+                k["id"],
+                to_epoch(k["time"]),
+                (
+                    k["player"],
+                    k["victim"],
+                    k.get("organization_name"),
+                    k.get("weapon"),
+                    k.get("zone"),
+                    gm,
+                    mode_family(gm),
+                    k.get("mode"),
+                    k.get("damage_type"),
+                ),
+            )
+            self._notify("kill", pos)
+
+    def add_deaths(self, deaths: list[dict]) -> None:
+        for d in deaths:
+            gm = d.get("game_mode") or ""
+            pos = self.deaths.append(
+                d["id"],
+                to_epoch(d["time"]),
+                (
+                    d.get("killer"),
+                    d["victim"],
+                    d.get("organization_name"),
+                    d.get("weapon"),
+                    d.get("zone"),
+                    gm,
+                    mode_family(gm),
+                    d.get("damage_type"),
+                ),
+            )
+            self._notify("death", pos)
@@ -0,0 +1,169 @@
+import os
+import sqlite3
+
+from events import mode_family, to_epoch
+
+EVENT_DB_PATH = os.getenv("EVENT_DB_PATH", "events.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS kills (
+    id          INTEGER PRIMARY KEY,
+    ts          INTEGER NOT NULL,
+    player      TEXT NOT NULL,
+    victim      TEXT NOT NULL,
+    org         TEXT,
+    weapon      TEXT,
+    zone        TEXT,
+    game_mode   TEXT,
+    family      TEXT,
+    mode        TEXT,
+    damage_type TEXT
+);
+CREATE INDEX IF NOT EXISTS kills_ts ON kills (ts);
+
+CREATE TABLE IF NOT EXISTS deaths (
+    id          INTEGER PRIMARY KEY,
+    ts          INTEGER NOT NULL,
+    killer      TEXT,
+    victim      TEXT NOT NULL,
+    org         TEXT,
+    weapon      TEXT,
+    zone        TEXT,
+    game_mode   TEXT,
+    family      TEXT,
+    damage_type TEXT
+);
+CREATE INDEX IF NOT EXISTS deaths_ts ON deaths (ts);
+
+-- per-player lookups moved to the in-memory PlayerIndex
+DROP INDEX IF EXISTS kills_player_ts;
+DROP INDEX IF EXISTS deaths_victim_ts;
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS guild_config (
+    guild_id        INTEGER PRIMARY KEY,
+    pu_feed         INTEGER,
+    ac_feed         INTEGER,
+    summary_channel INTEGER,
+    excluded_orgs   TEXT NOT NULL DEFAULT '[]',
+    ignored_victims TEXT NOT NULL DEFAULT '[]'
+);
+"""
+
+
+class EventStore:
+    """
+    Local SQLite (WAL) mirror of the backend's kills and deaths, kept current
+    by the id-cursor pollers so analytics never re-download history.
+    """
+
+    def __init__(self, path: str = EVENT_DB_PATH):
+        self.path = path
+        self._db: sqlite3.Connection | None = None
+
+    def open(self) -> None:
+        if self._db is not None:
+            return
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            raise RuntimeError("EventStore used before open()")
+        return self._db
+
+    # ─── ingest ──────────────────────────────────────────────────────────────────
+    def add_kills(self, kills: list[dict]) -> list[dict]:
+        """Insert kills, returning only the ones the mirror had not seen yet."""
+        new = []
+        with self.db:
+            for k in kills:
+                cur = self.db.execute(
+                    "INSERT OR IGNORE INTO kills VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+                    (
+                        k["id"],
+                        to_epoch(k["time"]),
+                        k["player"],
+                        k["victim"],
+                        k.get("organization_name"),
+                        k.get("weapon"),
+                        k.get("zone"),
+                        k.get("game_mode"),
+                        mode_family(k.get("game_mode") or ""),
+                        k.get("mode"),
+                        k.get("damage_type"),
+                    ),
+                )
+                if cur.rowcount:
+                    new.append(k)
+        return new
+
+    def add_deaths(self, deaths: list[dict]) -> list[dict]:
+        """Insert deaths, returning only the ones the mirror had not seen yet."""
+        new = []
+        with self.db:
+            for d in deaths:
+                cur = self.db.execute(
+                    "INSERT OR IGNORE INTO deaths VALUES (?,?,?,?,?,?,?,?,?,?)",
+                    (
+                        d["id"],
+                        to_epoch(d["time"]),
+                        d.get("killer"),
+                        d["victim"],
+                        d.get("organization_name"),
+                        d.get("weapon"),
+                        d.get("zone"),
+                        d.get("game_mode"),
+                        mode_family(d.get("game_mode") or ""),
+                        d.get("damage_type"),
+                    ),
+                )
+                if cur.rowcount:
+                    new.append(d)
+        return new
+
+    def iter_kills(self):
+        """Every mirrored kill as a row tuple, oldest first."""
+        return self.db.execute("SELECT * FROM kills ORDER BY ts, id")
+
+    def iter_deaths(self):
+        """Every mirrored death as a row tuple, oldest first."""
+        return self.db.execute("SELECT * FROM deaths ORDER BY ts, id")
+
+    def max_kill_id(self) -> int:
+        return self.db.execute("SELECT COALESCE(MAX(id), 0) FROM kills").fetchone()[0]
+
+    def max_death_id(self) -> int:
+        return self.db.execute("SELECT COALESCE(MAX(id), 0) FROM deaths").fetchone()[0]
+
+    # ─── bot state ───────────────────────────────────────────────────────────────
+    def get_meta(self, key: str, default: str | None = None) -> str | None:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value) -> None:
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, str(value))
+            )
+
+    def guild_configs(self) -> list[tuple]:
+        return self.db.execute("SELECT * FROM guild_config").fetchall()
+
+    def save_guild_config(self, row: tuple) -> None:
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO guild_config VALUES (?,?,?,?,?,?)", row
+            )
@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+
+# ─── Shared event helpers ────────────────────────────────────────────────────────
+# upper bound used for open-ended time windows
+MAX_TS = 2**62
+
+AC_FLIGHT_MODES = {"SquadronBattle", "FreeFlight"}
+AC_FPS_MODES = {"TeamElimination", "KillConfirmed", "GunGame"}
+
+# keys a kill / death must carry to be mirrored and rendered as a feed card
+KILL_REQUIRED = (
+    "id",
+    "time",
+    "player",
+    "victim",
+    "zone",
+    "weapon",
+    "damage_type",
+    "game_mode",
+    "mode",
+    "killers_ship",
+)
+DEATH_REQUIRED = (
+    "id",
+    "time",
+    "killer",
+    "victim",
+    "zone",
+    "weapon",
+    "damage_type",
+    "game_mode",
+    "killers_ship",
+)
+
+
+def to_epoch(ts: str) -> int:
+    """Parse a backend ISO timestamp (naive values are UTC) into epoch seconds."""
+    parsed = datetime.fromisoformat(ts.rstrip("Z"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def missing_fields(event, required: tuple[str, ...]) -> list[str]:
+    """Required keys absent from `event` (everything, if it isn't an object)."""
+    if not isinstance(event, dict):
+        return list(required)
+    return [key for key in required if key not in event]
+
+
+def invalid_fields(event: dict, required: tuple[str, ...]) -> list[str]:
+    """
+    Required fields the feed can't use as given: a non-integer id, an
+    unparseable time, or anything else that isn't a string.
+    """
+    bad = []
+    if not isinstance(event["id"], int) or isinstance(event["id"], bool):
+        bad.append("id")
+    try:
+        to_epoch(event["time"])
+    except (TypeError, ValueError, AttributeError):
+        bad.append("time")
+    bad.extend(
+        key
+        for key in required
+        if key not in ("id", "time") and not isinstance(event[key], str)
+    )
+    return bad
+
+
+def mode_family(game_mode: str) -> str:
+    """
+    Bucket a raw game_mode into the slices the leaderboards care about:
+    'pu', 'ac-flight', 'ac-fps' or 'other'.
+    """
+    if game_mode.startswith("SC_"):
+        return "pu"
+    if not game_mode.startswith("EA_"):
+        return "other"
+    sub = game_mode[3:]
+    if sub in AC_FLIGHT_MODES:
+        return "ac-flight"
+    if sub.startswith("FPS"):
+        sub = sub[3:]  # "FPSGunGame" → "GunGame"
+    if sub in AC_FPS_MODES:
+        return "ac-fps"
+    return "other"
@@ -0,0 +1,275 @@
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from typing import Callable
+
+import discord
+
+from metrics import Counter
+
+# Discord caps one message at 10 embeds and 6000 embed characters in total
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+# per-channel send budget: FEED_BURST messages every FEED_PER_SECONDS seconds
+FEED_BURST = int(os.getenv("FEED_BURST", "5"))
+FEED_PER_SECONDS = float(os.getenv("FEED_PER_SECONDS", "5"))
+
+
+FEED_CARDS_POSTED = Counter(
+    "killtracker_feed_cards_posted_total", "Feed cards delivered", ("channel",)
+)
+FEED_CARDS_DROPPED = Counter(
+    "killtracker_feed_cards_dropped_total", "Feed cards given up on", ("channel",)
+)
+DISCORD_RATE_LIMITS = Counter(
+    "killtracker_discord_rate_limits_total",
+    "Discord 429 responses, by where they surfaced",
+    ("source",),
+)
+
+
+def embed_batches(embeds: list[discord.Embed]) -> list[list[discord.Embed]]:
+    """Pack embeds, in order, into as few messages as Discord's limits allow."""
+    batches: list[list[discord.Embed]] = []
+    current: list[discord.Embed] = []
+    size = 0
+    for embed in embeds:
+        n = len(embed)
+        if current and (
+            len(current) == MAX_EMBEDS_PER_MESSAGE
+            or size + n > MAX_EMBED_CHARS_PER_MESSAGE
+        ):
+            batches.append(current)
+            current, size = [], 0
+        current.append(embed)
+        size += n
+    if current:
+        batches.append(current)
+    return batches
+
+
+class TokenBucket:
+    """`capacity` sends per `per` seconds, refilled continuously."""
+
+    def __init__(self, capacity: int = FEED_BURST, per: float = FEED_PER_SECONDS):
+        self.capacity = capacity
+        self.rate = capacity / per
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Discord asked us to back off: spend nothing for `seconds`."""
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+class FeedCursor:
+    """
+    Highest event id whose card, and every earlier one, has been posted (or
+    deliberately skipped). It is checkpointed to the store's meta table as
+    deliveries complete, so a restart resumes exactly where the feed stopped.
+    """
+
+    def __init__(self, store, key: str):
+        self.store = store
+        self.key = key
+        self.posted = 0  # checkpoint: everything <= this is done
+        self.high = 0  # highest id handed to the feed so far
+        self.floor = 0  # checkpoint this process started from
+        self.ready = False
+        self.catching_up = True  # the first batch after a boot fills a gap
+        self._inflight: set[int] = set()
+
+    def load(self) -> bool:
+        """Restore the checkpoint; False if this feed has none yet."""
+        value = self.store.get_meta(self.key)
+        if value is None:
+            return False
+        self.posted = self.high = self.floor = int(value)
+        self.ready = True
+        return True
+
+    def reset(self, event_id: int) -> None:
+        """Start the feed after `event_id` (nothing older will be posted)."""
+        self.posted = self.high = self.floor = event_id
+        self._inflight.clear()
+        self.store.set_meta(self.key, event_id)
+        self.ready = True
+
+    def queued(self, event_id: int) -> None:
+        self._inflight.add(event_id)
+        self.high = max(self.high, event_id)
+
+    def skip(self, event_id: int) -> None:
+        self.high = max(self.high, event_id)
+        self._advance()
+
+    def done(self, event_id: int) -> None:
+        self._inflight.discard(event_id)
+        self._advance()
+
+    def _advance(self) -> None:
+        mark = min(self._inflight) - 1 if self._inflight else self.high
+        if mark > self.posted:
+            self.posted = mark
+            self.store.set_meta(self.key, mark)
+
+
+class ChannelQueue:
+    """
+    FIFO of embeds for one channel, drained by its own task into messages of
+    up to 10 embeds, paced by a token bucket. Each card's `on_sent` callback
+    runs once its message went out (or was given up on).
+    """
+
+    def __init__(
+        self,
+        channel_id: int,
+        get_channel: Callable[[int], discord.abc.Messageable | None],
+        make_files: Callable[[list[discord.Embed]], list[discord.File]],
+    ):
+        self.channel_id = channel_id
+        self.get_channel = get_channel
+        self.make_files = make_files
+        self.bucket = TokenBucket()
+        self.queue: asyncio.Queue[tuple[discord.Embed, Callable | None]] = (
+            asyncio.Queue()
+        )
+        self.task: asyncio.Task | None = None
+
+    def put(self, embed: discord.Embed, on_sent: Callable[[], None] | None) -> None:
+        self.queue.put_nowait((embed, on_sent))
+        if self.task is None or self.task.done():
+            # own context: the drain outlives whatever trace queued the card
+            self.task = asyncio.create_task(
+                self._drain(), context=contextvars.Context()
+            )
+
+    async def _drain(self) -> None:
+        while True:
+            pending = [await self.queue.get()]
+            while len(pending) < MAX_EMBEDS_PER_MESSAGE and not self.queue.empty():
+                pending.append(self.queue.get_nowait())
+            try:
+                done = 0
+                for batch in embed_batches([embed for embed, _ in pending]):
+                    await self._send(batch)
+                    for _, on_sent in pending[done : done + len(batch)]:
+                        if on_sent is not None:
+                            on_sent()
+                    done += len(batch)
+            finally:
+                for _ in pending:
+                    self.queue.task_done()
+
+    async def _send(self, batch: list[discord.Embed]) -> None:
+        label = str(self.channel_id)
+        while True:
+            await self.bucket.acquire()
+            channel = self.get_channel(self.channel_id)
+            if channel is None:
+                logging.error(f"⚠️ feed channel {self.channel_id} not found, dropping")
+                FEED_CARDS_DROPPED.inc(len(batch), channel=label)
+                return
+            try:
+                await channel.send(embeds=batch, files=self.make_files(batch))
+            except discord.RateLimited as e:
+                DISCORD_RATE_LIMITS.inc(source="feed")
+                self.bucket.pause(e.retry_after)
+                continue
+            except Exception as e:
+                if isinstance(e, discord.HTTPException) and e.status == 429:
+                    DISCORD_RATE_LIMITS.inc(source="feed")
+                    self.bucket.pause(FEED_PER_SECONDS)
+                    continue
+                logging.error(
+                    f"⚠️ feed send to {self.channel_id} failed, dropping "
+                    f"{len(batch)} card(s)",
+                    exc_info=e,
+                )
+                FEED_CARDS_DROPPED.inc(len(batch), channel=label)
+                return
+            FEED_CARDS_POSTED.inc(len(batch), channel=label)
+            return
+
+
+class FeedSender:
+    """One ChannelQueue per feed channel; channels drain in parallel."""
+
+    def __init__(
+        self,
+        get_channel: Callable[[int], discord.abc.Messageable | None],
+        make_files: Callable[[list[discord.Embed]], list[discord.File]] = (
+            lambda embeds: []
+        ),
+    ):
+        self.get_channel = get_channel
+        self.make_files = make_files
+        self.queues: dict[int, ChannelQueue] = {}
+
+    def send(
+        self,
+        channel_id: int,
+        embed: discord.Embed,
+        on_sent: Callable[[], None] | None = None,
+    ) -> None:
+        """Queue `embed` for `channel_id`; it is posted in the order queued."""
+        q = self.queues.get(channel_id)
+        if q is None:
+            q = self.queues[channel_id] = ChannelQueue(
+                channel_id, self.get_channel, self.make_files
+            )
+        q.put(embed, on_sent)
+
+    def fan_out(
+        self,
+        channel_ids: list[int],
+        embed: discord.Embed,
+        on_sent: Callable[[], None] | None = None,
+    ) -> None:
+        """
+        Queue one embed for several channels (built once, shared by all);
+        `on_sent` runs once, after the last of them has been sent.
+        """
+        remaining = len(channel_ids)
+
+        def one_sent() -> None:
+            nonlocal remaining
+            remaining -= 1
+            if remaining == 0 and on_sent is not None:
+                on_sent()
+
+        for channel_id in channel_ids:
+            self.send(channel_id, embed, one_sent)
+
+    def pending(self) -> int:
+        return sum(q.queue.qsize() for q in self.queues.values())
+
+    async def join(self) -> None:
+        """Wait until everything queued so far has been sent (or dropped)."""
+        await asyncio.gather(*(q.queue.join() for q in self.queues.values()))
+
+    async def close(self) -> None:
+        for q in self.queues.values():
+            if q.task is not None:
+                q.task.cancel()
+        await asyncio.gather(
+            *(q.task for q in self.queues.values() if q.task is not None),
+            return_exceptions=True,
+        )
@@ -0,0 +1,89 @@
+import json
+from typing import NamedTuple
+
+# the two feeds a guild can subscribe a channel to
+FEED_KINDS = ("pu", "ac")
+
+
+class GuildConfig(NamedTuple):
+    guild_id: int
+    pu_feed: int | None = None
+    ac_feed: int | None = None
+    summary_channel: int | None = None
+    excluded_orgs: tuple[str, ...] = ()  # left out of org leaderboards
+    ignored_victims: tuple[str, ...] = ()  # victim prefixes kept off the kill feed
+
+    def feed(self, kind: str) -> int | None:
+        return self.pu_feed if kind == "pu" else self.ac_feed
+
+    def to_row(self) -> tuple:
+        return (
+            *self[:4],
+            json.dumps(list(self.excluded_orgs)),
+            json.dumps(list(self.ignored_victims)),
+        )
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "GuildConfig":
+        *head, orgs, victims = row
+        return cls(*head, tuple(json.loads(orgs)), tuple(json.loads(victims)))
+
+
+class Route(NamedTuple):
+    channel_id: int
+    ignored_victims: tuple[str, ...]
+
+
+class GuildConfigs:
+    """
+    Every guild's settings, persisted in the store, plus the routing index
+    the feeds fan out through: feed kind → the channels subscribed to it.
+    """
+
+    def __init__(self, store, seed: GuildConfig | None = None):
+        self.store = store
+        self._configs = {
+            c.guild_id: c for c in map(GuildConfig.from_row, store.guild_configs())
+        }
+        self._routes: dict[str, list[Route]] = {}
+        # the env-configured home guild, saved the first time this store is used
+        if seed is not None and seed.guild_id not in self._configs:
+            self.store.save_guild_config(seed.to_row())
+            self._configs[seed.guild_id] = seed
+        self._reindex()
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+    def _reindex(self) -> None:
+        self._routes = {
+            kind: [
+                Route(c.feed(kind), c.ignored_victims)
+                for c in self._configs.values()
+                if c.feed(kind)
+            ]
+            for kind in FEED_KINDS
+        }
+
+    def get(self, guild_id: int | None) -> GuildConfig:
+        """`guild_id`'s settings; a guild never configured gets the defaults."""
+        return self._configs.get(guild_id) or GuildConfig(guild_id or 0)
+
+    def update(self, guild_id: int, **changes) -> GuildConfig:
+        config = self.get(guild_id)._replace(**changes)
+        self.store.save_guild_config(config.to_row())
+        self._configs[guild_id] = config
+        self._reindex()
+        return config
+
+    def routes(self, kind: str) -> list[Route]:
+        """Channels subscribed to the "pu" or "ac" feed."""
+        return self._routes[kind]
+
+    def summary_channels(self) -> dict[tuple[str, ...], list[int]]:
+        """Summary channels grouped by excluded orgs, so each report renders once per group."""
+        groups: dict[tuple[str, ...], list[int]] = {}
+        for c in self._configs.values():
+            if c.summary_channel:
+                groups.setdefault(c.excluded_orgs, []).append(c.summary_channel)
+        return groups
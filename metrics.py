@@ -0,0 +1,156 @@
+import math
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+# ─── Minimal Prometheus metrics ──────────────────────────────────────────────────
+# Counters, gauges and histograms rendered in the Prometheus text format by
+# GET /metrics. Everything runs on the bot's event loop, so no locking.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        REGISTRY.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(n, "") for n in self.label_names)
+
+    def samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        head = f"# HELP {self.name} {self.help}\n# TYPE {self.name} {self.kind}\n"
+        return head + "".join(line + "\n" for line in self.samples())
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.values: dict[tuple, float] = {}
+        super().__init__(name, help, labels)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_labels(self.label_names, k)} {_number(v)}"
+            for k, v in self.values.items()
+        ]
+
+
+class Gauge(Metric):
+    """A set value, or one read at scrape time from `collect()`."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        collect: Callable[[], dict[tuple, float]] | None = None,
+    ):
+        self.values: dict[tuple, float] = {}
+        self.collect = collect
+        super().__init__(name, help, labels)
+
+    def set(self, value: float, **labels) -> None:
+        self.values[self._key(labels)] = value
+
+    def samples(self) -> list[str]:
+        values = self.collect() if self.collect else self.values
+        return [
+            f"{self.name}{_labels(self.label_names, k)} {_number(v)}"
+            for k, v in values.items()
+            if v is not None
+        ]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.series: dict[tuple, list] = {}  # key → [bucket counts, sum, count]
+        super().__init__(name, help, labels)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> list[str]:
+        out = []
+        for key, (counts, total, count) in self.series.items():
+            running = 0
+            for bound, n in zip(self.buckets, counts):
+                running += n
+                le = _labels(self.label_names, key, f'le="{_number(bound)}"')
+                out.append(f"{self.name}_bucket{le} {running}")
+            labels = _labels(self.label_names, key)
+            out.append(f"{self.name}_sum{labels} {_number(total)}")
+            out.append(f"{self.name}_count{labels} {count}")
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self.metrics:
+            raise ValueError(f"metric {metric.name!r} registered twice")
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        return "".join(m.render() for m in self.metrics.values())
+
+
+REGISTRY = Registry()
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+
+from events import MAX_TS
+
+# ─── Period engine ───────────────────────────────────────────────────────────────
+# Every command, summary and report slices time the same way: EST calendar,
+# [start, end) in epoch seconds, computed once per request. Event timestamps
+# are parsed once at ingest (events.to_epoch), so selecting a window is a
+# bisect over sorted ints.
+EST = ZoneInfo("America/New_York")
+
+
+class Window(NamedTuple):
+    start: int
+    end: int
+
+    def __contains__(self, ts: int) -> bool:
+        return self.start <= ts < self.end
+
+
+def _add_months(d: datetime, months: int) -> datetime:
+    idx = d.year * 12 + d.month - 1 + months
+    return d.replace(year=idx // 12, month=idx % 12 + 1)
+
+
+def period_window(period: str, now: datetime | None = None) -> Window:
+    """
+    [start, end) for a period as of `now` (default: the current time):
+
+    today      EST calendar day
+    daily      yesterday 9 PM → today 9 PM
+    week(ly)   the last 7 days (open-ended unless `now` is given)
+    month      this calendar month
+    monthly    last calendar month
+    quarterly  last calendar quarter
+    yearly     last calendar year
+    all        everything
+    """
+    live = now is None
+    now = (now or datetime.now(EST)).astimezone(EST)
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if period == "today":
+        start, end = midnight, midnight + timedelta(days=1)
+    elif period == "daily":
+        end = now.replace(hour=21, minute=0, second=0, microsecond=0)
+        start = end - timedelta(days=1)
+    elif period == "month":
+        start = midnight.replace(day=1)
+        end = _add_months(start, 1)
+    elif period == "monthly":
+        end = midnight.replace(day=1)
+        start = _add_months(end, -1)
+    elif period in ("quarter", "quarterly"):
+        end = midnight.replace(month=(now.month - 1) // 3 * 3 + 1, day=1)
+        start = _add_months(end, -3)
+    elif period == "yearly":
+        end = midnight.replace(month=1, day=1)
+        start = end.replace(year=end.year - 1)
+    elif period in ("all", "all time"):
+        return Window(0, MAX_TS)
+    else:
+        # "week" / "weekly", and the fallback for anything unknown
+        end = MAX_TS if live else int(now.timestamp())
+        return Window(int((now - timedelta(days=7)).timestamp()), end)
+
+    return Window(int(start.timestamp()), int(end.timestamp()))
+
+
+def period_start_iso(period: str, now: datetime | None = None) -> str:
+    """UTC ISO start of `period`, for the backend's `since_time` filter."""
+    start = period_window(period, now).start
+    return datetime.fromtimestamp(start, timezone.utc).isoformat()
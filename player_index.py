@@ -0,0 +1,105 @@
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import islice
+
+from event_cache import EventCache
+from events import MAX_TS
+
+# victim orgs left out of a player's "top killed orgs"
+UNKNOWN_ORGS = ("", "Unknown")
+
+
+class PlayerEvents:
+    """One player's kill and death timestamps, sorted, per mode family."""
+
+    __slots__ = ("kills", "deaths", "orgs")
+
+    def __init__(self):
+        self.kills: dict[str, array] = {}  # family → kill ts
+        self.deaths: dict[str, array] = {}  # family → death ts, suicides excluded
+        self.orgs = Counter()  # victim org id → kills
+
+
+def _count(by_family: dict[str, array], start: int, end: int, family: str) -> int:
+    """Events with start <= ts < end in one family, or in all of them."""
+    if family == "all":
+        columns = by_family.values()
+    else:
+        columns = [by_family[family]] if family in by_family else []
+    return sum(bisect_left(ts, end) - bisect_left(ts, start) for ts in columns)
+
+
+class PlayerIndex:
+    """
+    Inverted index over the event cache: handle (case-insensitive) → that
+    player's events, so /stats, /kd and /compare cost a few bisects over one
+    player's history instead of a scan. Kept current by cache subscription.
+    """
+
+    def __init__(self, cache: EventCache):
+        self.cache = cache
+        self._players: dict[str, PlayerEvents] = {}
+        for pos in range(len(cache.kills)):
+            self._add_kill(pos)
+        for pos in range(len(cache.deaths)):
+            self._add_death(pos)
+        cache.subscribe(self._on_event)
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def _player(self, handle_id: int) -> PlayerEvents:
+        key = self.cache.strings[handle_id].casefold()
+        player = self._players.get(key)
+        if player is None:
+            player = self._players[key] = PlayerEvents()
+        return player
+
+    def _add_kill(self, pos: int) -> None:
+        stream, strings = self.cache.kills, self.cache.strings
+        player = self._player(stream.cols["player"][pos])
+        family = strings[stream.cols["family"][pos]]
+        insort(player.kills.setdefault(family, array("q")), stream.ts[pos])
+        player.orgs[stream.cols["org"][pos]] += 1
+
+    def _add_death(self, pos: int) -> None:
+        stream, strings = self.cache.deaths, self.cache.strings
+        if strings[stream.cols["damage_type"][pos]] == "Suicide":
+            return
+        player = self._player(stream.cols["victim"][pos])
+        family = strings[stream.cols["family"][pos]]
+        insort(player.deaths.setdefault(family, array("q")), stream.ts[pos])
+
+    def _on_event(self, kind: str, pos: int) -> None:
+        if kind == "kill":
+            self._add_kill(pos)
+        else:
+            self._add_death(pos)
+
+    # ─── queries ─────────────────────────────────────────────────────────────────
+    def kills(
+        self, handle: str, start: int = 0, end: int = MAX_TS, family: str = "all"
+    ) -> int:
+        player = self._players.get(handle.casefold())
+        return _count(player.kills, start, end, family) if player else 0
+
+    def deaths(
+        self, handle: str, start: int = 0, end: int = MAX_TS, family: str = "all"
+    ) -> int:
+        """Deaths for `handle`, not counting suicides."""
+        player = self._players.get(handle.casefold())
+        return _count(player.deaths, start, end, family) if player else 0
+
+    def top_orgs(self, handle: str, limit: int = 5) -> list[tuple[str, int]]:
+        """Organizations `handle` has killed most, ignoring unknown orgs."""
+        player = self._players.get(handle.casefold())
+        if player is None:
+            return []
+        names = self.cache.strings
+        orgs = (
+            (names[org], c)
+            for org, c in player.orgs.most_common()
+            if names[org] not in UNKNOWN_ORGS
+        )
+        return list(islice(orgs, limit))
@@ -0,0 +1,67 @@
+import os
+import random
+import time
+
+# poll every POLL_MIN_SECONDS while events flow, stretching by POLL_BACKOFF per
+# idle or failed poll up to POLL_MAX_SECONDS; each delay is jittered ±POLL_JITTER
+POLL_MIN_SECONDS = float(os.getenv("POLL_MIN_SECONDS", "2"))
+POLL_MAX_SECONDS = float(os.getenv("POLL_MAX_SECONDS", "60"))
+POLL_BACKOFF = float(os.getenv("POLL_BACKOFF", "1.5"))
+POLL_JITTER = float(os.getenv("POLL_JITTER", "0.2"))
+# minimum interval when events are pushed and polling only reconciles
+POLL_RECONCILE_SECONDS = float(os.getenv("POLL_RECONCILE_SECONDS", "60"))
+
+
+class PollState:
+    """Adaptive interval and observed health of the feed poller."""
+
+    def __init__(
+        self,
+        minimum: float = POLL_MIN_SECONDS,
+        maximum: float = POLL_MAX_SECONDS,
+        backoff: float = POLL_BACKOFF,
+        jitter: float = POLL_JITTER,
+    ):
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.backoff = backoff
+        self.jitter = jitter
+        self.interval = minimum  # un-jittered delay before the next poll
+        self.errors = 0  # consecutive failed polls
+        self.last_poll: float | None = None  # epoch of the last attempt
+        self.last_success: float | None = None
+        # seconds between the newest fetched event happening and us fetching it
+        self.lag: float | None = None
+
+    def _stretch(self) -> None:
+        self.interval = min(self.maximum, self.interval * self.backoff)
+
+    def _delay(self) -> float:
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def success(self, newest_ts: int | None) -> float:
+        """Record a poll that returned events up to `newest_ts` (None: nothing new)."""
+        now = time.time()
+        self.last_poll = self.last_success = now
+        self.errors = 0
+        if newest_ts is None:
+            self._stretch()
+        else:
+            self.interval = self.minimum
+            self.lag = max(0.0, now - newest_ts)
+        return self._delay()
+
+    def failure(self) -> float:
+        self.last_poll = time.time()
+        self.errors += 1
+        self._stretch()
+        return self._delay()
+
+    def snapshot(self) -> dict:
+        return {
+            "interval": self.interval,
+            "errors": self.errors,
+            "last_poll": self.last_poll,
+            "last_success": self.last_success,
+            "lag": self.lag,
+        }
@@ -0,0 +1,213 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+# ─── Live profiling ──────────────────────────────────────────────────────────────
+# Used by the admin /debug profile command. The sampler reads the event loop
+# thread's stack from a side thread, so the bot keeps serving at full speed
+# while it runs; tracemalloc records where memory allocated meanwhile lives.
+PROFILE_SAMPLE_SECONDS = float(os.getenv("PROFILE_SAMPLE_SECONDS", "0.005"))
+# frames kept per allocation site (more gives context, costs memory)
+PROFILE_TRACEMALLOC_FRAMES = int(os.getenv("PROFILE_TRACEMALLOC_FRAMES", "5"))
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _where(filename: str, lineno: int, name: str | None = None) -> str:
+    """Shorten a path to its package- or repo-relative form."""
+    for marker in ("site-packages" + os.sep, os.sep + "lib" + os.sep):
+        i = filename.rfind(marker)
+        if i != -1:
+            filename = filename[i + len(marker) :]
+            break
+    else:
+        if filename.startswith(_HERE + os.sep):
+            filename = filename[len(_HERE) + 1 :]
+    loc = f"{filename}:{lineno}"
+    return f"{loc}({name})" if name else loc
+
+
+class SamplingProfiler:
+    """
+    Statistical CPU profile of one thread: every `interval` seconds a helper
+    thread walks that thread's current stack and counts each function in it.
+    """
+
+    def __init__(self, thread_id: int | None = None, interval=PROFILE_SAMPLE_SECONDS):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.samples = 0
+        self.own: Counter = Counter()  # code → samples where it was on top
+        self.total: Counter = Counter()  # code → samples where it was anywhere
+        self.started = self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run, name="profile-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            self.samples += 1
+            self.own[frame.f_code] += 1
+            seen = set()
+            while frame is not None:
+                # count recursive functions once per sample
+                if frame.f_code not in seen:
+                    seen.add(frame.f_code)
+                    self.total[frame.f_code] += 1
+                frame = frame.f_back
+
+    def report(self, top: int = 25) -> str:
+        if not self.samples:
+            return "CPU: no samples taken\n"
+        per = self.elapsed / self.samples
+        out = [
+            f"CPU: {self.samples} samples over {self.elapsed:.1f}s "
+            f"(every {self.interval * 1000:g} ms)\n"
+        ]
+        for title, counts in (("cumulative", self.total), ("own", self.own)):
+            out.append(f"\nTop {top} functions by {title} time\n")
+            out.append(f"{'samples':>8} {'%':>6} {'~sec':>8}  function\n")
+            for code, n in counts.most_common(top):
+                where = _where(code.co_filename, code.co_firstlineno, code.co_name)
+                out.append(
+                    f"{n:>8} {100 * n / self.samples:>5.1f}% {n * per:>8.3f}  {where}\n"
+                )
+        return "".join(out)
+
+
+class AllocationTracker:
+    """Allocation sites of memory allocated, and still alive, while running."""
+
+    def __init__(self, frames: int = PROFILE_TRACEMALLOC_FRAMES):
+        self.frames = frames
+        self.snapshot: tracemalloc.Snapshot | None = None
+        self._baseline: tracemalloc.Snapshot | None = None
+        self.peak = 0
+        self._owned = False
+
+    def start(self) -> None:
+        # leave tracing alone if someone (PYTHONTRACEMALLOC) already runs it
+        self._owned = not tracemalloc.is_tracing()
+        if self._owned:
+            tracemalloc.start(self.frames)
+        tracemalloc.reset_peak()
+        self._baseline = tracemalloc.take_snapshot()
+
+    def stop(self) -> None:
+        snapshot = tracemalloc.take_snapshot()
+        self.peak = tracemalloc.get_traced_memory()[1]
+        if self._owned:
+            tracemalloc.stop()
+        ignore = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ]
+        self.snapshot = snapshot.filter_traces(ignore)
+        self._baseline = self._baseline.filter_traces(ignore)
+
+    def report(self, top: int = 25) -> str:
+        if self.snapshot is None:
+            return "Memory: not collected\n"
+        diff = self.snapshot.compare_to(self._baseline, "traceback")
+        grown = [d for d in diff if d.size_diff > 0][:top]
+        out = [
+            f"Memory: peak traced {self.peak / 1024:.0f} KiB, "
+            f"{sum(d.size_diff for d in diff) / 1024:+.0f} KiB net\n",
+            f"\nTop {top} allocation sites by growth\n",
+            f"{'KiB':>10} {'blocks':>8}  site (innermost first)\n",
+        ]
+        for d in grown:
+            frames = list(reversed(d.traceback))
+            out.append(
+                f"{d.size_diff / 1024:>10.1f} {d.count_diff:>+8}  "
+                f"{_where(frames[0].filename, frames[0].lineno)}\n"
+            )
+            for f in frames[1:]:
+                out.append(f"{'':>21}  ← {_where(f.filename, f.lineno)}\n")
+        return "".join(out)
+
+
+class Profile:
+    """
+    A CPU sampler and/or allocation tracker started and stopped together;
+    `report()` is the text handed back to whoever asked for the profile.
+    """
+
+    def __init__(self, cpu: bool = True, memory: bool = True):
+        self.cpu = SamplingProfiler() if cpu else None
+        self.memory = AllocationTracker() if memory else None
+
+    def start(self) -> None:
+        if self.memory:
+            self.memory.start()
+        if self.cpu:
+            self.cpu.start()
+
+    def stop(self) -> None:
+        if self.cpu:
+            self.cpu.stop()
+        if self.memory:
+            self.memory.stop()
+
+    def report(self, top: int = 25) -> str:
+        parts = [p.report(top) for p in (self.cpu, self.memory) if p is not None]
+        return "\n\n".join(parts)
+
+
+class CallProfile(Profile):
+    """
+    Profile of one short run of code on the loop thread: cProfile instead of
+    sampling, so a command that finishes in a few ms still shows every call.
+    Anything else the loop runs meanwhile is included too.
+    """
+
+    def __init__(self, cpu: bool = True, memory: bool = True):
+        super().__init__(cpu=False, memory=memory)
+        self.profiler = cProfile.Profile() if cpu else None
+        self.started = self.elapsed = 0.0
+
+    def start(self) -> None:
+        super().start()
+        self.started = time.perf_counter()
+        if self.profiler:
+            self.profiler.enable()
+
+    def stop(self) -> None:
+        if self.profiler:
+            self.profiler.disable()
+        self.elapsed = time.perf_counter() - self.started
+        super().stop()
+
+    def report(self, top: int = 25) -> str:
+        parts = [f"Wall time: {self.elapsed * 1000:.1f} ms\n"]
+        if self.profiler:
+            buf = io.StringIO()
+            stats = pstats.Stats(self.profiler, stream=buf)
+            stats.strip_dirs().sort_stats("cumulative").print_stats(top)
+            parts.append(f"CPU: top {top} functions by cumulative time\n")
+            parts.append(buf.getvalue())
+        if self.memory:
+            parts.append(self.memory.report(top))
+        return "\n".join(parts)
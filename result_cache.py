@@ -0,0 +1,105 @@
+import asyncio
+import contextvars
+import inspect
+import os
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable
+
+from metrics import Counter
+
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "30"))
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "256"))
+
+RESULT_CACHE_LOOKUPS = Counter(
+    "killtracker_result_cache_total",
+    "Command result cache lookups by outcome (hit, shared, miss, bypass)",
+    ("command", "result"),
+)
+# set inside ResultCache.bypass(), for the task (and its children) only
+_BYPASS = contextvars.ContextVar("result_cache_bypass", default=False)
+
+
+class ResultCache:
+    """
+    Recently built command results keyed by (command, *args). An entry is
+    served while `version()` (the data it was built from) is unchanged and
+    for at most `ttl` seconds; past `size` entries the least recently used
+    go. Concurrent misses for the same key share one computation.
+    """
+
+    def __init__(
+        self,
+        version: Callable[[], Hashable],
+        ttl: float = RESULT_CACHE_TTL,
+        size: int = RESULT_CACHE_SIZE,
+    ):
+        self.version = version
+        self.ttl = ttl
+        self.size = size
+        self._entries: OrderedDict[tuple, tuple[float, Hashable, Any]] = OrderedDict()
+        self._inflight: dict[tuple, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @contextmanager
+    def bypass(self):
+        """Compute every result afresh inside the block, e.g. to profile it."""
+        token = _BYPASS.set(True)
+        try:
+            yield
+        finally:
+            _BYPASS.reset(token)
+
+    async def get(self, key: tuple, compute: Callable[[], Any]) -> Any:
+        """The cached result for `key`, else `compute()` (sync or async)."""
+        command, version = key[0], self.version()
+        if _BYPASS.get():
+            RESULT_CACHE_LOOKUPS.inc(command=command, result="bypass")
+            value = compute()
+            return await value if inspect.isawaitable(value) else value
+
+        entry = self._entries.get(key)
+        if (
+            entry is not None
+            and entry[1] == version
+            and time.monotonic() - entry[0] < self.ttl
+        ):
+            self._entries.move_to_end(key)
+            RESULT_CACHE_LOOKUPS.inc(command=command, result="hit")
+            return entry[2]
+
+        flight = (key, version)
+        pending = self._inflight.get(flight)
+        if pending is not None:
+            RESULT_CACHE_LOOKUPS.inc(command=command, result="shared")
+            # shielded: one waiter giving up must not cancel the others
+            return await asyncio.shield(pending)
+
+        RESULT_CACHE_LOOKUPS.inc(command=command, result="miss")
+        future = self._inflight[flight] = asyncio.get_running_loop().create_future()
+        try:
+            value = compute()
+            if inspect.isawaitable(value):
+                value = await value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved: waiters (if any) re-raise it
+            raise
+        else:
+            future.set_result(value)
+            self._entries[key] = (time.monotonic(), version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+            return value
+        finally:
+            del self._inflight[flight]
@@ -0,0 +1,45 @@
+import os
+from datetime import date, datetime, time, timedelta
+from typing import Callable, NamedTuple
+
+from periods import EST
+
+# every scheduled report goes out at 9 PM America/New_York
+REPORT_TIME = time(hour=21, minute=0, tzinfo=EST)
+# how far back a restarted bot will post reports it missed
+REPORT_CATCH_UP_DAYS = int(os.getenv("REPORT_CATCH_UP_DAYS", "7"))
+
+
+class Schedule(NamedTuple):
+    period: str
+    emoji: str
+    due: Callable[[date], bool]
+
+    @property
+    def key(self) -> str:
+        """Meta key holding the epoch of the last report that was posted."""
+        return f"report:{self.period}"
+
+    def occurrences(self, after: int, now: datetime) -> list[datetime]:
+        """Report times in (after, now], oldest first, bounded by the catch-up limit."""
+        floor = max(
+            after, int((now - timedelta(days=REPORT_CATCH_UP_DAYS)).timestamp())
+        )
+        out = []
+        day = now.astimezone(EST).date() - timedelta(days=REPORT_CATCH_UP_DAYS)
+        while day <= now.astimezone(EST).date():
+            at = datetime.combine(day, REPORT_TIME)
+            if self.due(day) and floor < at.timestamp() and at <= now:
+                out.append(at)
+            day += timedelta(days=1)
+        return out
+
+
+# narrowest first: on days several are due they post in this order
+SCHEDULES = (
+    Schedule("daily", "📅", lambda d: True),
+    Schedule("weekly", "🗓️", lambda d: d.weekday() == 0),
+    Schedule("monthly", "📆", lambda d: d.day == 1),
+    Schedule("quarterly", "📊", lambda d: d.day == 1 and d.month in (1, 4, 7, 10)),
+    Schedule("yearly", "🎉", lambda d: d.month == 1 and d.day == 1),
+)
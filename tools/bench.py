@@ -0,0 +1,286 @@
+"""
+Micro-benchmarks for the analytics paths on synthetic data.
+
+    python tools/bench.py                        # 10k, 100k and 1M events
+    python tools/bench.py --sizes 10k,10m --periods all
+    python tools/bench.py --baseline bench-1a2b3c4.json
+
+For each size the synthetic kills and deaths are loaded into a scratch SQLite
+mirror and the resident cache, then every case runs per period: wall time
+(min / median of up to --repeats runs within --budget seconds) and the peak
+memory it allocated (one extra run under tracemalloc). Results are written to
+a JSON file named after the current commit so runs can be diffed; with
+--baseline the median of each case is compared against an earlier file.
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+TOOLS = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(TOOLS)
+sys.path[:0] = [ROOT, TOOLS]
+
+from fakes import FakeInteraction, prepare_bot_env  # noqa: E402
+
+prepare_bot_env()
+
+import bot  # noqa: E402
+from event_cache import EventCache  # noqa: E402
+from event_store import EventStore  # noqa: E402
+from periods import period_window  # noqa: E402
+from synthetic import SyntheticEvents, chunks, parse_size  # noqa: E402
+
+DEFAULT_SIZES = "10k,100k,1m"
+DEFAULT_PERIODS = "today,week,month,all"
+
+
+def _commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def _cache_mib(cache: EventCache) -> float:
+    total = 0
+    for stream in (cache.kills, cache.deaths):
+        for col in (stream.ts, stream.ids, *stream.cols.values()):
+            total += col.buffer_info()[1] * col.itemsize
+    return total / 2**20
+
+
+class Bench:
+    def __init__(self, args):
+        self.args = args
+        self.loop = asyncio.new_event_loop()
+        self.results: list[dict] = []
+        self.sizes: list[dict] = []
+
+    def _run(self, fn):
+        result = fn()
+        if inspect.isawaitable(result):
+            self.loop.run_until_complete(result)
+
+    def measure(self, n: int, case: str, period: str | None, fn) -> dict:
+        times = []
+        deadline = time.perf_counter() + self.args.budget
+        while len(times) < self.args.repeats and (
+            not times or time.perf_counter() < deadline
+        ):
+            start = time.perf_counter()
+            self._run(fn)
+            times.append((time.perf_counter() - start) * 1000)
+        peak = None
+        if not self.args.no_memory:
+            tracemalloc.start()
+            base = tracemalloc.get_traced_memory()[0]
+            self._run(fn)
+            peak = (tracemalloc.get_traced_memory()[1] - base) / 1024
+            tracemalloc.stop()
+        row = {
+            "events": n,
+            "case": case,
+            "period": period,
+            "runs": len(times),
+            "min_ms": round(min(times), 3),
+            "median_ms": round(statistics.median(times), 3),
+            "peak_kib": round(peak, 1) if peak is not None else None,
+        }
+        self.results.append(row)
+        self._print(row)
+        return row
+
+    def _print(self, row: dict) -> None:
+        line = (
+            f"{row['events']:>10,}  {row['case']:<24} {row['period'] or '':<7}"
+            f"{row['median_ms']:>12.3f} ms"
+        )
+        if row["peak_kib"] is not None:
+            line += f"{row['peak_kib']:>12.1f} KiB"
+        old = self.baseline.get((row["events"], row["case"], row["period"]))
+        if old:
+            line += f"   {row['median_ms'] / old:>6.2f}x baseline"
+        print(line, flush=True)
+
+    def load(self, n: int, db_path: str):
+        """Fill a scratch mirror and cache with n synthetic events."""
+        data = SyntheticEvents(n, seed=self.args.seed)
+        store = EventStore(db_path)
+        store.open()
+        cache = EventCache()
+        timings = {"store": 0.0, "cache": 0.0}
+        for stream, add in (("kills", "add_kills"), ("deaths", "add_deaths")):
+            for batch in chunks(getattr(data, stream)()):
+                start = time.perf_counter()
+                getattr(store, add)(batch)
+                timings["store"] += time.perf_counter() - start
+                start = time.perf_counter()
+                getattr(cache, add)(batch)
+                timings["cache"] += time.perf_counter() - start
+        self.sizes.append(
+            {
+                "events": n,
+                "kills": len(cache.kills),
+                "deaths": len(cache.deaths),
+                "players": len(data.players),
+                "load_store_s": round(timings["store"], 3),
+                "load_cache_s": round(timings["cache"], 3),
+                "cache_mib": round(_cache_mib(cache), 1),
+                "max_rss_mib": round(
+                    resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+                ),
+            }
+        )
+        print(f"loaded {n:,} events: {self.sizes[-1]}", flush=True)
+        return data, store, cache
+
+    def run_size(self, n: int) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            data, store, cache = self.load(n, os.path.join(tmp, "bench.db"))
+            # the command handlers read these off the bot
+            bot.bot.use_data(store, cache)
+            engine = bot.bot.aggregates
+            # time the computation, not the command result cache
+            bot.bot.results.ttl = 0
+            try:
+                self.run_cases(n, data, store, cache, engine)
+            finally:
+                store.close()
+
+    def run_cases(self, n, data, store, cache, engine) -> None:
+        top = engine.window("all").top(engine.window("all").kills, 2)
+        user1, user2 = (p for p, _ in top) if len(top) == 2 else ("a", "b")
+        weapons = cache.kills.cols["weapon"][:100_000]
+        codes = [cache.strings[i] for i in weapons]
+        resolver = bot.WEAPON_CATALOG._index.resolve
+
+        def cold_weapons():
+            resolver.cache_clear()
+            for code in codes:
+                bot.format_weapon(code)
+
+        def warm_weapons():
+            for code in codes:
+                bot.format_weapon(code)
+
+        self.measure(n, "format_weapon.cold", None, cold_weapons)
+        self.measure(n, "format_weapon.warm", None, warm_weapons)
+
+        for period in self.args.periods:
+
+            def window_bounds():
+                # what `_in_period` filtering used to do per event
+                start, end = period_window(period)
+                cache.kills.span(start, end)
+                cache.deaths.span(start, end)
+
+            ratios = {p: r for p, _, _, r in engine.window(period).ratios()}
+            self.measure(n, "period_window", period, window_bounds)
+            self.measure(
+                n, "aggregate.rebuild", period, lambda: engine.snapshot(period)
+            )
+            self.measure(n, "aggregate.window", period, lambda: engine.window(period))
+            self.measure(n, "_top_list", period, lambda: bot._top_list(ratios))
+            self.measure(
+                n,
+                "_build_summary_embed",
+                period,
+                lambda: bot._build_summary_embed(period, "📅"),
+            )
+            self.measure(
+                n,
+                "leaderboard",
+                period,
+                lambda: bot.leaderboard.callback(FakeInteraction(), period),
+            )
+            self.measure(
+                n,
+                "topkd",
+                period,
+                lambda: bot.topkd.callback(FakeInteraction(), period),
+            )
+            self.measure(
+                n,
+                "compare",
+                period,
+                lambda: bot.compare.callback(FakeInteraction(), period, user1, user2),
+            )
+
+    def main(self) -> None:
+        self.baseline = {}
+        if self.args.baseline:
+            with open(self.args.baseline, encoding="utf-8") as f:
+                self.baseline = {
+                    (r["events"], r["case"], r["period"]): r["median_ms"]
+                    for r in json.load(f)["results"]
+                }
+        started = datetime.now(timezone.utc)
+        for n in self.args.sizes:
+            self.run_size(n)
+        commit = _commit()
+        out = self.args.out or f"bench-{commit or f'{started:%Y%m%d%H%M%S}'}.json"
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "meta": {
+                        "commit": commit,
+                        "started": started.isoformat(),
+                        "python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "seed": self.args.seed,
+                    },
+                    "sizes": self.sizes,
+                    "results": self.results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"wrote {out}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--sizes",
+        default=DEFAULT_SIZES,
+        type=lambda s: [parse_size(x) for x in s.split(",")],
+        help=f"event counts, e.g. 10k,100k,1m,10m (default {DEFAULT_SIZES})",
+    )
+    parser.add_argument(
+        "--periods",
+        default=DEFAULT_PERIODS,
+        type=lambda s: s.split(","),
+        help=f"periods to run the windowed cases for (default {DEFAULT_PERIODS})",
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument(
+        "--budget", type=float, default=10, help="seconds of timed runs per case"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc")
+    parser.add_argument("--out", help="results file (default bench-<commit>.json)")
+    parser.add_argument("--baseline", help="earlier results file to compare with")
+    Bench(parser.parse_args()).main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Stand-ins for the Discord objects the bot's handlers touch, for local tools."""
+
+import asyncio
+import itertools
+import logging
+import os
+import time
+import types
+from collections import deque
+from datetime import datetime, timezone
+
+import discord
+
+# bot.py validates its settings at import time; the tools never reach Discord
+# or the real backend, so any well-formed values do
+BOT_ENV = {
+    "DISCORD_TOKEN": "local",
+    "BACKEND_URL": "http://127.0.0.1:9",
+    "BACKEND_KEY": "local",
+    "KEY_CHANNEL_ID": "1",
+    "PU_KILL_FEED": "2",
+    "AC_KILL_FEED": "3",
+    "STAR_CITIZEN_FEED": "4",
+    "GUILD_ID": "5",
+    "ASSET_CHANNEL": "6",
+}
+
+
+def prepare_bot_env() -> None:
+    """Fill in whatever bot settings are missing; call before `import bot`."""
+    for key, value in BOT_ENV.items():
+        os.environ.setdefault(key, value)
+
+
+_ids = itertools.count(1_000_000)
+
+
+class FakeResponse:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.deferred = False
+        self.messages: list[dict] = []
+        # perf_counter() of the first acknowledgement (Discord allows 3 s)
+        self.acked_at: float | None = None
+
+    def is_done(self) -> bool:
+        return self.deferred or bool(self.messages)
+
+    def _ack(self) -> None:
+        if self.acked_at is None:
+            self.acked_at = time.perf_counter()
+
+    async def defer(self, **kwargs) -> None:
+        await asyncio.sleep(self.latency)
+        self._ack()
+        self.deferred = True
+
+    async def send_message(self, content=None, **kwargs) -> None:
+        await asyncio.sleep(self.latency)
+        self._ack()
+        self.messages.append({"content": content, **kwargs})
+
+
+class FakeFollowup:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.messages: list[dict] = []
+
+    async def send(self, content=None, **kwargs) -> None:
+        await asyncio.sleep(self.latency)
+        self.messages.append({"content": content, **kwargs})
+
+
+class FakeInteraction:
+    """
+    Enough of a discord.Interaction to run a slash command's callback; every
+    reply takes `latency` seconds, like a round trip to Discord.
+    """
+
+    def __init__(
+        self,
+        user: str = "Pilot_00000",
+        user_id: int = 1,
+        latency=0.0,
+        guild_id: int | None = None,
+    ):
+        self.user = types.SimpleNamespace(name=user, id=user_id)
+        # the home guild unless told otherwise
+        self.guild_id = guild_id or int(os.getenv("GUILD_ID", BOT_ENV["GUILD_ID"]))
+        self.response = FakeResponse(latency)
+        self.followup = FakeFollowup(latency)
+        self.created_at = datetime.now(timezone.utc)
+        self.type = discord.InteractionType.application_command
+        self.extras: dict = {}
+        self.command = None
+        self.data: dict = {}
+
+    @property
+    def sent(self) -> list[dict]:
+        return self.response.messages + self.followup.messages
+
+
+class FakeMessage:
+    def __init__(self, channel: "FakeChannel", kwargs: dict):
+        self.id = next(_ids)
+        self.channel = channel
+        self.content = kwargs.get("content")
+        self.embeds = kwargs.get("embeds") or (
+            [kwargs["embed"]] if kwargs.get("embed") else []
+        )
+        files = kwargs.get("files") or ([kwargs["file"]] if kwargs.get("file") else [])
+        self.attachments = [
+            types.SimpleNamespace(
+                url=f"https://cdn.example/{channel.id}/{self.id}/{f.filename}"
+            )
+            for f in files
+        ]
+
+
+class FakeChannel:
+    """
+    Text channel that records what was sent and applies Discord's per-channel
+    limit of `limit` messages per `per` seconds. Over the limit it behaves like
+    discord.py: waits out the 429 (logging it like the HTTP client does), or
+    with `absorb=False` raises discord.RateLimited.
+    """
+
+    def __init__(
+        self,
+        channel_id: int,
+        limit: int = 5,
+        per: float = 5.0,
+        latency: float = 0.0,
+        absorb: bool = True,
+    ):
+        self.id = channel_id
+        self.limit = limit
+        self.per = per
+        self.latency = latency
+        self.absorb = absorb
+        self.messages: dict[int, FakeMessage] = {}
+        self.sent: list[tuple[float, FakeMessage]] = []  # (perf_counter, message)
+        self.rate_limited = 0
+        self._window: deque[float] = deque()
+
+    async def send(self, content=None, **kwargs) -> FakeMessage:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        while True:
+            now = time.monotonic()
+            while self._window and now - self._window[0] >= self.per:
+                self._window.popleft()
+            if len(self._window) < self.limit:
+                break
+            retry_after = self._window[0] + self.per - now
+            self.rate_limited += 1
+            if not self.absorb:
+                raise discord.RateLimited(retry_after)
+            logging.getLogger("discord.http").warning(
+                "We are being rate limited. Retrying in %.2f seconds.", retry_after
+            )
+            await asyncio.sleep(retry_after)
+        self._window.append(time.monotonic())
+        msg = FakeMessage(self, {"content": content, **kwargs})
+        self.messages[msg.id] = msg
+        self.sent.append((time.perf_counter(), msg))
+        return msg
+
+    async def fetch_message(self, message_id: int) -> FakeMessage:
+        msg = self.messages.get(message_id)
+        if msg is None:
+            raise LookupError(f"no message {message_id} in channel {self.id}")
+        return msg
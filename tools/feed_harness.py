@@ -0,0 +1,275 @@
+"""
+End-to-end feed latency harness: the bot's real poll → mirror → card → send
+pipeline, run against tools/mock_backend.py and fake Discord channels.
+
+    python tools/feed_harness.py --scenario sustained --rate 5 --duration 60
+    python tools/feed_harness.py --scenario burst --burst 500 --error-rate 0.1
+    python tools/feed_harness.py --scenario both --latency 0.2 --json out.json
+
+The backend starts with --history old events, which the first poll mirrors
+without posting (as after a fresh deploy). Each phase then inserts events and
+measures, per event, the time from insertion at the backend to its card's
+message being accepted by the fake channel, plus throughput, messages sent,
+cards per message and rate-limit hits. Channels enforce Discord's per-channel
+limit (--channel-limit messages per --channel-per seconds).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+TOOLS = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(TOOLS), TOOLS]
+
+from fakes import FakeChannel, prepare_bot_env  # noqa: E402
+
+prepare_bot_env()
+
+import bot  # noqa: E402
+from assets import AssetManager  # noqa: E402
+from backend import BackendClient  # noqa: E402
+from event_cache import EventCache  # noqa: E402
+from event_store import EventStore  # noqa: E402
+from feed_queue import FeedCursor, FeedSender  # noqa: E402
+from mock_backend import MockBackend  # noqa: E402
+from poller import PollState  # noqa: E402
+
+
+def _pct(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+class Harness:
+    def __init__(self, args):
+        self.args = args
+        # events whose cards were sent or dropped, and the cards' events
+        self.settled: set[tuple[str, int]] = set()
+        self.streams: dict = {}  # tracked cursor.done → stream
+        self.cards: dict[int, tuple[tuple[str, int], object]] = {}
+        self.phases: list[dict] = []
+
+    def _track(self, cursor: FeedCursor, stream: str) -> None:
+        """Note each event whose cards were sent or dropped (via cursor.done)."""
+        done = cursor.done
+
+        def tracked(event_id: int) -> None:
+            self.settled.add((stream, event_id))
+            done(event_id)
+
+        self.streams[tracked] = stream
+        cursor.done = tracked
+
+    def _track_cards(self, feeds: FeedSender) -> None:
+        """Remember which event each card is for, to find it in the channels."""
+        fan_out = feeds.fan_out
+
+        def tracked(channel_ids, embed, on_sent=None) -> None:
+            # on_sent is partial(cursor.done, event_id)
+            key = (self.streams[on_sent.func], *on_sent.args)
+            self.cards[id(embed)] = (key, embed)
+            fan_out(channel_ids, embed, on_sent)
+
+        feeds.fan_out = tracked
+
+    def _delivered(self, sent_before: dict[int, int]) -> dict[tuple[str, int], float]:
+        """When each card's last copy was accepted by a feed channel."""
+        delivered: dict[tuple[str, int], float] = {}
+        for cid in (bot.PU_KILL_FEED_ID, bot.AC_KILL_FEED_ID):
+            for at, msg in self.channels[cid].sent[sent_before[cid] :]:
+                for embed in msg.embeds:
+                    card = self.cards.get(id(embed))
+                    if card is not None:
+                        delivered[card[0]] = max(at, delivered.get(card[0], 0.0))
+        return delivered
+
+    async def setup(self, tmp: str) -> None:
+        args = self.args
+        self.backend = MockBackend(
+            rate=0,
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            seed=args.seed,
+            history=args.history,
+        )
+        url = await self.backend.start()
+
+        b = bot.bot
+        self.channels = {
+            cid: FakeChannel(
+                cid, args.channel_limit, args.channel_per, args.send_latency
+            )
+            for cid in (bot.PU_KILL_FEED_ID, bot.AC_KILL_FEED_ID, bot.ASSET_CHANNEL_ID)
+        }
+        b.get_channel = self.channels.get
+        b.backend = BackendClient(url, "harness")
+        await b.backend.start()
+        store = EventStore(os.path.join(tmp, "harness.db"))
+        store.open()
+        b.use_data(store, EventCache())
+        b.feeds = FeedSender(b.get_channel, bot._thumbnail_files)
+        self._track_cards(b.feeds)
+        b.assets = AssetManager(b.store, b.get_channel, bot.ASSET_CHANNEL_ID)
+        b.poller = PollState(minimum=args.poll_min, maximum=args.poll_max)
+
+        # like a first deploy: post nothing that predates the harness
+        for attr, stream in (("kill_cursor", "kills"), ("death_cursor", "deaths")):
+            cursor = FeedCursor(b.store, f"cursor:{stream}")
+            cursor.reset(len(self.backend.events[stream]))
+            cursor.catching_up = False
+            self._track(cursor, stream)
+            setattr(b, attr, cursor)
+        bot.last_kill_id = bot.last_death_id = 0
+
+        bot.poll_feeds.change_interval(seconds=args.poll_min)
+        start = time.perf_counter()
+        bot.poll_feeds.start()
+        while b.poller.last_success is None:
+            await asyncio.sleep(0.05)
+        print(
+            f"mirrored {args.history} old events in "
+            f"{time.perf_counter() - start:.2f}s; backend at {url}"
+        )
+
+    async def phase(self, name: str, run) -> None:
+        before = set(self.backend.inserted)
+        sent_before = {cid: len(ch.sent) for cid, ch in self.channels.items()}
+        limited_before = sum(ch.rate_limited for ch in self.channels.values())
+        requests_before = (self.backend.requests, self.backend.errors)
+        start = time.perf_counter()
+
+        await run()
+        keys = set(self.backend.inserted) - before
+        deadline = time.perf_counter() + self.args.drain
+        while time.perf_counter() < deadline and not keys <= self.settled:
+            await asyncio.sleep(0.05)
+        # a dropped card settles too, so delivery is read off the channels
+        delivered = self._delivered(sent_before)
+
+        feed_ids = (bot.PU_KILL_FEED_ID, bot.AC_KILL_FEED_ID)
+        messages = [
+            msg
+            for cid in feed_ids
+            for _, msg in self.channels[cid].sent[sent_before[cid] :]
+        ]
+        lat = [
+            (delivered[k] - self.backend.inserted[k]) * 1000
+            for k in keys
+            if k in delivered
+        ]
+        done_at = max((delivered[k] for k in keys if k in delivered), default=start)
+        elapsed = max(1e-9, done_at - start)
+        result = {
+            "phase": name,
+            "events": len(keys),
+            "delivered": len(lat),
+            "undelivered": len(keys) - len(lat),
+            "seconds": round(elapsed, 3),
+            "throughput_per_s": round(len(lat) / elapsed, 2),
+            "latency_ms": {
+                "p50": _pct(lat, 50),
+                "p95": _pct(lat, 95),
+                "p99": _pct(lat, 99),
+                "max": max(lat, default=None),
+                "mean": statistics.fmean(lat) if lat else None,
+            },
+            "messages": len(messages),
+            "cards_per_message": (
+                round(sum(len(m.embeds) for m in messages) / len(messages), 2)
+                if messages
+                else None
+            ),
+            "rate_limited": sum(ch.rate_limited for ch in self.channels.values())
+            - limited_before,
+            "backend_requests": self.backend.requests - requests_before[0],
+            "backend_errors": self.backend.errors - requests_before[1],
+        }
+        self.phases.append(result)
+        self._print(result)
+
+    def _print(self, r: dict) -> None:
+        lat = {
+            k: f"{v:.0f}" if v is not None else "-" for k, v in r["latency_ms"].items()
+        }
+        print(
+            f"[{r['phase']}] {r['delivered']}/{r['events']} delivered in "
+            f"{r['seconds']:.1f}s ({r['throughput_per_s']}/s)\n"
+            f"  latency ms  p50 {lat['p50']}  p95 {lat['p95']}  p99 {lat['p99']}"
+            f"  max {lat['max']}\n"
+            f"  {r['messages']} messages, {r['cards_per_message']} cards/message, "
+            f"{r['rate_limited']} rate limits, {r['backend_requests']} backend "
+            f"requests ({r['backend_errors']} failed)"
+        )
+
+    async def sustained(self) -> None:
+        self.backend.rate = self.args.rate
+        self.backend.start_arrivals()
+        await asyncio.sleep(self.args.duration)
+        self.backend.stop_arrivals()
+
+    async def burst(self) -> None:
+        self.backend.burst(self.args.burst)
+
+    async def teardown(self) -> None:
+        bot.poll_feeds.cancel()
+        await bot.bot.feeds.close()
+        await bot.bot.backend.close()
+        await self.backend.stop()
+        bot.bot.store.close()
+
+    async def main(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            await self.setup(tmp)
+            try:
+                if self.args.scenario in ("sustained", "both"):
+                    await self.phase("sustained", self.sustained)
+                if self.args.scenario in ("burst", "both"):
+                    await self.phase("burst", self.burst)
+            finally:
+                await self.teardown()
+        if self.args.json:
+            with open(self.args.json, "w", encoding="utf-8") as f:
+                json.dump({"args": vars(self.args), "phases": self.phases}, f, indent=2)
+            print(f"wrote {self.args.json}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--scenario", choices=("sustained", "burst", "both"), default="both"
+    )
+    parser.add_argument("--rate", type=float, default=2.0, help="events/s (sustained)")
+    parser.add_argument("--duration", type=float, default=30, help="sustained seconds")
+    parser.add_argument("--burst", type=int, default=200, help="events in the burst")
+    parser.add_argument("--history", type=int, default=10_000)
+    parser.add_argument("--latency", type=float, default=0.05, help="backend seconds")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--send-latency", type=float, default=0.05)
+    parser.add_argument("--channel-limit", type=int, default=5)
+    parser.add_argument("--channel-per", type=float, default=5.0)
+    parser.add_argument("--poll-min", type=float, default=2.0)
+    parser.add_argument("--poll-max", type=float, default=60.0)
+    parser.add_argument(
+        "--drain", type=float, default=120, help="max seconds to wait for delivery"
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the results here")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.CRITICAL)
+    asyncio.run(Harness(args).main())
+
+
+if __name__ == "__main__":
+    main()
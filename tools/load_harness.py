@@ -0,0 +1,303 @@
+"""
+Concurrency load harness for the slash commands.
+
+    python tools/load_harness.py --concurrency 500
+    python tools/load_harness.py --mix "leaderboard all:50,stats:50" --cold
+    python tools/load_harness.py --events 1m --total 2000 --concurrency 200
+
+Loads --events synthetic events into a scratch mirror and cache (and the same
+history into tools/mock_backend.py for the commands that still call the
+backend), then fires --total command invocations, --concurrency at a time,
+straight into the command callbacks with fake interactions whose replies
+take --discord-latency. --cold starts from unbuilt leaderboard windows, as
+right after a restart; --no-result-cache rebuilds every reply instead of
+reusing recent identical ones.
+
+Reports latency percentiles per command and overall, how many invocations
+acknowledged later than Discord's 3 s limit, backend requests made, peak
+memory and event-loop lag (how late a 10 ms ticker woke up during the run).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+TOOLS = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(TOOLS), TOOLS]
+
+from fakes import FakeInteraction, prepare_bot_env  # noqa: E402
+
+prepare_bot_env()
+
+import bot  # noqa: E402
+from backend import BackendClient  # noqa: E402
+from event_cache import EventCache  # noqa: E402
+from event_store import EventStore  # noqa: E402
+from mock_backend import MockBackend  # noqa: E402
+from synthetic import chunks, parse_size  # noqa: E402
+
+DEFAULT_MIX = (
+    "leaderboard all:30,stats:30,topkd all:10,kd all:10,"
+    "compare all Pilot_00000 Pilot_00001:10,kills weekly:10"
+)
+# Discord drops an interaction that isn't acknowledged within this
+ACK_DEADLINE = 3.0
+LAG_TICK = 0.01
+
+
+def _pct(values: list[float], q: float) -> float | None:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def _parse_mix(text: str) -> list[tuple[str, int]]:
+    """'leaderboard all:30,stats:70' → [("leaderboard all", 30), ("stats", 70)]"""
+    mix = []
+    for part in text.split(","):
+        spec, _, weight = part.rpartition(":")
+        mix.append((spec.strip(), int(weight)))
+    return mix
+
+
+class LagMonitor:
+    """Measures how late the loop runs a ticker that asks to wake every 10 ms."""
+
+    def __init__(self):
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+        self._since = 0.0
+
+    async def _tick(self) -> None:
+        while True:
+            self._since = time.perf_counter()
+            await asyncio.sleep(LAG_TICK)
+            self.lags.append((time.perf_counter() - self._since - LAG_TICK) * 1000)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._tick())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            # a tick still waiting to run was delayed at least this long
+            overdue = time.perf_counter() - self._since - LAG_TICK
+            if overdue > 0:
+                self.lags.append(overdue * 1000)
+            self._task.cancel()
+
+
+class LoadHarness:
+    def __init__(self, args):
+        self.args = args
+        self.rnd = random.Random(args.seed)
+        self.results: list[dict] = []
+
+    async def setup(self, tmp: str) -> None:
+        args = self.args
+        print(f"generating {args.events:,} events...", flush=True)
+        self.backend = MockBackend(
+            rate=0,
+            latency=args.latency,
+            jitter=args.latency / 2,
+            seed=args.seed,
+            history=args.events,
+        )
+        url = await self.backend.start()
+        b = bot.bot
+        b.backend = BackendClient(url, "load")
+        await b.backend.start()
+        store = EventStore(os.path.join(tmp, "load.db"))
+        store.open()
+        cache = EventCache()
+        for stream, add in (("kills", "add_kills"), ("deaths", "add_deaths")):
+            for batch in chunks(self.backend.events[stream]):
+                getattr(store, add)(batch)
+                getattr(cache, add)(batch)
+        b.use_data(store, cache)
+        if args.no_result_cache:
+            b.results.ttl = 0
+        if not args.cold:
+            for period in ("today", "week", "month", "all"):
+                b.aggregates.window(period)
+        # who runs /stats, /kd: people who actually appear in the data
+        self.players = sorted(
+            {e["player"] for e in self.backend.events["kills"][:10_000]}
+        ) or ["Pilot_00000"]
+
+        self.mix = []
+        for spec, weight in _parse_mix(args.mix):
+            name, *rest = spec.split()
+            command = bot.bot.tree.get_command(name)
+            if command is None:
+                raise SystemExit(f"unknown command /{name}")
+            self.mix.append((spec, command, bot._command_kwargs(command, rest), weight))
+
+    async def invoke(self, spec, command, kwargs) -> None:
+        interaction = FakeInteraction(
+            user=self.rnd.choice(self.players), latency=self.args.discord_latency
+        )
+        start = time.perf_counter()
+        error = None
+        try:
+            await command.callback(interaction, **kwargs)
+        except Exception as e:
+            error = type(e).__name__
+        end = time.perf_counter()
+        acked = interaction.response.acked_at
+        self.results.append(
+            {
+                "command": spec,
+                "ms": (end - start) * 1000,
+                "ack_ms": (acked - start) * 1000 if acked is not None else None,
+                "error": error,
+            }
+        )
+
+    async def run(self) -> dict:
+        args = self.args
+        specs = self.rnd.choices(
+            [m[:3] for m in self.mix], weights=[m[3] for m in self.mix], k=args.total
+        )
+        gate = asyncio.Semaphore(args.concurrency)
+
+        async def one(spec) -> None:
+            async with gate:
+                await self.invoke(*spec)
+
+        requests_before = self.backend.requests
+        monitor = LagMonitor()
+        if args.tracemalloc:
+            tracemalloc.start()
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        monitor.start()
+        start = time.perf_counter()
+        await asyncio.gather(*(one(s) for s in specs))
+        elapsed = time.perf_counter() - start
+        monitor.stop()
+        peak_traced = None
+        if args.tracemalloc:
+            peak_traced = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        summary = {
+            "invocations": len(self.results),
+            "concurrency": args.concurrency,
+            "seconds": round(elapsed, 3),
+            "per_second": round(len(self.results) / elapsed, 1),
+            "backend_requests": self.backend.requests - requests_before,
+            "max_rss_mib": round(rss_after / 1024, 1),
+            "rss_growth_mib": round((rss_after - rss_before) / 1024, 1),
+            "peak_traced_mib": round(peak_traced, 1) if peak_traced else None,
+            "loop_lag_ms": {
+                "p50": _pct(monitor.lags, 50),
+                "p99": _pct(monitor.lags, 99),
+                "max": max(monitor.lags, default=None),
+            },
+            "commands": {},
+        }
+        groups: dict[str, list[dict]] = {"(all)": self.results}
+        for r in self.results:
+            groups.setdefault(r["command"], []).append(r)
+        for name, rows in groups.items():
+            ms = [r["ms"] for r in rows]
+            summary["commands"][name] = {
+                "count": len(rows),
+                "errors": sum(1 for r in rows if r["error"]),
+                "late_acks": sum(
+                    1
+                    for r in rows
+                    if r["ack_ms"] is None or r["ack_ms"] > ACK_DEADLINE * 1000
+                ),
+                "p50_ms": _pct(ms, 50),
+                "p95_ms": _pct(ms, 95),
+                "p99_ms": _pct(ms, 99),
+                "max_ms": max(ms),
+            }
+        return summary
+
+    def report(self, s: dict) -> None:
+        print(
+            f"{s['invocations']} invocations at concurrency {s['concurrency']} in "
+            f"{s['seconds']:.2f}s ({s['per_second']}/s), "
+            f"{s['backend_requests']} backend requests"
+        )
+        lag = s["loop_lag_ms"]
+        print(
+            f"loop lag ms: p50 {lag['p50'] or 0:.1f}  p99 {lag['p99'] or 0:.1f}  "
+            f"max {lag['max'] or 0:.1f};  max RSS {s['max_rss_mib']} MiB "
+            f"(+{s['rss_growth_mib']} during the run)"
+            + (
+                f", traced peak {s['peak_traced_mib']} MiB"
+                if s["peak_traced_mib"]
+                else ""
+            )
+        )
+        width = max(len(n) for n in s["commands"])
+        print(
+            f"\n{'command':<{width}}  {'count':>6} {'errors':>6} {'late':>5}"
+            f" {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+        )
+        for name, c in s["commands"].items():
+            print(
+                f"{name:<{width}}  {c['count']:>6} {c['errors']:>6} "
+                f"{c['late_acks']:>5} {c['p50_ms']:>9.1f} {c['p95_ms']:>9.1f} "
+                f"{c['p99_ms']:>9.1f} {c['max_ms']:>9.1f}"
+            )
+
+    async def main(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            await self.setup(tmp)
+            try:
+                summary = await self.run()
+            finally:
+                await bot.bot.backend.close()
+                await self.backend.stop()
+                bot.bot.store.close()
+        self.report(summary)
+        errors = [r for r in self.results if r["error"]]
+        if errors:
+            print(f"\nfirst error: {errors[0]['command']}: {errors[0]['error']}")
+        if self.args.json:
+            with open(self.args.json, "w", encoding="utf-8") as f:
+                json.dump({"args": vars(self.args), "summary": summary}, f, indent=2)
+            print(f"wrote {self.args.json}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--events", type=parse_size, default=parse_size("200k"))
+    parser.add_argument("--mix", default=DEFAULT_MIX, help='"command args:weight,..."')
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--total", type=int, help="invocations (default: concurrency)")
+    parser.add_argument(
+        "--cold", action="store_true", help="start with no windows built"
+    )
+    parser.add_argument(
+        "--no-result-cache", action="store_true", help="rebuild every result"
+    )
+    parser.add_argument("--latency", type=float, default=0.05, help="backend seconds")
+    parser.add_argument(
+        "--discord-latency", type=float, default=0.05, help="seconds per reply"
+    )
+    parser.add_argument("--tracemalloc", action="store_true", help="trace peak memory")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the summary here")
+    args = parser.parse_args()
+    args.total = args.total or args.concurrency
+    logging.getLogger().setLevel(logging.CRITICAL)
+    asyncio.run(LoadHarness(args).main())
+
+
+if __name__ == "__main__":
+    main()
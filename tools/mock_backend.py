@@ -0,0 +1,189 @@
+"""
+Stand-in for the kill-tracker backend, serving synthetic events.
+
+    python tools/mock_backend.py --port 8099 --rate 5 --latency 0.05
+
+Serves GET /kills and /deaths with the real API's `since` and `since_time`
+filters, plus the `until` id bound that BACKEND_RANGES relies on (the real API
+has none; --ignore-until serves as it does). New events arrive as a Poisson
+process at --rate per second (or in bursts via `burst()`), each stamped with the moment it was
+inserted so a harness can measure how long the bot took to deliver it.
+Responses can be slowed down (--latency ± --jitter) and made to fail
+(--error-rate) to exercise retries and backoff.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from bisect import bisect_right
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic import SyntheticEvents  # noqa: E402
+
+# kills make up this share of arrivals, deaths the rest
+KILL_SHARE = 0.55
+
+
+class MockBackend:
+    def __init__(
+        self,
+        rate: float = 1.0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 1,
+        history: int = 0,
+        honour_until: bool = True,
+    ):
+        self.rate = rate
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.honour_until = honour_until
+        self.rnd = random.Random(seed)
+        # pre-existing history, already "old" when the harness starts
+        data = SyntheticEvents(max(history, 1), seed=seed)
+        n_kills = round(history * KILL_SHARE)
+        self.events = {
+            "kills": list(data.kills(n_kills)),
+            "deaths": list(data.deaths(history - n_kills)),
+        }
+        # perf_counter() at insertion, by (stream, id)
+        self.inserted: dict[tuple[str, int], float] = {}
+        self.requests = 0
+        self.errors = 0
+        self._source = {
+            "kills": data.kills(n=10**9, start_id=len(self.events["kills"]) + 1),
+            "deaths": data.deaths(n=10**9, start_id=len(self.events["deaths"]) + 1),
+        }
+        self._arrivals: asyncio.Task | None = None
+        self._runner: web.AppRunner | None = None
+        self.url: str | None = None
+
+    # ─── event arrival ───────────────────────────────────────────────────────────
+    def insert(self, stream: str) -> dict:
+        """Append one new event, timestamped now, to 'kills' or 'deaths'."""
+        event = next(self._source[stream])
+        event["time"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        self.events[stream].append(event)
+        self.inserted[(stream, event["id"])] = time.perf_counter()
+        return event
+
+    def insert_random(self) -> dict:
+        return self.insert("kills" if self.rnd.random() < KILL_SHARE else "deaths")
+
+    def burst(self, n: int) -> None:
+        for _ in range(n):
+            self.insert_random()
+
+    async def _arrive(self) -> None:
+        while True:
+            await asyncio.sleep(self.rnd.expovariate(self.rate))
+            self.insert_random()
+
+    def start_arrivals(self) -> None:
+        if self.rate > 0 and self._arrivals is None:
+            self._arrivals = asyncio.create_task(self._arrive())
+
+    def stop_arrivals(self) -> None:
+        if self._arrivals is not None:
+            self._arrivals.cancel()
+            self._arrivals = None
+
+    # ─── HTTP ────────────────────────────────────────────────────────────────────
+    async def _list(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(
+                max(0.0, self.latency + self.rnd.uniform(-self.jitter, self.jitter))
+            )
+        if self.rnd.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response({"detail": "injected failure"}, status=503)
+        events = self.events[request.match_info["stream"]]
+        since = request.query.get("since")
+        until = request.query.get("until")
+        since_time = request.query.get("since_time")
+        if until is not None and self.honour_until:
+            events = events[: bisect_right(events, int(until), key=lambda e: e["id"])]
+        if since is not None:
+            # ids only grow, so everything after the cursor is a suffix
+            events = events[bisect_right(events, int(since), key=lambda e: e["id"]) :]
+        if since_time is not None:
+            cutoff = datetime.fromisoformat(since_time.replace("Z", "+00:00"))
+            if cutoff.tzinfo is None:
+                cutoff = cutoff.replace(tzinfo=timezone.utc)
+            stamp = cutoff.isoformat().replace("+00:00", "Z")[:19]
+            events = [e for e in events if e["time"][:19] >= stamp]
+        return web.json_response(events)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/{stream:kills|deaths}", self._list)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve on `host:port` (0 picks a free port) and return the base url."""
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        self.start_arrivals()
+        return self.url
+
+    async def stop(self) -> None:
+        self.stop_arrivals()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def _serve(args) -> None:
+    backend = MockBackend(
+        rate=args.rate,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        history=args.history,
+        honour_until=not args.ignore_until,
+    )
+    url = await backend.start(args.host, args.port)
+    print(f"mock backend on {url} ({args.rate}/s, {args.history} old events)")
+    while True:
+        await asyncio.sleep(10)
+        print(
+            f"{len(backend.events['kills'])} kills, "
+            f"{len(backend.events['deaths'])} deaths, "
+            f"{backend.requests} requests ({backend.errors} failed)",
+            flush=True,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--rate", type=float, default=1.0, help="new events per second")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per reply")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--history", type=int, default=0, help="events to start with")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--ignore-until", action="store_true", help="like the real API")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
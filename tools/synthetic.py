@@ -0,0 +1,169 @@
+"""
+Deterministic synthetic kills and deaths shaped like the backend's feed.
+
+The same seed and size always yield the same events (timestamps are offsets
+back from `end`, which defaults to now rounded down to the hour). Activity is
+Zipf-skewed, so a few players dominate the leaderboards as they do live, and
+the mix of SC_ / EA_ flight / EA_ FPS modes, orgs, zones and weapon codes
+(catalog prefixes plus per-item serials) follows the real feed.
+"""
+
+import bisect
+import itertools
+import json
+import os
+import random
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (game_mode, mode, weight)
+GAME_MODES = (
+    ("SC_Default", "pu-kill", 55),
+    ("EA_SquadronBattle", "ac-kill", 10),
+    ("EA_FreeFlight", "ac-kill", 8),
+    ("EA_FPSGunGame", "ac-kill", 9),
+    ("EA_TeamElimination", "ac-kill", 8),
+    ("EA_FPSKillConfirmed", "ac-kill", 7),
+    ("EA_Other", "ac-kill", 3),
+)
+FPS_MODES = {"EA_FPSGunGame", "EA_TeamElimination", "EA_FPSKillConfirmed"}
+ZONES = (
+    "util_a_orbital_001_occu",
+    "Stanton1_Hurston",
+    "Stanton2_Crusader",
+    "Stanton3_ArcCorp",
+    "Stanton4_Microtech",
+    "Pyro_Ruin_Station",
+    "Unknown",
+)
+DAMAGE_TYPES = (("Bullet", 70), ("Energy", 15), ("Crash", 5), ("Suicide", 5), ("", 5))
+SHIPS = ("ANVL_Arrow", "AEGS_Gladius", "MISC_Razor_EX", "ANVL_Hornet_F7A_Mk2")
+
+
+def parse_size(text: str) -> int:
+    """'10k' → 10_000, '1m' → 1_000_000, '250' → 250."""
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * scale)
+
+
+def _catalog() -> dict[str, list[str]]:
+    with open(os.path.join(ROOT, "weapon_catalog.json"), encoding="utf-8") as f:
+        sections = json.load(f)
+    return {name: list(entries) for name, entries in sections.items()}
+
+
+class SyntheticEvents:
+    """
+    Generator for one data set. `players` defaults to a count that grows with
+    the size (4·√n, at least 50); every tenth player has no org.
+    """
+
+    def __init__(
+        self,
+        n: int,
+        seed: int = 1,
+        days: int = 400,
+        end: datetime | None = None,
+        players: int | None = None,
+    ):
+        self.n = n
+        self.seed = seed
+        self.days = days
+        self.end = end or datetime.now(timezone.utc).replace(
+            minute=0, second=0, microsecond=0
+        )
+        rnd = random.Random(seed)
+        count = players or max(50, int(4 * n**0.5))
+        self.players = [f"Pilot_{i:05d}" for i in range(count)]
+        self.orgs = [f"ORG{i:03d}" for i in range(max(3, count // 15))]
+        self.org_of = {
+            p: None if i % 10 == 9 else rnd.choice(self.orgs)
+            for i, p in enumerate(self.players)
+        }
+        # Zipf-ish activity: the k-th player is 1/k^1.1 as busy as the first
+        self._player_cum = list(
+            itertools.accumulate(1 / (k + 1) ** 1.1 for k in range(count))
+        )
+        catalog = _catalog()
+        self.fps_weapons = catalog.get("fps_weapons", []) or ["behr_rifle"]
+        self.ship_weapons = (
+            catalog.get("ship_weapons", []) + catalog.get("ships", [])
+        ) or ["AMRS_LaserCannon_S4"]
+        self._mode_cum = list(itertools.accumulate(w for *_, w in GAME_MODES))
+        self._damage_cum = list(itertools.accumulate(w for _, w in DAMAGE_TYPES))
+
+    def _player(self, rnd: random.Random) -> str:
+        x = rnd.random() * self._player_cum[-1]
+        return self.players[bisect.bisect(self._player_cum, x)]
+
+    def _weapon(self, rnd: random.Random, fps: bool, owner: str) -> str:
+        if rnd.random() < 0.05:
+            return f"unknown_weapon_{rnd.randrange(50):02d}"
+        prefix = rnd.choice(self.fps_weapons if fps else self.ship_weapons)
+        # serials repeat per player and weapon, as a held item keeps its id
+        serial = zlib.crc32(f"{owner}:{prefix}:{self.seed}".encode())
+        return f"{prefix}_{serial}"
+
+    def _times(self, n: int, salt: int) -> Iterator[str]:
+        rnd = random.Random(self.seed * 1_000_003 + salt)
+        start = self.end - timedelta(days=self.days)
+        step = self.days * 86400 / max(1, n)
+        for i in range(n):
+            t = start + timedelta(seconds=(i + rnd.random()) * step)
+            yield t.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def _common(self, rnd: random.Random, event_id: int, ts: str) -> tuple[dict, bool]:
+        """The fields kills and deaths share, and whether it was on foot."""
+        i = bisect.bisect(self._mode_cum, rnd.random() * self._mode_cum[-1])
+        game_mode, mode, _ = GAME_MODES[i]
+        pu = game_mode.startswith("SC_")
+        fps = game_mode in FPS_MODES or (pu and rnd.random() < 0.5)
+        j = bisect.bisect(self._damage_cum, rnd.random() * self._damage_cum[-1])
+        victim = self._player(rnd)
+        event = {
+            "id": event_id,
+            "time": ts,
+            "victim": victim,
+            "zone": rnd.choice(ZONES) if pu else "Unknown",
+            "damage_type": DAMAGE_TYPES[j][0],
+            "game_mode": game_mode,
+            "mode": mode,
+            "killers_ship": "N/A" if fps else rnd.choice(SHIPS),
+            "victim_ship": None,
+            "organization_name": self.org_of[victim],
+            "organization_url": None,
+            "rsi_profile": "",
+        }
+        return event, fps
+
+    def kills(self, n: int | None = None, start_id: int = 1) -> Iterator[dict]:
+        """`n` kills (default: n * 55%), oldest first."""
+        n = round(self.n * 0.55) if n is None else n
+        rnd = random.Random(self.seed * 7919 + 1)
+        for i, ts in enumerate(self._times(n, 1)):
+            e, fps = self._common(rnd, start_id + i, ts)
+            e["player"] = self._player(rnd)
+            e["weapon"] = self._weapon(rnd, fps, e["player"])
+            yield e
+
+    def deaths(self, n: int | None = None, start_id: int = 1) -> Iterator[dict]:
+        """`n` deaths (default: the rest of n), oldest first."""
+        n = self.n - round(self.n * 0.55) if n is None else n
+        rnd = random.Random(self.seed * 7919 + 2)
+        for i, ts in enumerate(self._times(n, 2)):
+            e, fps = self._common(rnd, start_id + i, ts)
+            e.pop("mode")
+            e["killer"] = self._player(rnd)
+            e["weapon"] = self._weapon(rnd, fps, e["killer"])
+            yield e
+
+
+def chunks(events: Iterator[dict], size: int = 50_000) -> Iterator[list[dict]]:
+    """Batch an event stream so huge data sets never sit in memory as dicts."""
+    it = iter(events)
+    while batch := list(itertools.islice(it, size)):
+        yield batch
@@ -0,0 +1,87 @@
+"""
+Summarize traces.jsonl: span count and p50/p95/p99 latency per root and stage.
+
+    python tools/trace_summary.py [traces.jsonl] [--root command:leaderboard]
+
+Rotated files (traces.jsonl.1, .2, ...) are read too. A root's "(self)" row is
+time not covered by any child span, i.e. in-process work such as building
+embeds between the timed stages.
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+from collections import defaultdict
+
+
+def _percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of sorted `values`."""
+    i = max(0, min(len(values) - 1, math.ceil(q / 100 * len(values)) - 1))
+    return values[i]
+
+
+def _files(path: str) -> list[str]:
+    rotated = sorted(
+        glob.glob(glob.escape(path) + ".*"),
+        key=lambda p: int(p.rsplit(".", 1)[1]) if p.rsplit(".", 1)[1].isdigit() else 0,
+        reverse=True,
+    )
+    return rotated + ([path] if os.path.exists(path) else [])
+
+
+def load(path: str) -> dict[tuple[str, str], list[float]]:
+    """(root, stage) → span durations in ms."""
+    stats: dict[tuple[str, str], list[float]] = defaultdict(list)
+    traces: dict[str, list[dict]] = defaultdict(list)
+    for name in _files(path):
+        with open(name, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue  # truncated line from a crash or rotation
+                traces[rec["trace"]].append(rec)
+    for spans in traces.values():
+        child_ms: dict[int, float] = defaultdict(float)
+        for s in spans:
+            if s["parent"] is not None:
+                child_ms[s["parent"]] += s["ms"]
+        for s in spans:
+            if s["parent"] is None:
+                stats[(s["root"], "(total)")].append(s["ms"])
+                stats[(s["root"], "(self)")].append(
+                    max(0.0, s["ms"] - child_ms[s["span"]])
+                )
+            else:
+                stats[(s["root"], s["name"])].append(s["ms"])
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "path", nargs="?", default=os.getenv("TRACE_PATH", "traces.jsonl")
+    )
+    parser.add_argument("--root", help="only show traces with this root label")
+    args = parser.parse_args()
+
+    stats = load(args.path)
+    if not stats:
+        sys.exit(f"no traces in {args.path}")
+    rows = sorted(k for k in stats if args.root in (None, k[0]))
+    width = max(len(f"{r}  {s}") for r, s in rows)
+    print(f"{'root  stage':<{width}}  {'count':>7}  {'p50':>9}  {'p95':>9}  {'p99':>9}")
+    for root, stage in rows:
+        values = sorted(stats[(root, stage)])
+        p = [_percentile(values, q) for q in (50, 95, 99)]
+        print(
+            f"{root + '  ' + stage:<{width}}  {len(values):>7}  "
+            + "  ".join(f"{v:>7.1f}ms" for v in p)
+        )
+
+
+if __name__ == "__main__":
+    main()
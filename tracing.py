@@ -0,0 +1,169 @@
+import atexit
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# ─── Lightweight tracing ─────────────────────────────────────────────────────────
+# A trace starts at a root span (a slash command, a poll, a report run) and
+# collects the nested spans opened while it runs: fetch, decode, aggregate,
+# query, render, send. Finished traces are appended to a rotating JSONL file,
+# one span per line, by a background thread so the event loop never waits on
+# the disk; tools/trace_summary.py turns them into per-stage p50/95/99.
+TRACE_PATH = os.getenv("TRACE_PATH", "traces.jsonl")
+# fraction of root spans recorded; off unless set (1.0 records every trace)
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", str(10 * 1024 * 1024)))
+TRACE_BACKUPS = int(os.getenv("TRACE_BACKUPS", "3"))
+
+_current: ContextVar["Span | None"] = ContextVar("trace_span", default=None)
+_exporter: logging.Logger | None = None
+
+
+def _export(spans: list["Span"]) -> None:
+    global _exporter
+    if _exporter is None:
+        _exporter = logging.getLogger("killtracker.traces")
+        _exporter.propagate = False
+        _exporter.setLevel(logging.INFO)
+        handler = RotatingFileHandler(
+            TRACE_PATH, maxBytes=TRACE_MAX_BYTES, backupCount=TRACE_BACKUPS
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        # spans are queued here and written (and rotated) by the listener thread
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        listener = QueueListener(records, handler)
+        listener.start()
+        atexit.register(listener.stop)
+        _exporter.addHandler(QueueHandler(records))
+    for s in spans:
+        _exporter.info(json.dumps(s.record(), default=str))
+
+
+class _Trace:
+    __slots__ = ("id", "label", "spans", "next_id")
+
+    def __init__(self, label: str):
+        self.id = f"{random.getrandbits(64):016x}"
+        self.label = label
+        self.spans: list[Span] = []
+        self.next_id = 0
+
+
+class Span:
+    """One timed stage; `set()` attaches counts, sizes and other attributes."""
+
+    __slots__ = (
+        "trace",
+        "name",
+        "id",
+        "parent_id",
+        "wall",
+        "start",
+        "ms",
+        "attrs",
+        "_token",
+    )
+
+    def __init__(self, trace: _Trace | None, name: str, parent: "Span | None", attrs):
+        self.trace = trace
+        self.name = name
+        self.parent_id = parent.id if parent is not None else None
+        self.id = 0
+        if trace is not None:
+            trace.next_id += 1
+            self.id = trace.next_id
+        self.attrs = attrs
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        self.ms: float | None = None
+        self._token = _current.set(self)
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def end(self) -> None:
+        if self.ms is not None:
+            return
+        self.ms = (time.perf_counter() - self.start) * 1000
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            pass  # ended from another task (e.g. a command's completion event)
+        if self.trace is None:
+            return
+        self.trace.spans.append(self)
+        if self.parent_id is None:
+            _export(self.trace.spans)
+
+    def record(self) -> dict:
+        return {
+            "trace": self.trace.id,
+            "root": self.trace.label,
+            "span": self.id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "ts": round(self.wall, 3),
+            "ms": round(self.ms, 3),
+            **({"attrs": self.attrs} if self.attrs else {}),
+        }
+
+
+class _NullSpan:
+    """Stand-in when no trace is active."""
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+_NULL = _NullSpan()
+
+
+def start_span(name: str, *, root: bool = False, **attrs) -> Span | _NullSpan:
+    """
+    Open a span under the current one. Outside a trace this is a no-op unless
+    `root` is set, which starts a new (possibly unsampled) trace.
+    """
+    parent = _current.get()
+    if parent is not None:
+        return Span(parent.trace, name, parent, attrs)
+    if not root:
+        return _NULL
+    sampled = TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE
+    label = f"{name}:{attrs['command']}" if "command" in attrs else name
+    return Span(_Trace(label) if sampled else None, name, None, attrs)
+
+
+@contextmanager
+def span(name: str, *, root: bool = False, **attrs):
+    s = start_span(name, root=root, **attrs)
+    try:
+        yield s
+    except BaseException as e:
+        s.set(error=type(e).__name__)
+        raise
+    finally:
+        s.end()
+
+
+def traced(name: str | None = None):
+    """Run an async function inside a span, starting a trace if none is active."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(name or fn.__name__, root=True):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
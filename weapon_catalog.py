@@ -0,0 +1,87 @@
+import json
+import logging
+import os
+from functools import lru_cache
+
+# next to this module by default, so the bot can start from any directory
+WEAPON_CATALOG_PATH = os.getenv("WEAPON_CATALOG_PATH") or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "weapon_catalog.json"
+)
+RESOLVE_CACHE_SIZE = int(os.getenv("WEAPON_RESOLVE_CACHE_SIZE", "4096"))
+
+
+class PrefixIndex:
+    """
+    Immutable, compiled prefix → friendly-name table. Lookups return the
+    longest matching prefix, and resolved raw codes are kept in a bounded LRU.
+    """
+
+    def __init__(self, mapping: dict[str, str], cache_size: int = RESOLVE_CACHE_SIZE):
+        self._map = dict(mapping)
+        # only probe prefix lengths that actually exist, longest first
+        self._lengths = sorted({len(k) for k in self._map}, reverse=True)
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def __len__(self) -> int:
+        return len(self._map)
+
+    def _resolve(self, raw: str) -> str:
+        if not raw:
+            return raw
+        n = len(raw)
+        for length in self._lengths:
+            if length <= n:
+                pretty = self._map.get(raw[:length])
+                if pretty is not None:
+                    return pretty
+        return raw
+
+
+def load_catalog(path: str) -> dict[str, str]:
+    """
+    Read a catalog file of `{section: {prefix: name}}` and flatten it,
+    refusing prefixes that are defined twice.
+    """
+    with open(path, encoding="utf-8") as f:
+        sections = json.load(f)
+    mapping: dict[str, str] = {}
+    for section, entries in sections.items():
+        for prefix, pretty in entries.items():
+            if prefix in mapping:
+                raise ValueError(f"{path}: duplicate prefix {prefix!r} in {section!r}")
+            mapping[prefix] = pretty
+    return mapping
+
+
+class WeaponCatalog:
+    """
+    Weapon / ship / zone name resolver backed by an external catalog file.
+    `reload_if_changed()` swaps in a freshly compiled index in one assignment,
+    so lookups never see a half-built table.
+    """
+
+    def __init__(self, path: str = WEAPON_CATALOG_PATH):
+        self.path = path
+        self._index = PrefixIndex({})
+        self._mtime: float | None = None
+
+    def load(self) -> None:
+        mtime = os.stat(self.path).st_mtime
+        index = PrefixIndex(load_catalog(self.path))
+        self._index = index
+        self._mtime = mtime
+        logging.info(f"Loaded {len(index)} weapon catalog entries from {self.path}")
+
+    def reload_if_changed(self) -> bool:
+        """Reload when the file's mtime moved; a bad file keeps the old index."""
+        try:
+            if os.stat(self.path).st_mtime == self._mtime:
+                return False
+            self.load()
+        except (OSError, ValueError) as e:
+            logging.error(f"⚠️ weapon catalog reload failed, keeping old one: {e}")
+            return False
+        return True
+
+    def resolve(self, raw: str) -> str:
+        return self._index.resolve(raw)